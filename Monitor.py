@@ -1,1074 +1,16 @@
 """
-PC Gaming App - Main Flask Application
-Modernized backend with better error handling, structure, and performance
-"""
-from flask import Flask, jsonify, render_template, request, send_from_directory
-from werkzeug.serving import WSGIRequestHandler
-import socket
-import logging
-import os
-import sys
-import ctypes
-import webbrowser
-import threading
-import time
-
-from config import (
-    SERVER_HOST, SERVER_PORT, DEBUG, LIB_FOLDER,
-    APP_VERSION, BASE_DIR
-)
-from utils.logger import setup_logger
-from utils.errors import handle_api_errors
-from utils.cache import metrics_cache
-
-# Check for admin privileges and request if needed
-def is_admin():
-    """Check if the script is running with administrator privileges."""
-    try:
-        return ctypes.windll.shell32.IsUserAnAdmin()
-    except:
-        return False
-
-def run_as_admin():
-    """Restart the script with administrator privileges."""
-    if sys.frozen:
-        # If running as exe, use the exe path
-        script = sys.executable
-    else:
-        # If running as script, use the script path
-        script = sys.argv[0]
-    params = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else ""
-    
-    ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{script}" {params}', None, 1)
-    sys.exit()
-
-# Request admin privileges on startup
-if not is_admin():
-    if DEBUG:
-        print("Requesting administrator privileges...")
-    run_as_admin()
-
-if DEBUG:
-    print("Running with administrator privileges.")
-
-# Import metric modules
-from gpu import get_gpu_metrics
-import cpu
-from ram import get_ram_metrics, clear_cache_mem
-from disk import get_disk_metrics, clear_temp_files
-import updater
-import media
-import psutil
-from system_info import get_system_info
-from network_monitor import get_network_stats, get_active_connections
-# Try to import remote desktop module, handle gracefully if not available
-try:
-    from remote_desktop import (
-        get_screen_frame, move_mouse, click_mouse, scroll_mouse,
-        press_key, type_text, get_screen_size
-    )
-    REMOTE_DESKTOP_AVAILABLE = True
-except ImportError:
-    REMOTE_DESKTOP_AVAILABLE = False
-    logger.warning("Remote desktop module not available. Install pyautogui to enable remote desktop features.")
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Setup logging
-logger = setup_logger('PCGamingApp')
-log = logging.getLogger('werkzeug')
-log.setLevel(logging.ERROR)
-
-# Try to import speedtest, handle gracefully if not available or incompatible
-try:
-    import speedtest
-    SPEEDTEST_CLI_AVAILABLE = True
-except (ImportError, AttributeError, ModuleNotFoundError) as e:
-    SPEEDTEST_CLI_AVAILABLE = False
-
-# Import custom speed test (always available)
-try:
-    from speedtest_custom import run_speed_test
-    SPEEDTEST_AVAILABLE = True
-except ImportError as e:
-    SPEEDTEST_AVAILABLE = False
-    logger.warning(f"Custom speed test not available: {e}")
-
-
-def get_ip_address() -> str:
-    """Get the local IP address of the machine"""
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(('8.8.8.8', 80))
-        ip_address = s.getsockname()[0]
-        s.close()
-        return ip_address
-    except Exception as e:
-        logger.warning(f"Could not determine IP address: {e}")
-        return '127.0.0.1'
-
-
-@app.route('/favicon.ico')
-def favicon():
-    """Serve favicon"""
-    return send_from_directory(LIB_FOLDER, 'cpu.png')
-
-
-@app.after_request
-def log_bad_requests(response):
-    """Log non-200 responses and add CORS headers"""
-    # Add CORS headers to allow requests from Qt WebEngine
-    response.headers['Access-Control-Allow-Origin'] = '*'
-    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-    
-    if response.status_code not in [200, 304]:
-        logger.warning(f"Bad Request: {request.method} {request.path} - Status {response.status_code}")
-    return response
-
-
-@app.route("/")
-def index():
-    """Main page route"""
-    ip_address = get_ip_address()
-    return render_template("index.html", ip_address=ip_address, version=APP_VERSION)
-
-
-# ==================== METRICS ENDPOINTS ====================
-
-@app.route("/metrics/cpu")
-@handle_api_errors
-def cpu_metrics():
-    """Get CPU metrics with caching"""
-    cached = metrics_cache.get('cpu')
-    if cached:
-        return jsonify(cached)
-    
-    try:
-        cpu_usage = psutil.cpu_percent(interval=0.1)
-        cpu_freq = psutil.cpu_freq()
-        current = cpu_freq.current if cpu_freq else None
-        max_freq = cpu_freq.max if cpu_freq else None
-        
-        temperature = cpu.get_cpu_temperature_metrics()
-        
-        data = {
-            "usage": round(cpu_usage, 2),
-            "Frequency-curent": round(current, 2) if current else "N/A",
-            "Frequency-max": round(max_freq, 2) if max_freq else "N/A",
-            "temperature": temperature if temperature else "N/A",
-        }
-        
-        metrics_cache.set('cpu', data)
-        return jsonify(data)
-    except Exception as e:
-        logger.error(f"Error fetching CPU metrics: {e}")
-        return jsonify({
-            "usage": "Unavailable",
-            "Frequency-current": "Unavailable",
-            "Frequency-max": "Unavailable",
-            "temperature": "Unavailable",
-        }), 500
-
-
-@app.route("/metrics/ram")
-@handle_api_errors
-def ram_metrics():
-    """Get RAM metrics with caching"""
-    cached = metrics_cache.get('ram')
-    if cached:
-        return jsonify(cached)
-    
-    try:
-        ram_metrics_data = get_ram_metrics()
-        metrics_cache.set('ram', ram_metrics_data)
-        return jsonify(ram_metrics_data)
-    except Exception as e:
-        logger.error(f"Error fetching RAM metrics: {e}")
-        return jsonify({
-            "usage": "Unavailable",
-            "total": "Unavailable",
-            "free": "Unavailable"
-        }), 500
-
-
-@app.route("/metrics/disk")
-@handle_api_errors
-def disk_metrics():
-    """Get disk metrics with caching"""
-    cached = metrics_cache.get('disk')
-    if cached:
-        return jsonify(cached)
-    
-    try:
-        disk_metrics_data = get_disk_metrics()
-        metrics_cache.set('disk', disk_metrics_data)
-        return jsonify(disk_metrics_data)
-    except Exception as e:
-        logger.error(f"Error fetching Disk metrics: {e}")
-        return jsonify({
-            "usage": "Unavailable",
-            "free_space": "Unavailable",
-            "read_speed": "Unavailable",
-            "write_speed": "Unavailable"
-        }), 500
-
-
-@app.route("/metrics/gpu")
-@handle_api_errors
-def gpu_metrics():
-    """Get GPU metrics with caching"""
-    cached = metrics_cache.get('gpu')
-    if cached:
-        return jsonify(cached)
-    
-    try:
-        gpu_metrics_data = get_gpu_metrics()
-        metrics_cache.set('gpu', gpu_metrics_data)
-        return jsonify(gpu_metrics_data)
-    except Exception as e:
-        logger.error(f"Error fetching GPU metrics: {e}")
-        return jsonify({
-            "name": "Unavailable",
-            "temperature": "Unavailable",
-            "utilization": "Unavailable",
-            "memory_used": "Unavailable",
-            "memory_total": "Unavailable"
-        }), 500
-
-
-# ==================== SPEED TEST ENDPOINT ====================
-
-@app.route("/speed_test", methods=["GET"])
-@handle_api_errors
-def speed_test_endpoint():
-    """Run internet speed test using custom implementation"""
-    if not SPEEDTEST_AVAILABLE:
-        return jsonify({
-            "error": "Speed test feature is not available.",
-            "available": False
-        }), 503
-    
-    try:
-        # Use custom speed test implementation
-        results = run_speed_test()
-        
-        if results["download_speed"] == 0 and results["upload_speed"] == 0:
-            return jsonify({
-                "error": "Speed test failed. Please check your internet connection and try again.",
-                "available": True
-            }), 500
-        
-        return jsonify({
-            "download_speed": f"{results['download_speed']:.2f}",
-            "upload_speed": f"{results['upload_speed']:.2f}",
-            "ping": f"{results['ping']:.2f}",
-            "available": True
-        })
-    except Exception as e:
-        logger.error(f"Error during speed test: {str(e)}")
-        return jsonify({
-            "error": f"Speed test failed: {str(e)}. Please try again later.",
-            "available": True
-        }), 500
-
-
-# ==================== AUDIO ENDPOINTS ====================
-
-from pycaw.pycaw import AudioUtilities
-from icon import icon_mapping
-
-
-def get_audio_sessions():
-    """Retrieve all active audio sessions"""
-    try:
-        sessions = AudioUtilities.GetAllSessions()
-        session_list = []
-        for session in sessions:
-            if session.Process:
-                app_name = session.Process.name()
-                volume = session.SimpleAudioVolume
-                session_list.append({
-                    "name": app_name,
-                    "icon": icon_mapping.get(app_name.lower(), "fas fa-volume-up"),
-                    "volume": round(volume.GetMasterVolume() * 100, 0) if volume else 0,
-                    "muted": volume.GetMute() if volume else False
-                })
-        return session_list
-    except Exception as e:
-        logger.error(f"Error getting audio sessions: {e}")
-        return []
-
-
-def set_volume(app_name: str, level: float):
-    """Set the volume level for a specific app"""
-    try:
-        sessions = AudioUtilities.GetAllSessions()
-        for session in sessions:
-            if session.Process and session.Process.name() == app_name:
-                volume = session.SimpleAudioVolume
-                if level == 0:  # Mute
-                    volume.SetMute(1, None)
-                elif level > 0:  # Set specific volume
-                    volume.SetMute(0, None)
-                    volume.SetMasterVolume(min(level, 1.0), None)
-                return True
-        return False
-    except Exception as e:
-        logger.error(f"Error setting volume: {e}")
-        return False
-
-
-@app.route('/get_audio_sessions', methods=['GET'])
-@handle_api_errors
-def get_sessions():
-    """Endpoint to fetch all audio sessions"""
-    sessions = get_audio_sessions()
-    return jsonify({"sessions": sessions})
-
-
-@app.route('/set_volume', methods=['POST'])
-@handle_api_errors
-def handle_volume():
-    """Endpoint to handle volume actions"""
-    data = request.json
-    app_name = data.get("app_name")
-    level = data.get("level")
-    
-    if not app_name or level is None:
-        return jsonify({"error": "Invalid data"}), 400
-    
-    success = set_volume(app_name, level)
-    if success:
-        return jsonify({"message": f"Volume updated for {app_name}"}), 200
-    else:
-        return jsonify({"error": f"App {app_name} not found"}), 404
-
-
-# ==================== SYSTEM ACTION ENDPOINTS ====================
-
-@app.route("/clear_cache", methods=["POST"])
-@handle_api_errors
-def clear_cache():
-    """Clear system cache/memory"""
-    try:
-        clear_cache_mem()
-        metrics_cache.clear()  # Clear metrics cache
-        return jsonify({"status": "success", "message": "Memory cache cleared successfully"}), 200
-    except PermissionError as e:
-        logger.warning(f"Permission denied clearing cache: {e}")
-        return jsonify({
-            "status": "error",
-            "message": str(e),
-            "requires_admin": True
-        }), 403
-    except FileNotFoundError as e:
-        logger.error(f"File not found clearing cache: {e}")
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 404
-    except Exception as e:
-        logger.error(f"Error clearing cache: {e}")
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
-
-
-@app.route("/clear_temp_files", methods=["POST"])
-@handle_api_errors
-def clear_temp_files_route():
-    """Clear temporary files"""
-    try:
-        results = clear_temp_files()
-        message = (
-            f"Cleared {results['total_deleted']} files. "
-            f"Skipped {results['total_skipped']} files in use."
-        )
-        if results['total_errors'] > 0:
-            message += f" {results['total_errors']} errors occurred."
-        
-        return jsonify({
-            "status": "success",
-            "message": message,
-            "details": results
-        }), 200
-    except Exception as e:
-        logger.error(f"Error clearing temp files: {e}")
-        return jsonify({
-            "status": "error",
-            "message": str(e)
-        }), 500
-
-
-# ==================== PROCESS MANAGER ENDPOINTS ====================
-
-# ==================== SYSTEM INFO ENDPOINTS ====================
-
-@app.route('/system_info', methods=['GET'])
-@handle_api_errors
-def system_info_endpoint():
-    """Get detailed system information"""
-    try:
-        info = get_system_info()
-        return jsonify(info)
-    except Exception as e:
-        logger.error(f"Error getting system info: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-# ==================== NETWORK MONITOR ENDPOINTS ====================
-
-@app.route('/network_stats', methods=['GET'])
-@handle_api_errors
-def network_stats_endpoint():
-    """Get real-time network statistics"""
-    try:
-        stats = get_network_stats()
-        return jsonify(stats)
-    except Exception as e:
-        logger.error(f"Error getting network stats: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/network_connections', methods=['GET'])
-@handle_api_errors
-def network_connections_endpoint():
-    """Get active network connections"""
-    try:
-        limit = int(request.args.get('limit', 20))
-        connections = get_active_connections(limit=limit)
-        return jsonify({'connections': connections})
-    except Exception as e:
-        logger.error(f"Error getting network connections: {e}")
-        return jsonify({'error': str(e), 'connections': []}), 500
-
-
-# ==================== REMOTE DESKTOP ENDPOINTS ====================
-
-@app.route('/remote/screen_size', methods=['GET'])
-@handle_api_errors
-def get_screen_size_endpoint():
-    """Get screen size"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({'error': 'Remote desktop feature is not available.', 'available': False}), 503
-    try:
-        width, height = get_screen_size()
-        return jsonify({'width': width, 'height': height, 'available': True})
-    except Exception as e:
-        logger.error(f"Error getting screen size: {e}")
-        return jsonify({'error': str(e), 'width': 1920, 'height': 1080, 'available': True}), 500
-
-
-@app.route('/remote/frame', methods=['GET'])
-@handle_api_errors
-def get_screen_frame_endpoint():
-    """Get current screen frame"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({
-            'error': 'Remote desktop feature is not available. Please install pyautogui.',
-            'available': False
-        }), 503
-    
-    try:
-        img_base64, timestamp = get_screen_frame()
-        return jsonify({
-            'image': img_base64,
-            'format': 'png',
-            'timestamp': timestamp,
-            'available': True
-        })
-    except Exception as e:
-        logger.error(f"Error getting screen frame: {e}")
-        return jsonify({'error': str(e), 'available': True}), 500
-
-
-@app.route('/remote/mouse/move', methods=['POST'])
-@handle_api_errors
-def mouse_move_endpoint():
-    """Move mouse"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({'error': 'Remote desktop not available'}), 503
-    
-    try:
-        data = request.json
-        x = float(data.get('x', 0))
-        y = float(data.get('y', 0))
-        relative = data.get('relative', False)
-        
-        if move_mouse(x, y, relative):
-            return jsonify({'status': 'success'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to move mouse'}), 500
-    except Exception as e:
-        logger.error(f"Error moving mouse: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/remote/mouse/click', methods=['POST'])
-@handle_api_errors
-def mouse_click_endpoint():
-    """Click mouse at current position (does not move mouse)"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({'error': 'Remote desktop not available'}), 503
-    
-    try:
-        data = request.json
-        button = data.get('button', 'left')
-        # Ignore x, y coordinates - always click at current mouse position
-        # This prevents the mouse from jumping around, especially in multi-monitor setups
-        if click_mouse(button, None, None):
-            return jsonify({'status': 'success'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to click'}), 500
-    except Exception as e:
-        logger.error(f"Error clicking mouse: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/remote/mouse/scroll', methods=['POST'])
-@handle_api_errors
-def mouse_scroll_endpoint():
-    """Scroll mouse"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({'error': 'Remote desktop not available'}), 503
-    
-    try:
-        data = request.json
-        x = float(data.get('x', 0))
-        y = float(data.get('y', 0))
-        clicks = int(data.get('clicks', 0))
-        
-        if scroll_mouse(x, y, clicks):
-            return jsonify({'status': 'success'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to scroll'}), 500
-    except Exception as e:
-        logger.error(f"Error scrolling mouse: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/remote/keyboard/press', methods=['POST'])
-@handle_api_errors
-def keyboard_press_endpoint():
-    """Press a key"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({'error': 'Remote desktop not available'}), 503
-    
-    try:
-        data = request.json
-        key = data.get('key')
-        
-        if not key:
-            return jsonify({'error': 'Key is required'}), 400
-        
-        if press_key(key):
-            return jsonify({'status': 'success'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to press key'}), 500
-    except Exception as e:
-        logger.error(f"Error pressing key: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/remote/keyboard/type', methods=['POST'])
-@handle_api_errors
-def keyboard_type_endpoint():
-    """Type text"""
-    if not REMOTE_DESKTOP_AVAILABLE:
-        return jsonify({'error': 'Remote desktop not available'}), 503
-    
-    try:
-        data = request.json
-        text = data.get('text', '')
-        
-        if type_text(text):
-            return jsonify({'status': 'success'})
-        else:
-            return jsonify({'status': 'error', 'message': 'Failed to type text'}), 500
-    except Exception as e:
-        logger.error(f"Error typing text: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-# ==================== FILE EXPLORER ENDPOINTS ====================
-
-@app.route('/files/list', methods=['GET'])
-@handle_api_errors
-def list_files_endpoint():
-    """List files in a directory"""
-    try:
-        path = request.args.get('path', '~')
-        logger.debug(f"File list request for path: {path}")
-        
-        # Expand ~ to home directory
-        if path == '~' or path.startswith('~/'):
-            path = os.path.expanduser(path)
-        
-        # Convert to absolute path
-        path = os.path.abspath(path)
-        home_dir = os.path.abspath(os.path.expanduser('~'))
-        
-        logger.debug(f"Expanded path: {path}, Home dir: {home_dir}")
-        
-        # Security: prevent directory traversal - only allow access to home directory and subdirectories
-        if not path.startswith(home_dir):
-            logger.warning(f"Access denied for path: {path}")
-            return jsonify({'error': 'Access denied. Only home directory access is allowed.'}), 403
-        
-        if not os.path.exists(path):
-            logger.warning(f"Path does not exist: {path}")
-            return jsonify({'error': f'Path does not exist: {path}'}), 404
-        
-        if not os.path.isdir(path):
-            logger.warning(f"Path is not a directory: {path}")
-            return jsonify({'error': 'Path is not a directory'}), 400
-        
-        files = []
-        dirs = []
-        
-        try:
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                try:
-                    stat = os.stat(item_path)
-                    item_info = {
-                        'name': item,
-                        'path': item_path,
-                        'size': stat.st_size,
-                        'is_dir': os.path.isdir(item_path),
-                        'modified': stat.st_mtime
-                    }
-                    if os.path.isdir(item_path):
-                        dirs.append(item_info)
-                    else:
-                        files.append(item_info)
-                except (OSError, PermissionError):
-                    pass
-            
-            # Sort: directories first, then files
-            dirs.sort(key=lambda x: x['name'].lower())
-            files.sort(key=lambda x: x['name'].lower())
-            
-            return jsonify({
-                'path': path,
-                'items': dirs + files
-            })
-        except PermissionError:
-            return jsonify({'error': 'Permission denied'}), 403
-    except Exception as e:
-        logger.error(f"Error listing files: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-@app.route('/files/download', methods=['GET'])
-@handle_api_errors
-def download_file_endpoint():
-    """Download a file"""
-    try:
-        file_path = request.args.get('path')
-        
-        if not file_path:
-            return jsonify({'error': 'File path is required'}), 400
-        
-        # Security check
-        if not os.path.abspath(file_path).startswith(os.path.abspath(os.path.expanduser('~'))):
-            return jsonify({'error': 'Access denied'}), 403
-        
-        if not os.path.exists(file_path) or os.path.isdir(file_path):
-            return jsonify({'error': 'File not found'}), 404
-        
-        directory = os.path.dirname(file_path)
-        filename = os.path.basename(file_path)
-        
-        return send_from_directory(directory, filename, as_attachment=True)
-    except Exception as e:
-        logger.error(f"Error downloading file: {e}")
-        return jsonify({'error': str(e)}), 500
-
-
-# ==================== UPDATE ENDPOINTS ====================
-
-@app.route('/get-app-version', methods=['GET'])
-def get_app_version():
-    """Get current app version"""
-    return jsonify({'version': APP_VERSION})
-
-
-@app.route('/check-update', methods=['GET'])
-@handle_api_errors
-def check_update():
-    """Check if an update is available"""
-    try:
-        is_update_available = updater.check_update()
-        return jsonify(is_update_available)
-    except Exception as e:
-        logger.error(f"Error checking for updates: {e}")
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route('/update', methods=['POST'])
-@handle_api_errors
-def update():
-    """Trigger the update process"""
-    try:
-        updater.update_app()
-        return jsonify({'status': 'Updating...'}), 200
-    except Exception as e:
-        logger.error(f"Error during update: {e}")
-        return jsonify({'status': f'Error during update: {e}'}), 500
-
-
-# ==================== SYSTEM CONTROL ENDPOINTS ====================
-
-@app.route('/shutdown', methods=['POST'])
-@handle_api_errors
-def shutdown():
-    """Shutdown the system"""
-    try:
-        os.system("shutdown /s /t 1")
-        return jsonify({"message": "System shutting down"}), 200
-    except Exception as e:
-        logger.error(f"Error shutting down: {e}")
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route('/restart', methods=['POST'])
-@handle_api_errors
-def restart():
-    """Restart the system"""
-    try:
-        os.system("shutdown /r /t 1")
-        return jsonify({"message": "System restarting"}), 200
-    except Exception as e:
-        logger.error(f"Error restarting: {e}")
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route('/logout', methods=['POST'])
-@handle_api_errors
-def logout():
-    """Logout current user"""
-    try:
-        os.system("shutdown /l")
-        return jsonify({"message": "User logged out"}), 200
-    except Exception as e:
-        logger.error(f"Error logging out: {e}")
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route('/lock', methods=['POST'])
-@handle_api_errors
-def lock():
-    """Lock the system"""
-    try:
-        os.system("rundll32.exe user32.dll,LockWorkStation")
-        return jsonify({"message": "System locked"}), 200
-    except Exception as e:
-        logger.error(f"Error locking system: {e}")
-        return jsonify({"error": str(e)}), 500
-
-
-@app.route('/exit', methods=['POST'])
-@handle_api_errors
-def exit_app():
-    """Close/exit the application (terminates the exe process)"""
-    try:
-        logger.info("Application exit requested")
-        # Schedule exit in a separate thread to allow response to be sent
-        import threading
-        def force_exit():
-            import time
-            time.sleep(0.5)  # Give time for response to be sent
-            # Force exit - this will terminate the exe process
-            os._exit(0)
-        
-        shutdown_thread = threading.Thread(target=force_exit)
-        shutdown_thread.daemon = True
-        shutdown_thread.start()
-        
-        return jsonify({"message": "Application closing..."}), 200
-    except Exception as e:
-        logger.error(f"Error exiting application: {e}")
-        # Force exit as fallback
-        import threading
-        threading.Timer(0.5, lambda: os._exit(0)).start()
-        return jsonify({"message": "Application closing..."}), 200
-
-
-# ==================== MEDIA ENDPOINTS ====================
-
-@app.route('/media/<command>', methods=['POST'])
-@handle_api_errors
-def execute_command(command):
-    """Execute media control commands"""
-    valid_commands = ['prev_track', 'play_pause', 'next_track']
-    
-    if command not in valid_commands:
-        return jsonify({"error": "Invalid command"}), 400
-    
-    try:
-        media.send_media_key(command)
-        return jsonify({"message": f"Command '{command}' executed successfully!"})
-    except Exception as e:
-        logger.error(f"Error executing media command: {e}")
-        return jsonify({"error": str(e)}), 500
-
-
-# ==================== STARTUP ====================
-
-def startup_message():
-    """Display startup message with IP and port"""
-    print("=" * 60)
-    print("\n🚀 PC Gaming App is running!")
-    print("   Closing this window will stop the app.\n")
-    
-    ip_address = get_ip_address()
-    port = SERVER_PORT
-    link = f"http://{ip_address}:{port}"
-    
-    print(f"📱 Access on your phone: {link}")
-    print(f"💻 Access on this PC: http://localhost:{port}")
-    print("=" * 60)
-    
-    # Check for updates on startup
-    print("\n🔍 Checking for updates...")
-    try:
-        if updater.check_update():
-            latest_version = updater.get_latest_tag_name()
-            print(f"⚠️  UPDATE AVAILABLE!")
-            print(f"   Current version: {APP_VERSION}")
-            print(f"   Latest version: {latest_version}")
-            print(f"   Check the web interface to update.\n")
-        else:
-            print(f"✅ You are running the latest version ({APP_VERSION})\n")
-    except Exception as e:
-        logger.warning(f"Could not check for updates on startup: {e}")
-        print(f"⚠️  Could not check for updates. Will check in web interface.\n")
-    
-    print(r"""
-           /\     /\
-          {  `---'  }
-          {  O   O  }
-          ~~>  V  <~~
-           \  \|/  /
-            `-----'____
-            /     \    \_
-           {  **   }\  )_\_   _
-           |  \_/  |/ /  \_\_/ )
-            \__/  /(_/     \__/
-              (__/
-    """)
+PC Gaming App - Entry point
 
+Imports nothing of the app at module level: the frame encode pool's worker
+processes are spawned, re-run this file as __mp_main__ and must not load the
+server (and its capture, sampler and Flask state) just to encode frames.
+"""
+import multiprocessing
 
 if __name__ == "__main__":
-    startup_message()
-    
-    ip_address = get_ip_address()
-    url = f'http://{ip_address}:{SERVER_PORT}'
-    
-    # Check if we should use standalone window or browser
-    use_standalone_window = True  # Set to False to use browser instead
-    
-    if use_standalone_window:
-        try:
-            from PyQt5.QtWidgets import QApplication
-            from PyQt5.QtCore import QUrl, QSettings
-            from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineSettings
-            import sys
-            
-            def run_flask_server():
-                """Run Flask server in a separate thread"""
-                WSGIRequestHandler.protocol_version = "HTTP/1.1"
-                # Use 0.0.0.0 to allow access from other devices on the network
-                # The standalone window will connect via localhost, but other devices can use the IP
-                host = '0.0.0.0'  # Listen on all interfaces
-                logger.info(f"Starting server on {host}:{SERVER_PORT}")
-                if DEBUG:
-                    logger.info(f"Access from this PC: http://127.0.0.1:{SERVER_PORT}")
-                    logger.info(f"Access from network: http://{get_ip_address()}:{SERVER_PORT}")
-                try:
-                    # Use Werkzeug's development server directly for better thread compatibility
-                    from werkzeug.serving import make_server
-                    server = make_server(host, SERVER_PORT, app, threaded=True)
-                    logger.info(f"Server started successfully on {host}:{SERVER_PORT}")
-                    server.serve_forever()
-                except Exception as e:
-                    logger.error(f"Flask server error: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-            
-            # Start Flask server in a separate thread (daemon=True so it stops when main thread exits)
-            server_thread = threading.Thread(target=run_flask_server, daemon=True)
-            server_thread.start()
-            
-            # Wait for server to fully start with better checking
-            max_wait = 10
-            waited = 0
-            server_ready = False
-            while waited < max_wait:
-                try:
-                    import urllib.request
-                    import socket
-                    # First check if port is open
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(1)
-                    result = sock.connect_ex(('127.0.0.1', SERVER_PORT))
-                    sock.close()
-                    if result == 0:
-                        # Port is open, try HTTP request
-                        response = urllib.request.urlopen(f'http://127.0.0.1:{SERVER_PORT}', timeout=2)
-                        if response.getcode() == 200:
-                            logger.info("Server is ready!")
-                            server_ready = True
-                            break
-                except Exception as e:
-                    pass
-                time.sleep(0.5)
-                waited += 0.5
-                if waited % 1 == 0:  # Log every second
-                    logger.info(f"Waiting for server to start... ({waited:.1f}s)")
-            
-            if not server_ready:
-                logger.error(f"Server failed to start after {max_wait} seconds!")
-                logger.error("Falling back to browser mode...")
-                # Fallback to browser
-                ip_address = get_ip_address()
-                fallback_url = f'http://{ip_address}:{SERVER_PORT}'
-                if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-                    try:
-                        webbrowser.open(fallback_url)
-                    except Exception as e:
-                        logger.warning(f"Could not open browser: {e}")
-                WSGIRequestHandler.protocol_version = "HTTP/1.1"
-                logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
-                app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
-            else:
-                # Server is ready, create the window
-                # Create Qt application
-                qt_app = QApplication(sys.argv)
-                qt_app.setApplicationName("PC Gaming Monitor")
-                
-                # Set application icon
-                from PyQt5.QtGui import QIcon
-                icon_path = str(BASE_DIR / 'icon.png')
-                if os.path.exists(icon_path):
-                    qt_app.setWindowIcon(QIcon(icon_path))
-                    logger.info(f"Set application icon: {icon_path}")
-                else:
-                    logger.warning(f"Icon not found at {icon_path}")
-                
-                # Enable local content access for Qt WebEngine
-                QWebEngineSettings.globalSettings().setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
-                QWebEngineSettings.globalSettings().setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
-                
-                # Create web view window
-                browser = QWebEngineView()
-                browser.setWindowTitle("PC Gaming Monitor")
-                browser.resize(1400, 900)
-                browser.setMinimumSize(800, 600)
-                
-                # Set window icon
-                if os.path.exists(icon_path):
-                    browser.setWindowIcon(QIcon(icon_path))
-                
-                # Enable JavaScript and other features
-                settings = browser.settings()
-                settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
-                settings.setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
-                settings.setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
-                
-                # Enable JavaScript console logging only in debug mode
-                if DEBUG:
-                    from PyQt5.QtWebEngineWidgets import QWebEnginePage
-                    
-                    class ConsolePage(QWebEnginePage):
-                        def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
-                            level_str = {0: 'INFO', 1: 'WARNING', 2: 'ERROR'}.get(level, 'UNKNOWN')
-                            logger.info(f"JS Console [{level_str}]: {message} (line {lineNumber})")
-                    
-                    # Set custom page with console logging
-                    console_page = ConsolePage(browser)
-                    browser.setPage(console_page)
-                
-                # Load the URL after server is confirmed ready (use 127.0.0.1 explicitly)
-                app_url = f'http://127.0.0.1:{SERVER_PORT}'
-                url = QUrl(app_url)
-                
-                # Add a small delay to ensure server is fully ready
-                time.sleep(0.5)
-                
-                if DEBUG:
-                    logger.info(f"Loading URL: {app_url}")
-                browser.load(url)
-                browser.show()
-                
-                logger.info(f"Opening application window at {app_url}...")
-                logger.info("If you see 'Loading...' messages, check the console for server errors.")
-                
-                # Run the Qt event loop (this blocks until window is closed)
-                qt_app.exec_()
-                
-                # When window closes, the daemon thread will be cleaned up automatically
-                logger.info("Window closed.")
-            
-            # Create Qt application
-            qt_app = QApplication(sys.argv)
-            qt_app.setApplicationName("PC Gaming Monitor")
-            
-            # Create web view window
-            browser = QWebEngineView()
-            browser.setWindowTitle("PC Gaming Monitor")
-            browser.resize(1400, 900)
-            browser.setMinimumSize(800, 600)
-            
-            # Load the URL after server is confirmed ready (use 127.0.0.1 explicitly)
-            url = QUrl(f'http://127.0.0.1:{SERVER_PORT}')
-            browser.load(url)
-            browser.show()
-            
-            logger.info(f"Opening application window at {url.toString()}...")
-            
-            # Run the Qt event loop (this blocks until window is closed)
-            qt_app.exec_()
-            
-            # When window closes, the daemon thread will be cleaned up automatically
-            logger.info("Window closed.")
-            
-        except ImportError as e:
-            logger.warning(f"PyQt5 not available: {e}")
-            logger.info("Install with: pip install PyQt5 PyQtWebEngine")
-            logger.info("Falling back to browser mode...")
-            # Fallback to browser
-            if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-                try:
-                    webbrowser.open(url)
-                except Exception as e:
-                    logger.warning(f"Could not open browser: {e}")
-            WSGIRequestHandler.protocol_version = "HTTP/1.1"
-            logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
-            app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
-        except Exception as e:
-            logger.error(f"Error starting standalone window: {e}")
-            logger.info("Falling back to browser mode...")
-            # Fallback to browser
-            if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-                try:
-                    webbrowser.open(url)
-                except Exception as e:
-                    logger.warning(f"Could not open browser: {e}")
-            WSGIRequestHandler.protocol_version = "HTTP/1.1"
-            logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
-            app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
-    else:
-        # Use browser mode
-        if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
-            try:
-                webbrowser.open(url)
-            except Exception as e:
-                logger.warning(f"Could not open browser: {e}")
-        WSGIRequestHandler.protocol_version = "HTTP/1.1"
-        logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
-        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
+    # Must come first: in the frozen exe an encode pool worker process starts
+    # here and runs its task and exits inside this call
+    multiprocessing.freeze_support()
+
+    from server import main
+    main()
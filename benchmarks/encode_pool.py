@@ -0,0 +1,93 @@
+"""
+Benchmark - In-thread vs process pool frame encoding
+
+Several viewer threads encode frames as fast as they can while a "metrics"
+thread does small pure-Python work every 10 ms, the way /metrics does next to
+a remote session. Reports encode throughput and how late the metrics ticks
+run, first with in-thread encoding and then with the shared-memory
+EncodePool.
+
+Run: python benchmarks/encode_pool.py [--viewers 3 --workers 2 --seconds 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from capture_hub import Frame
+from encode_pool import EncodePool
+from frame_encoding import synthetic_desktop
+
+
+def metrics_ticks(stop, delays):
+    """Wake every 10 ms, do a little work, and record how late each wake was"""
+    interval = 0.01
+    next_tick = time.perf_counter() + interval
+    while not stop.is_set():
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+        delays.append(time.perf_counter() - next_tick)
+        sum(i * i for i in range(2000))
+        next_tick += interval
+
+
+def run(image, args, pool):
+    stop = threading.Event()
+    delays = []
+    counts = [0] * args.viewers
+    size = (image.width // 2, image.height // 2)
+
+    def viewer(index):
+        # Distinct quality per viewer so every viewer really encodes
+        quality = 60 + index
+        while not stop.is_set():
+            frame = Frame(image, time.time())
+            frame.encoded(size, 'jpeg', quality, pool=pool)
+            counts[index] += 1
+
+    threads = [threading.Thread(target=metrics_ticks, args=(stop, delays))]
+    threads += [threading.Thread(target=viewer, args=(index,)) for index in range(args.viewers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    delays_ms = sorted(delay * 1000 for delay in delays)
+    return {
+        'fps': sum(counts) / args.seconds,
+        'median': statistics.median(delays_ms),
+        'p99': delays_ms[int(len(delays_ms) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=2560)
+    parser.add_argument('--height', type=int, default=1440)
+    parser.add_argument('--viewers', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    args = parser.parse_args()
+
+    image = synthetic_desktop(args.width, args.height)
+    print(f"Frame size: {args.width}x{args.height}, {args.viewers} viewers, {os.cpu_count()} CPUs\n")
+
+    pool = EncodePool(workers=args.workers, slots=args.viewers + 1)
+    # Start the workers before timing
+    Frame(image, time.time()).encoded((64, 36), 'jpeg', 70, pool=pool)
+    try:
+        for label, encode_pool in (('in-thread', None), (f"pool ({args.workers} workers)", pool)):
+            result = run(image, args, encode_pool)
+            print(f"{label:<20} {result['fps']:7.1f} frames/s   "
+                  f"metrics delay median {result['median']:6.2f} ms  p99 {result['p99']:6.2f} ms")
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark - File download throughput and server CPU
+
+Serves one large file from a Werkzeug server in a child process, first with
+Flask's send_from_directory and then with file_transfer.send_file_range
+(sendfile), downloads it over loopback and reports throughput and the
+server's CPU time per GB. A ranged pass downloads the file in parallel
+chunks the way a download manager would.
+
+The test file is sparse, so creating it is instant and reads come from the
+page cache; the numbers measure the serving path, not the disk.
+
+Run: python benchmarks/file_download.py [--size-gb 2 --chunks 4]
+"""
+import argparse
+import http.client
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def serve(path, port, mode):
+    from flask import Flask, request, send_from_directory
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from file_transfer import send_file_range
+
+    app = Flask(__name__)
+
+    @app.route('/file')
+    def download():
+        if mode == 'flask':
+            return send_from_directory(os.path.dirname(path), os.path.basename(path), as_attachment=True)
+        return send_file_range(request, path)
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    WSGIRequestHandler.protocol_version = "HTTP/1.1"
+    make_server('127.0.0.1', port, app, threaded=True).serve_forever()
+
+
+def fetch(port, byte_range=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    headers = {'Range': f"bytes={byte_range[0]}-{byte_range[1] - 1}"} if byte_range else {}
+    connection.request('GET', '/file', headers=headers)
+    response = connection.getresponse()
+    buffer = bytearray(1024 * 1024)
+    received = 0
+    while True:
+        count = response.readinto(buffer)
+        if not count:
+            break
+        received += count
+    connection.close()
+    return received
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Server did not start")
+
+
+def measure(path, size, mode, chunks):
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen([sys.executable, __file__, '--serve', mode, '--port', str(port), '--path', path])
+    try:
+        wait_for_port(port)
+        process = psutil.Process(server.pid)
+        cpu_before = sum(process.cpu_times()[:2])
+        started = time.perf_counter()
+        if chunks > 1:
+            step = -(-size // chunks)
+            threads = [threading.Thread(target=fetch, args=(port, (start, min(start + step, size))))
+                       for start in range(0, size, step)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        else:
+            received = fetch(port)
+            assert received == size, f"received {received} of {size} bytes"
+        elapsed = time.perf_counter() - started
+        cpu = sum(process.cpu_times()[:2]) - cpu_before
+    finally:
+        server.terminate()
+        server.wait()
+    gigabytes = size / 1024 ** 3
+    return size / elapsed / 1024 ** 2, cpu / gigabytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-gb', type=float, default=2.0)
+    parser.add_argument('--chunks', type=int, default=4, help="parallel ranges in the ranged pass")
+    parser.add_argument('--serve', choices=('flask', 'range'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--path', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.path, args.port, args.serve)
+        return
+
+    size = int(args.size_gb * 1024 ** 3)
+    handle, path = tempfile.mkstemp(suffix='.bin')
+    try:
+        os.truncate(handle, size)
+        os.close(handle)
+        print(f"File size: {args.size_gb} GB, {os.cpu_count()} CPUs, sendfile: {hasattr(os, 'sendfile')}\n")
+        passes = (
+            ('send_from_directory', 'flask', 1),
+            ('send_file_range', 'range', 1),
+            (f"send_file_range x{args.chunks}", 'range', args.chunks),
+        )
+        for label, mode, chunks in passes:
+            throughput, cpu_per_gb = measure(path, size, mode, chunks)
+            print(f"{label:<24} {throughput:8.1f} MB/s   server CPU {cpu_per_gb:6.2f} s/GB")
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark - Remote desktop frame encoding
+
+Compares the legacy path (PNG with optimize=True, base64, JSON) against raw
+JPEG/WebP frames from frame_encoder on a synthetic 1440p desktop image.
+
+Run: python benchmarks/frame_encoding.py [--width 2560 --height 1440 --frames 10]
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import sys
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from frame_encoder import FrameEncoder
+
+
+def synthetic_desktop(width, height, seed=0):
+    """Build a desktop-like image: gradient wallpaper, windows and text noise"""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[..., 0] = (x * 0.3 + y * 0.2).astype(np.uint8)
+    pixels[..., 1] = (x * 0.1 + y * 0.4).astype(np.uint8)
+    pixels[..., 2] = (120 + y * 0.5).clip(0, 255).astype(np.uint8)
+    image = Image.fromarray(pixels, 'RGB')
+
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        left, top = rng.integers(0, width // 2), rng.integers(0, height // 2)
+        right, bottom = left + rng.integers(300, width // 2), top + rng.integers(200, height // 2)
+        draw.rectangle([left, top, right, bottom], fill=(245, 245, 245), outline=(60, 60, 60))
+        for line in range(top + 30, bottom - 10, 18):
+            draw.text((left + 10, line), ''.join(rng.choice(list('abcdefghij klmnop'), 60)), fill=(20, 20, 20))
+    return image
+
+
+def legacy_encode(image):
+    """The original get_screen_frame() + /remote/frame response path"""
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True, quality=85)
+    payload = base64.b64encode(buffer.getvalue()).decode('utf-8')
+    return json.dumps({'image': payload, 'format': 'png', 'timestamp': time.time(), 'available': True}).encode()
+
+
+def measure(label, encode, image, frames):
+    encode(image)  # warm-up
+    start = time.perf_counter()
+    size = 0
+    for _ in range(frames):
+        size = len(encode(image))
+    elapsed = (time.perf_counter() - start) / frames
+    print(f"{label:<22} {elapsed * 1000:9.1f} ms/frame {size / 1024:10.1f} KiB/frame {1 / elapsed:7.1f} fps")
+    return elapsed, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--width', type=int, default=2560)
+    parser.add_argument('--height', type=int, default=1440)
+    parser.add_argument('--frames', type=int, default=10)
+    args = parser.parse_args()
+
+    image = synthetic_desktop(args.width, args.height)
+    encoder = FrameEncoder()
+    print(f"Frame size: {args.width}x{args.height}, {args.frames} frames per encoder\n")
+
+    base_time, base_size = measure('png+base64+json', legacy_encode, image, max(1, args.frames // 5))
+    for fmt in ('jpeg', 'webp'):
+        for quality in (50, 70, 85):
+            elapsed, size = measure(
+                f"{fmt} q={quality}", lambda img: encoder.encode(img, fmt, quality), image, args.frames
+            )
+            print(f"{'':<22} {base_time / elapsed:9.1f}x faster {base_size / size:9.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
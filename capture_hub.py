@@ -0,0 +1,240 @@
+"""
+Capture Hub - One shared capture loop fanned out to every remote viewer
+
+A single background thread captures the screen at the highest frame rate any
+viewer asks for and publishes each capture into a latest-frame slot. Viewers
+read from the slot, and every (size, format, quality) variant of a frame is
+resized and encoded at most once no matter how many viewers want it. The
+loop stops on its own when nobody is watching.
+"""
+import logging
+import threading
+import time
+
+from frame_encoder import encode_frame, resize_frame
+from latency import latency_tracker
+
+logger = logging.getLogger('PCGamingApp')
+
+
+class LatestFrame:
+    """
+    Single-slot frame buffer
+
+    The producer overwrites the slot on every frame, so a consumer that falls
+    behind always gets the newest frame and stale ones are dropped instead of
+    queueing up.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame = None
+        self._seq = 0
+
+    def publish(self, frame):
+        """Store a frame, numbering it (frame.seq) before any waiter wakes"""
+        with self._condition:
+            self._seq += 1
+            frame.seq = self._seq
+            self._frame = frame
+            self._condition.notify_all()
+            return self._seq
+
+    def latest(self):
+        with self._condition:
+            return self._seq, self._frame
+
+    def wait(self, after_seq, timeout=None):
+        """
+        Wait for a frame newer than after_seq
+
+        Returns:
+            Tuple (seq, frame), or (after_seq, None) on timeout
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._seq > after_seq, timeout):
+                return after_seq, None
+            return self._seq, self._frame
+
+
+class Frame:
+    """A captured frame and the variants derived from it"""
+
+    def __init__(self, image, timestamp):
+        self.seq = 0
+        # Last input (latency_tracker.applied_seq) applied before the capture
+        self.input_seq = 0
+        self.image = image
+        self.timestamp = timestamp
+        self._lock = threading.Lock()
+        self._variant_locks = {}
+        self._resized = {}
+        self._encoded = {}
+        self._shared = None
+
+    def _variant_lock(self, key):
+        with self._lock:
+            lock = self._variant_locks.get(key)
+            if lock is None:
+                lock = self._variant_locks[key] = threading.Lock()
+            return lock
+
+    def resized(self, size):
+        """Get this frame downscaled to `size`, computed once per size"""
+        size = tuple(size)
+        if size == self.image.size:
+            return self.image
+        with self._variant_lock(('resize', size)):
+            image = self._resized.get(size)
+            if image is None:
+                image = self._resized[size] = resize_frame(self.image, size)
+            return image
+
+    def shared(self, pool):
+        """Get this frame's pixels in a shared memory slot, copied once"""
+        with self._variant_lock('shared'):
+            if self._shared is None:
+                self._shared = pool.attach(self, self.image)
+            return self._shared
+
+    def encoded(self, size, fmt, quality, stats=None, pool=None):
+        """
+        Get this frame resized and encoded, computed once per variant
+
+        With an EncodePool the work runs in a worker process; without one, or
+        when no shared slot is free, it runs in the calling thread.
+        """
+        key = (tuple(size), fmt, quality)
+        with self._variant_lock(key):
+            data = self._encoded.get(key)
+            if data is None:
+                started = time.monotonic()
+                shared = self.shared(pool) if pool is not None else None
+                if shared is not None:
+                    data = pool.encode(shared, size, fmt, quality)
+                else:
+                    data = encode_frame(self.resized(size), fmt, quality)
+                self._encoded[key] = data
+                latency_tracker.record('encode', time.monotonic() - started)
+                if stats is not None:
+                    stats['encodes'] += 1
+            elif stats is not None:
+                stats['encode_hits'] += 1
+            return data
+
+
+class CaptureHub:
+    """Shared capture loop with subscriber-driven frame rate and idle shutdown"""
+
+    def __init__(self, capture, idle_timeout=2.0, pool=None):
+        self.capture = capture
+        self.pool = pool
+        self.idle_timeout = idle_timeout
+        self.slot = LatestFrame()
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._next_token = 1
+        self._poll_fps = 0.0
+        self._poll_until = 0.0
+        self._thread = None
+        self._wake = threading.Event()
+        self.stats = {'captures': 0, 'encodes': 0, 'encode_hits': 0}
+
+    def subscribe(self, controller):
+        """
+        Register a streaming viewer; its controller.fps drives the capture rate
+
+        Returns:
+            Token for unsubscribe()
+        """
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = controller
+            self._ensure_running()
+            return token
+
+    def unsubscribe(self, token):
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def touch(self, fps):
+        """Keep the loop alive for a polling viewer for idle_timeout seconds"""
+        with self._lock:
+            self._poll_fps = fps
+            self._poll_until = time.monotonic() + self.idle_timeout
+            self._ensure_running()
+
+    def wait(self, after_seq, timeout=None):
+        """
+        Wait for a frame newer than after_seq
+
+        Returns:
+            Frame, or None on timeout
+        """
+        _, frame = self.slot.wait(after_seq, timeout)
+        return frame
+
+    def poll(self, fps, timeout=5.0):
+        """
+        Get a frame for a polling viewer: the latest one if it is younger than
+        one frame interval, otherwise the next capture
+        """
+        self.touch(fps)
+        seq, frame = self.slot.latest()
+        if frame is not None and time.time() - frame.timestamp < 1.0 / fps:
+            return frame
+        return self.wait(seq, timeout)
+
+    def encode(self, frame, size, fmt, quality):
+        return frame.encoded(size, fmt, quality, self.stats, self.pool)
+
+    def status(self):
+        with self._lock:
+            return {
+                'running': self._thread is not None,
+                'viewers': len(self._subscribers),
+                'polling': time.monotonic() < self._poll_until,
+                'fps': round(self._target_fps(), 1),
+                **self.stats,
+            }
+
+    def _target_fps(self):
+        rates = [controller.fps for controller in self._subscribers.values()]
+        if time.monotonic() < self._poll_until:
+            rates.append(self._poll_fps)
+        return max(rates, default=0.0)
+
+    def _ensure_running(self):
+        self._wake.set()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='CaptureHub', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        logger.info("Capture loop started")
+        while True:
+            with self._lock:
+                fps = self._target_fps()
+                if fps <= 0:
+                    # Nobody is watching; a later subscribe/touch restarts the loop
+                    self._thread = None
+                    logger.info("Capture loop idle, stopping")
+                    return
+                self._wake.clear()
+
+            started = time.monotonic()
+            try:
+                input_seq = latency_tracker.applied_seq
+                # Backends may reuse their image buffer, so keep a private copy
+                frame = Frame(self.capture().copy(), time.time())
+                frame.input_seq = input_seq
+                latency_tracker.frame_captured(input_seq, started, time.monotonic())
+                self.slot.publish(frame)
+                self.stats['captures'] += 1
+            except Exception as e:
+                logger.error(f"Error capturing frame: {e}")
+                time.sleep(1.0)
+                continue
+            # A new viewer with a higher fps wakes the loop early
+            self._wake.wait(max(0.0, 1.0 / fps - (time.monotonic() - started)))
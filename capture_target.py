@@ -0,0 +1,194 @@
+"""
+Capture Target - Which part of the desktop remote viewers see
+
+A target is the whole virtual desktop, one monitor, a rectangle of a monitor,
+or the window of a chosen process. Only the target's pixels are captured and
+encoded, and viewer coordinates (0..target width/height) are mapped to
+absolute desktop coordinates for mouse input.
+"""
+import logging
+import threading
+
+from processes import process_sampler
+from screen_capture import get_capture_backend
+
+logger = logging.getLogger('PCGamingApp')
+
+try:
+    import win32gui
+    import win32process
+    WIN32_AVAILABLE = True
+except ImportError:
+    WIN32_AVAILABLE = False
+
+TARGET_TYPES = ('desktop', 'monitor', 'region', 'window')
+
+
+def find_process_window(pids):
+    """
+    Find the largest visible top-level window belonging to any of `pids`
+
+    Returns:
+        Window handle, or None if the process has no visible window
+
+    Raises:
+        ValueError: If window lookup is not supported on this platform
+    """
+    if not WIN32_AVAILABLE:
+        raise ValueError("Window capture requires pywin32 (Windows only)")
+
+    best = [None, 0]
+
+    def visit(hwnd, _):
+        if not win32gui.IsWindowVisible(hwnd) or win32gui.IsIconic(hwnd):
+            return True
+        _, window_pid = win32process.GetWindowThreadProcessId(hwnd)
+        if window_pid in pids:
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+            area = (right - left) * (bottom - top)
+            if area > best[1]:
+                best[:] = [hwnd, area]
+        return True
+
+    win32gui.EnumWindows(visit, None)
+    return best[0]
+
+
+class CaptureTarget:
+    """The current capture target, shared by the capture loop and input"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spec = {'type': 'desktop'}
+        self._hwnd = None
+
+    def configure(self, spec):
+        """
+        Select a capture target
+
+        Args:
+            spec: {'type': 'desktop'}
+                  {'type': 'monitor', 'monitor': 1}
+                  {'type': 'region', 'monitor': 1, 'left', 'top', 'width', 'height'}
+                  {'type': 'window', 'pid': 1234} or {'type': 'window', 'name': 'game.exe'}
+
+        Returns:
+            The resolved target (see status)
+
+        Raises:
+            ValueError: If the target is invalid or cannot be found
+        """
+        kind = spec.get('type', 'desktop')
+        if kind not in TARGET_TYPES:
+            raise ValueError(f"type must be one of {', '.join(TARGET_TYPES)}")
+        try:
+            if kind == 'desktop':
+                spec = {'type': kind}
+            elif kind == 'monitor':
+                spec = {'type': kind, 'monitor': int(spec.get('monitor', 1))}
+            elif kind == 'region':
+                spec = {'type': kind, 'monitor': int(spec.get('monitor', 0)),
+                        'region': [int(spec[field]) for field in ('left', 'top', 'width', 'height')]}
+            elif spec.get('pid') is not None:
+                spec = {'type': kind, 'pid': int(spec['pid'])}
+            elif spec.get('name'):
+                # Kept by name so a restarted game is found again
+                spec = {'type': kind, 'name': str(spec['name'])}
+            else:
+                raise ValueError("pid or name is required")
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"invalid {kind} target: {e}")
+
+        with self._lock:
+            previous = self._spec, self._hwnd
+            self._spec, self._hwnd = spec, None
+        try:
+            # Validate the geometry now rather than in the capture loop
+            status = self.status()
+        except ValueError:
+            with self._lock:
+                self._spec, self._hwnd = previous
+            raise
+        logger.info(f"Capture target set to {spec}")
+        return status
+
+    def bounds(self):
+        """
+        Resolve the target to absolute desktop bounds
+
+        Returns:
+            Tuple (left, top, width, height)
+
+        Raises:
+            ValueError: If the target no longer exists
+        """
+        with self._lock:
+            spec, hwnd = self._spec, self._hwnd
+        backend = get_capture_backend()
+        if spec['type'] == 'desktop':
+            return backend._bounds(0, None)
+        if spec['type'] == 'monitor':
+            return backend._bounds(spec['monitor'], None)
+        if spec['type'] == 'region':
+            return backend._bounds(spec['monitor'], spec['region'])
+        return self._window_bounds(backend, spec, hwnd)
+
+    def capture(self):
+        """
+        Capture the target with the shared backend
+
+        Returns:
+            PIL image (may be reused by the next capture on the same thread)
+        """
+        with self._lock:
+            spec = self._spec
+        backend = get_capture_backend()
+        if spec['type'] == 'desktop':
+            return backend.grab(0)
+        if spec['type'] in ('monitor', 'region'):
+            return backend.grab(spec['monitor'], spec.get('region'))
+        left, top, width, height = self.bounds()
+        desktop = backend.monitors()[0]
+        # Regions are relative to the monitor; monitor 0 is the whole desktop
+        return backend.grab(0, (left - desktop['left'], top - desktop['top'], width, height))
+
+    def to_desktop(self, x, y):
+        """Map target coordinates to absolute desktop coordinates"""
+        left, top, _, _ = self.bounds()
+        return left + x, top + y
+
+    def from_desktop(self, x, y):
+        """Map absolute desktop coordinates to target coordinates"""
+        left, top, _, _ = self.bounds()
+        return x - left, y - top
+
+    def status(self):
+        left, top, width, height = self.bounds()
+        with self._lock:
+            spec = dict(self._spec)
+        return {**spec, 'left': left, 'top': top, 'width': width, 'height': height}
+
+    def monitors(self):
+        """Get the geometry of every monitor (index 0 is the whole desktop)"""
+        return get_capture_backend().monitors()
+
+    def _window_bounds(self, backend, spec, hwnd):
+        if hwnd is None or not win32gui.IsWindow(hwnd):
+            # First use, or the window was closed or recreated; look it up again
+            if 'pid' in spec:
+                pids, label = {spec['pid']}, f"Process {spec['pid']}"
+            else:
+                pids, label = process_sampler.pids_by_name(spec['name']), spec['name']
+            hwnd = find_process_window(pids) if pids else None
+            if hwnd is None:
+                raise ValueError(f"{label} has no visible window")
+            with self._lock:
+                self._hwnd = hwnd
+        left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+        # Clip to the desktop so a partly off-screen window can still be captured
+        desktop = backend.monitors()[0]
+        region = (left - desktop['left'], top - desktop['top'], right - left, bottom - top)
+        return backend._bounds(0, region)
+
+
+capture_target = CaptureTarget()
@@ -16,10 +16,83 @@ DEBUG = os.getenv('FLASK_ENV') == 'development'
 LIB_FOLDER = BASE_DIR / 'lib'
 STATIC_FOLDER = BASE_DIR / 'static'
 TEMPLATES_FOLDER = BASE_DIR / 'templates'
+LOGS_FOLDER = BASE_DIR / 'logs'
 
 # Hardware monitoring
 CPU_UPDATE_INTERVAL = 1.0  # seconds
 METRICS_CACHE_TTL = 0.5  # seconds - cache metrics for performance
+PROCESS_SAMPLE_INTERVAL = 2.0  # seconds between process table refreshes
+
+# Screen capture backend: 'auto', 'mss', 'pyautogui' or 'synthetic'
+CAPTURE_BACKEND = os.getenv('CAPTURE_BACKEND', 'auto')
+
+# Remote desktop
+REMOTE_FRAME_FORMAT = 'jpeg'  # 'jpeg' or 'webp'
+REMOTE_FRAME_QUALITY = 70
+REMOTE_STREAM_FPS = 15  # default MJPEG stream frame rate cap
+REMOTE_STREAM_MAX_FPS = 60
+REMOTE_TILE_SIZE = 64  # pixels per side of a dirty-region tile
+REMOTE_KEYFRAME_INTERVAL = 10.0  # seconds between full frames in tile mode
+REMOTE_TARGET_LATENCY = 0.15  # seconds; adaptive streams back off above this
+# Target bitrate of the optional H.264/VP8 video stream (bits per second)
+REMOTE_VIDEO_BITRATE = int(os.getenv('REMOTE_VIDEO_BITRATE', 4_000_000))
+# Instant replay: recent frames kept in memory, saved as clips on request
+REPLAY_ENABLED = os.getenv('REPLAY_ENABLED', '0') == '1'  # record from startup
+REPLAY_MEMORY_MB = int(os.getenv('REPLAY_MEMORY_MB', 256))
+REPLAY_FPS = 10
+REPLAY_QUALITY = 60
+REPLAY_MAX_WIDTH = 1280  # frames are downscaled to at most this width
+REPLAY_DIR = Path(os.getenv('REPLAY_DIR', Path.home() / 'Videos' / 'PC Gaming App'))
+# Worker processes encoding frames from shared memory (0 = encode in-thread)
+REMOTE_ENCODE_WORKERS = int(os.getenv('REMOTE_ENCODE_WORKERS', 2))
+
+# Screenshot gallery
+SCREENSHOT_DIR = Path(os.getenv('SCREENSHOT_DIR', Path.home() / 'Pictures' / 'PC Gaming App'))
+THUMBNAIL_DIR = SCREENSHOT_DIR / '.thumbnails'
+THUMBNAIL_CACHE_MB = int(os.getenv('THUMBNAIL_CACHE_MB', 64))
+THUMBNAIL_SIZES = (128, 256, 512)  # allowed thumbnail sizes (longest side)
+THUMBNAIL_WORKERS = 2
+
+# Per-process history (heavy hitters only)
+HISTORY_TRACKED_PROCESSES = 16  # processes with a history at any time
+HISTORY_LENGTH = 150  # samples per process (5 minutes at the sample interval)
+HISTORY_DECAY = 0.9  # per-tick decay of heavy-hitter scores
+
+
+def _env_list(name, default=''):
+    """Read a comma separated, case-insensitive list from the environment"""
+    return [item.strip().lower() for item in os.getenv(name, default).split(',') if item.strip()]
+
+
+# Filename search index over the home directory
+FILE_INDEX_ENABLED = os.getenv('FILE_INDEX_ENABLED', '1') == '1'
+FILE_INDEX_INTERVAL = 600.0  # seconds between incremental crawls
+FILE_INDEX_WORKERS = 4  # parallel directory scans
+FILE_INDEX_MAX_FILES = 1_000_000
+# Directory names never indexed (hidden directories are always skipped)
+FILE_INDEX_EXCLUDE = _env_list(
+    'FILE_INDEX_EXCLUDE',
+    'appdata,node_modules,__pycache__,site-packages,$recycle.bin'
+)
+
+# Resumable uploads from the file explorer
+UPLOAD_MAX_ACTIVE = 16  # concurrent unfinished uploads
+UPLOAD_MAX_CHUNK_MB = 64
+UPLOAD_EXPIRY = 24 * 3600  # seconds an idle unfinished upload is kept
+
+# Game mode
+GAME_MODE_ENABLED = os.getenv('GAME_MODE_ENABLED', '1') == '1'
+# Executable names that activate game mode (e.g. "cs2.exe,eldenring.exe")
+GAME_MODE_GAMES = _env_list('GAME_MODE_GAMES')
+# Background processes demoted while a game is running
+GAME_MODE_BACKGROUND = _env_list(
+    'GAME_MODE_BACKGROUND',
+    'onedrive.exe,dropbox.exe,googledrivefs.exe,searchindexer.exe,steamwebhelper.exe'
+)
+# 'lower' (priority only), 'pin' (affinity only) or 'both'
+GAME_MODE_BACKGROUND_ACTION = os.getenv('GAME_MODE_BACKGROUND_ACTION', 'both')
+# Number of logical cores left to background processes; the game gets the rest
+GAME_MODE_BACKGROUND_CORES = int(os.getenv('GAME_MODE_BACKGROUND_CORES', 2))
 
 # Hardware DLL paths
 OPENHARDWARE_DLL = LIB_FOLDER / 'OpenHardwareMonitorLib.dll'
@@ -37,7 +37,7 @@ def run_as_admin():
     ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, f"{script} {params}", None, 1)
     sys.exit()  
 
-# Admin check is now handled in Monitor.py
+# Admin check is now handled in server.py
 # This module no longer requests admin privileges on import
 
 dll_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lib', 'OpenHardwareMonitorLib.dll')
@@ -0,0 +1,165 @@
+"""
+Encode Pool - Frame encoding in worker processes over shared memory
+
+Captured pixels are copied once into a multiprocessing.shared_memory slot;
+worker processes attach to the slot by name, resize and encode it, and only
+the (small) encoded bytes travel back through pickling. This keeps JPEG/WebP
+encoding off the Flask threads and out of the server's GIL.
+"""
+import logging
+import multiprocessing
+import threading
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger('PCGamingApp')
+
+
+class SharedSlot:
+    """A shared memory block holding one RGB frame"""
+
+    def __init__(self, size):
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        self.capacity = size
+        self.in_use = 0
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class SharedFrame:
+    """Handle to a frame's pixels in a shared slot"""
+
+    def __init__(self, slot, width, height):
+        self.slot = slot
+        self.name = slot.shm.name
+        self.width = width
+        self.height = height
+
+
+class EncodePool:
+    """
+    Process pool encoding frames held in shared memory
+
+    A fixed number of slots is reused; a slot stays in use while any frame
+    referencing it is alive. If every slot is busy, callers fall back to
+    encoding in their own thread.
+    """
+
+    def __init__(self, workers=2, slots=4):
+        self.workers = workers
+        self.max_slots = slots
+        self._lock = threading.Lock()
+        self._slots = []
+        self._executor = None
+
+    def _get_executor(self):
+        # Started lazily so processes only exist once someone views the screen.
+        # Spawned on every platform: workers then re-run only the Monitor.py
+        # launcher, which imports nothing of the app outside __main__
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+            )
+            logger.info(f"Started frame encode pool with {self.workers} workers")
+        return self._executor
+
+    def share(self, image):
+        """
+        Copy an image's pixels into a free shared slot
+
+        Returns:
+            SharedFrame, or None if no slot is free
+        """
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        width, height = image.size
+        needed = width * height * 3
+
+        with self._lock:
+            slot = next((s for s in self._slots if not s.in_use and s.capacity >= needed), None)
+            if slot is None:
+                reusable = next((s for s in self._slots if not s.in_use), None)
+                if reusable is not None:
+                    # Too small for this resolution; replace it
+                    self._slots.remove(reusable)
+                    reusable.close()
+                elif len(self._slots) >= self.max_slots:
+                    return None
+                slot = SharedSlot(needed)
+                self._slots.append(slot)
+            slot.in_use += 1
+
+        target = np.ndarray((height, width, 3), dtype=np.uint8, buffer=slot.shm.buf)
+        target[:] = np.asarray(image)
+        return SharedFrame(slot, width, height)
+
+    def release(self, shared):
+        with self._lock:
+            shared.slot.in_use -= 1
+
+    def attach(self, owner, image):
+        """
+        Share an image for the lifetime of `owner`
+
+        The slot is released automatically when owner is garbage collected.
+        """
+        shared = self.share(image)
+        if shared is not None:
+            weakref.finalize(owner, self.release, shared)
+        return shared
+
+    def encode(self, shared, size, fmt, quality):
+        """
+        Encode a shared frame in a worker process
+
+        Returns:
+            Encoded bytes
+        """
+        future = self._get_executor().submit(
+            _encode_shared, shared.name, shared.width, shared.height, tuple(size), fmt, quality
+        )
+        return future.result()
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            for slot in self._slots:
+                slot.close()
+            self._slots.clear()
+
+
+# ---------- worker side ----------
+
+_attached = {}
+
+
+def _attach(name):
+    """Attach to a shared slot once per worker, keeping a few handles cached"""
+    shm = _attached.get(name)
+    if shm is None:
+        if len(_attached) >= 8:
+            _attached.pop(next(iter(_attached))).close()
+        # Workers share the parent's resource tracker, so attaching only
+        # re-registers a name the parent already unlinks on close()
+        shm = shared_memory.SharedMemory(name=name)
+        _attached[name] = shm
+    return shm
+
+
+def _encode_shared(name, width, height, size, fmt, quality):
+    from frame_encoder import encode_frame, resize_frame
+
+    shm = _attach(name)
+    image = Image.frombuffer('RGB', (width, height), shm.buf, 'raw', 'RGB', 0, 1)
+    return encode_frame(resize_frame(image, size), fmt, quality)
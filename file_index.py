@@ -0,0 +1,273 @@
+"""
+File Index - Background filename search over the home directory
+
+A crawler walks the tree with a pool of os.scandir workers and records every
+directory's entries (name, size, mtime). Later crawls are incremental: a
+directory whose mtime is unchanged keeps its recorded entries without being
+read again (its subdirectories are still visited, since changes below a
+directory do not touch its mtime).
+
+After each crawl an immutable snapshot is built for searching: a trigram
+index (trigram -> array of entry ids) for words of three or more
+characters; a query made only of shorter words falls back to a substring scan
+of all names. Searches read the current snapshot without locking while the
+next crawl runs.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+from array import array
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+logger = logging.getLogger('PCGamingApp')
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _DirRecord:
+    """A directory's recorded entries, valid while its mtime is unchanged"""
+    __slots__ = ('mtime_ns', 'files', 'subdirs')
+
+    def __init__(self, mtime_ns, files, subdirs):
+        self.mtime_ns = mtime_ns
+        self.files = files  # list of (name, is_dir, size, mtime)
+        self.subdirs = subdirs  # subdirectory names to descend into
+
+
+class _Snapshot:
+    """Immutable search structures built from the crawled records"""
+
+    def __init__(self, records, max_files):
+        self.dirs = []
+        self.names = []
+        self.lowers = []
+        self.dir_ids = array('I')
+        self.sizes = array('q')
+        self.mtimes = array('d')
+        self.is_dir = bytearray()
+        for path, record in records.items():
+            if len(self.names) >= max_files:
+                break
+            dir_id = len(self.dirs)
+            self.dirs.append(path)
+            for name, is_dir, size, mtime in record.files:
+                if len(self.names) >= max_files:
+                    break
+                self.names.append(name)
+                self.lowers.append(name.lower())
+                self.dir_ids.append(dir_id)
+                self.sizes.append(size)
+                self.mtimes.append(mtime)
+                self.is_dir.append(is_dir)
+
+        self.postings = {}
+        for entry_id, lower in enumerate(self.lowers):
+            for trigram in _trigrams(lower):
+                postings = self.postings.get(trigram)
+                if postings is None:
+                    postings = self.postings[trigram] = array('I')
+                postings.append(entry_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def candidates(self, term):
+        """Entry ids that may contain `term` (a superset for trigram terms)"""
+        if len(term) >= 3:
+            # The rarest trigram gives the fewest candidates to verify
+            shortest = None
+            for trigram in _trigrams(term):
+                postings = self.postings.get(trigram)
+                if postings is None:
+                    return ()
+                if shortest is None or len(postings) < len(shortest):
+                    shortest = postings
+            return shortest
+        # Too short for trigrams: scan every name
+        return [entry_id for entry_id, lower in enumerate(self.lowers) if term in lower]
+
+    def rank(self, entry_id, query):
+        """Sort key: exact, prefix, word-start, then substring matches; shorter and newer first"""
+        lower = self.lowers[entry_id]
+        stem = lower.rsplit('.', 1)[0]
+        if lower == query or stem == query:
+            kind = 0
+        elif lower.startswith(query):
+            kind = 1
+        else:
+            position = lower.find(query)
+            kind = 2 if position > 0 and not lower[position - 1].isalnum() else 3
+        return kind, len(lower), -self.mtimes[entry_id]
+
+    def entry(self, entry_id):
+        return {
+            'name': self.names[entry_id],
+            'path': os.path.join(self.dirs[self.dir_ids[entry_id]], self.names[entry_id]),
+            'is_dir': bool(self.is_dir[entry_id]),
+            'size': self.sizes[entry_id],
+            'modified': self.mtimes[entry_id],
+        }
+
+
+class FileIndex:
+    """
+    Filename index of a directory tree, refreshed in the background
+
+    Args:
+        root: Directory to index
+        exclude: Lower-case directory names never descended into
+        workers: Parallel scandir threads per crawl
+        interval: Seconds between crawls
+        max_files: Entries kept in the search snapshot
+    """
+
+    def __init__(self, root, exclude=(), workers=4, interval=600.0, max_files=1_000_000):
+        self.root = os.path.abspath(root)
+        self.exclude = set(exclude)
+        self.workers = workers
+        self.interval = interval
+        self.max_files = max_files
+        self._records = {}
+        self._snapshot = _Snapshot({}, max_files)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self.stats = {'crawls': 0, 'crawling': False, 'last_crawl': None, 'crawl_seconds': None,
+                      'directories': 0, 'scanned': 0, 'reused': 0, 'errors': 0}
+
+    def start(self):
+        """Start the background crawler"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='FileIndex', daemon=True)
+            self._thread.start()
+        logger.info(f"File index started for {self.root}")
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(timeout=5)
+
+    def refresh(self):
+        """Start a crawl now instead of waiting for the interval"""
+        self._wake.set()
+
+    def search(self, query, limit=50):
+        """
+        Find files and folders whose names contain every word of `query`
+
+        Returns:
+            Dictionary with results (best first), total matches and timing
+
+        Raises:
+            ValueError: If the query is empty
+        """
+        terms = query.lower().split()
+        if not terms:
+            raise ValueError("q is required")
+        started = time.perf_counter()
+        snapshot = self._snapshot
+        # Generate candidates from the most selective (longest) term, verify the rest
+        terms.sort(key=len, reverse=True)
+        matches = [entry_id for entry_id in snapshot.candidates(terms[0])
+                   if all(term in snapshot.lowers[entry_id] for term in terms)]
+        phrase = ' '.join(query.lower().split())
+        best = heapq.nsmallest(limit, matches, key=lambda entry_id: snapshot.rank(
+            entry_id, phrase if phrase in snapshot.lowers[entry_id] else terms[0]))
+        return {
+            'query': query,
+            'results': [snapshot.entry(entry_id) for entry_id in best],
+            'total': len(matches),
+            'indexed': len(snapshot),
+            'ready': self.stats['crawls'] > 0,
+            'took_ms': round((time.perf_counter() - started) * 1000, 2),
+        }
+
+    def status(self):
+        snapshot = self._snapshot
+        return {'root': self.root, 'running': self._thread is not None, 'entries': len(snapshot),
+                'trigrams': len(snapshot.postings), **self.stats}
+
+    def crawl(self):
+        """Crawl the tree once and publish a new search snapshot"""
+        started = time.monotonic()
+        self.stats.update(crawling=True, scanned=0, reused=0, errors=0)
+        records = {}
+        visited = set()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='FileIndexScan') as executor:
+            pending = {executor.submit(self._visit, self.root)}
+            while pending and not self._stop.is_set():
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is None:
+                        self.stats['errors'] += 1
+                        continue
+                    path, identity, record, scanned = result
+                    self.stats['scanned' if scanned else 'reused'] += 1
+                    # Guard against junctions/bind mounts that lead back up the tree
+                    if identity in visited:
+                        continue
+                    visited.add(identity)
+                    records[path] = record
+                    for name in record.subdirs:
+                        pending.add(executor.submit(self._visit, os.path.join(path, name)))
+            for future in pending:
+                future.cancel()
+        if self._stop.is_set():
+            self.stats['crawling'] = False
+            return
+
+        # Every directory reused as-is and none gone: the current snapshot
+        # already describes this tree
+        if self.stats['scanned'] or records.keys() != self._records.keys():
+            self._snapshot = _Snapshot(records, self.max_files)
+        snapshot = self._snapshot
+        self._records = records
+        self.stats.update(crawling=False, crawls=self.stats['crawls'] + 1, last_crawl=time.time(),
+                          crawl_seconds=round(time.monotonic() - started, 2), directories=len(records))
+        logger.info(f"File index: {len(snapshot)} entries in {len(records)} directories "
+                    f"({self.stats['scanned']} scanned, {self.stats['reused']} unchanged) "
+                    f"in {self.stats['crawl_seconds']} s")
+
+    def _visit(self, path):
+        try:
+            stat = os.stat(path)
+            identity = (stat.st_dev, stat.st_ino) if stat.st_ino else path
+            previous = self._records.get(path)
+            if previous is not None and previous.mtime_ns == stat.st_mtime_ns:
+                return path, identity, previous, False
+            files, subdirs = [], []
+            with os.scandir(path) as iterator:
+                for entry in iterator:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        entry_stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    files.append((entry.name, is_dir, 0 if is_dir else entry_stat.st_size, entry_stat.st_mtime))
+                    if is_dir and not entry.name.startswith('.') and entry.name.lower() not in self.exclude:
+                        subdirs.append(entry.name)
+            return path, identity, _DirRecord(stat.st_mtime_ns, files, subdirs), True
+        except OSError:
+            return None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.crawl()
+            except Exception as e:
+                self.stats['crawling'] = False
+                logger.error(f"Error indexing files: {e}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
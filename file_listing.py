@@ -0,0 +1,211 @@
+"""
+File Listing - Paginated directory listings for the file explorer
+
+Directories are read with os.scandir, whose entries carry the file type (and
+on Windows the size and times) from the directory read itself, so a listing
+costs at most one stat per entry. Listings are cached per directory and
+reused while the directory's mtime is unchanged, so paging through or
+re-sorting a large folder does not read it again.
+
+Pages are addressed by an opaque cursor that remembers the last name
+returned: if the directory changes between pages, the next page resumes
+after that name rather than at a shifted offset.
+"""
+import base64
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger('PCGamingApp')
+
+SORT_KEYS = ('name', 'size', 'date')
+SORT_ORDERS = ('asc', 'desc')
+
+Entry = namedtuple('Entry', 'name is_dir size modified')
+
+
+def _sort_key(sort):
+    if sort == 'size':
+        return lambda entry: (entry.size, entry.name.lower())
+    if sort == 'date':
+        return lambda entry: (entry.modified, entry.name.lower())
+    return lambda entry: entry.name.lower()
+
+
+def scan_directory(path):
+    """
+    Read a directory's entries
+
+    Returns:
+        List of Entry; entries that vanish or cannot be stat'ed are skipped
+
+    Raises:
+        OSError: If the directory itself cannot be read
+    """
+    entries = []
+    with os.scandir(path) as iterator:
+        for entry in iterator:
+            try:
+                is_dir = entry.is_dir()
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append(Entry(entry.name, is_dir, 0 if is_dir else stat.st_size, stat.st_mtime))
+    return entries
+
+
+class _Listing:
+    """One directory's entries plus the sort orders requested so far"""
+
+    def __init__(self, mtime_ns, entries):
+        self.mtime_ns = mtime_ns
+        self.entries = entries
+        self.loaded = time.monotonic()
+        self._orders = {}
+
+    def ordered(self, sort, order):
+        """
+        Get the entries sorted, directories first
+
+        Returns:
+            Tuple (entries, name -> position)
+        """
+        key = (sort, order)
+        if key not in self._orders:
+            entries = sorted(self.entries, key=_sort_key(sort), reverse=order == 'desc')
+            # Stable sort: grouping by type keeps the order within each group
+            entries.sort(key=lambda entry: not entry.is_dir)
+            self._orders[key] = entries, {entry.name: index for index, entry in enumerate(entries)}
+        return self._orders[key]
+
+
+class DirectoryCache:
+    """
+    LRU cache of directory listings validated by directory mtime
+
+    A directory's mtime changes when entries are added, removed or renamed,
+    but not when a file inside is rewritten, so listings are also re-read
+    after max_age seconds to pick up changed sizes and dates.
+    """
+
+    def __init__(self, max_dirs=32, max_age=30.0):
+        self.max_dirs = max_dirs
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._listings = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def listing(self, path):
+        """
+        Get the (possibly cached) listing of a directory
+
+        Raises:
+            OSError: If the directory cannot be read
+        """
+        mtime_ns = os.stat(path).st_mtime_ns
+        with self._lock:
+            listing = self._listings.get(path)
+            if (listing is not None and listing.mtime_ns == mtime_ns
+                    and time.monotonic() - listing.loaded < self.max_age):
+                self._listings.move_to_end(path)
+                self.hits += 1
+                return listing
+            self.misses += 1
+        # Read outside the lock so a slow folder does not block other listings
+        listing = _Listing(mtime_ns, scan_directory(path))
+        with self._lock:
+            self._listings[path] = listing
+            self._listings.move_to_end(path)
+            while len(self._listings) > self.max_dirs:
+                self._listings.popitem(last=False)
+        return listing
+
+    def page(self, path, sort='name', order='asc', cursor=None, limit=200):
+        """
+        Get one page of a directory listing
+
+        Args:
+            path: Absolute directory path
+            sort: 'name', 'size' or 'date'
+            order: 'asc' or 'desc' (directories are listed first either way)
+            cursor: next_cursor of the previous page, or None for the first
+            limit: Maximum number of entries
+
+        Returns:
+            Dictionary with path, items, total and next_cursor (None on the
+            last page)
+
+        Raises:
+            ValueError: If sort, order or cursor is invalid
+            OSError: If the directory cannot be read
+        """
+        if sort not in SORT_KEYS:
+            raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+        if order not in SORT_ORDERS:
+            raise ValueError(f"order must be one of {', '.join(SORT_ORDERS)}")
+        listing = self.listing(path)
+        entries, positions = listing.ordered(sort, order)
+
+        start = 0
+        if cursor:
+            state = _decode_cursor(cursor)
+            if state.get('s') != [sort, order]:
+                raise ValueError("cursor does not match sort order")
+            if state.get('m') == listing.mtime_ns or state.get('n') not in positions:
+                # Unchanged directory, or the last entry is gone: trust the offset
+                start = min(state.get('o', 0), len(entries))
+            else:
+                start = positions[state['n']] + 1
+
+        page = entries[start:start + limit]
+        end = start + len(page)
+        next_cursor = None
+        if end < len(entries):
+            next_cursor = _encode_cursor({'s': [sort, order], 'm': listing.mtime_ns, 'o': end, 'n': page[-1].name})
+        return {
+            'path': path,
+            'items': [{
+                'name': entry.name,
+                'path': os.path.join(path, entry.name),
+                'size': entry.size,
+                'is_dir': entry.is_dir,
+                'modified': entry.modified,
+            } for entry in page],
+            'total': len(entries),
+            'next_cursor': next_cursor,
+        }
+
+    def invalidate(self, path):
+        with self._lock:
+            self._listings.pop(path, None)
+
+    def status(self):
+        with self._lock:
+            return {'directories': len(self._listings), 'hits': self.hits, 'misses': self.misses}
+
+
+def _encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        if not isinstance(state, dict):
+            raise ValueError
+        offset = state.get('o', 0)
+        # A negative offset would slice the page from the end of the listing
+        if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+            raise ValueError
+        if not isinstance(state.get('n', ''), str):
+            raise ValueError
+        return state
+    except ValueError:
+        raise ValueError("invalid cursor")
+
+
+directory_cache = DirectoryCache()
@@ -0,0 +1,233 @@
+"""
+File Preview - Head, tail and line ranges of large text files, plus follow
+
+Files are read through mmap, so only the pages that are actually looked at
+are touched:
+    - tail scans backwards from the end for the last N newlines
+    - head scans forwards from the start
+    - either scan stops after N * MAX_LINE_CHARS * 4 bytes
+    - an arbitrary line range uses a line index: the number of newlines
+      before every 1 MiB block, found by counting (at memchr speed) rather
+      than by splitting lines. A line is then located by bisecting the block
+      counts and scanning within one block. The index is extended
+      incrementally as a log grows and rebuilt if the file shrinks.
+
+follow() generates Server-Sent Events carrying lines appended to a file, for
+a live tail of game and app logs.
+"""
+import bisect
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+logger = logging.getLogger('PCGamingApp')
+
+BLOCK_SIZE = 1024 * 1024
+MAX_LINES = 5000
+MAX_LINE_CHARS = 10000  # longer lines are cut (binary files have few newlines)
+
+
+def _decode(raw):
+    line = raw.rstrip(b'\r').decode('utf-8', errors='replace')
+    return line[:MAX_LINE_CHARS]
+
+
+class _LineIndex:
+    """Newline counts per block of a file, valid for the indexed prefix"""
+
+    def __init__(self, identity):
+        self.identity = identity
+        self.size = 0  # bytes covered
+        self.counts = array('Q', [0])  # newlines before each full block
+        self.partial = 0  # newlines in the trailing partial block
+
+    def extend(self, mm, size):
+        # Continue from the first block not fully counted yet
+        position = (len(self.counts) - 1) * BLOCK_SIZE
+        self.partial = 0
+        while position < size:
+            end = min(position + BLOCK_SIZE, size)
+            newlines = mm[position:end].count(b'\n')
+            if end - position == BLOCK_SIZE:
+                self.counts.append(self.counts[-1] + newlines)
+            else:
+                self.partial = newlines
+            position = end
+        self.size = size
+
+    @property
+    def total_newlines(self):
+        return self.counts[-1] + self.partial
+
+    def line_offset(self, mm, line):
+        """Byte offset where 1-based `line` starts (None past the end)"""
+        if line <= 1:
+            return 0
+        newline = line - 1  # the line starts after this many newlines
+        if newline > self.total_newlines:
+            return None
+        block = bisect.bisect_left(self.counts, newline) - 1
+        position = block * BLOCK_SIZE
+        remaining = newline - self.counts[block]
+        while remaining:
+            position = mm.find(b'\n', position) + 1
+            remaining -= 1
+        return position
+
+
+class FilePreview:
+    """Line-oriented reads of text files with cached line indexes"""
+
+    def __init__(self, max_indexes=8):
+        self.max_indexes = max_indexes
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+    def read(self, path, mode='tail', lines=100, start=1):
+        """
+        Read part of a text file
+
+        Args:
+            path: File to read
+            mode: 'head' (first lines), 'tail' (last lines) or 'lines'
+                  (`lines` lines from 1-based line `start`)
+            lines: Number of lines, at most MAX_LINES
+
+        Returns:
+            Dictionary with lines, start_line (None for tail), offset and
+            end_offset (byte range read; follow from end_offset), size and
+            total_lines (only known in lines mode)
+
+        Raises:
+            ValueError: If mode or the counts are invalid
+            OSError: If the file cannot be read
+        """
+        if mode not in ('head', 'tail', 'lines'):
+            raise ValueError("mode must be head, tail or lines")
+        if not 1 <= lines <= MAX_LINES:
+            raise ValueError(f"lines must be between 1 and {MAX_LINES}")
+        if start < 1:
+            raise ValueError("start must be at least 1")
+
+        with open(path, 'rb') as handle:
+            stat = os.fstat(handle.fileno())
+            size = stat.st_size
+            result = {'path': path, 'mode': mode, 'size': size, 'modified': stat.st_mtime,
+                      'start_line': None, 'total_lines': None}
+            if size == 0:
+                return {**result, 'lines': [], 'start_line': 1, 'offset': 0, 'end_offset': 0}
+            # Never scan or copy more than the requested lines can show (UTF-8
+            # is at most 4 bytes per character): files with few newlines are
+            # cut mid-line rather than read whole
+            span = lines * MAX_LINE_CHARS * 4
+            with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mode == 'tail':
+                    # A final line without a newline still counts as a line
+                    end = size
+                    floor = max(0, end - span)
+                    position = end - 1 if mm[end - 1:end] == b'\n' else end
+                    for _ in range(lines):
+                        position = mm.rfind(b'\n', floor, position)
+                        if position < 0:
+                            position = floor - 1
+                            break
+                    begin = position + 1
+                elif mode == 'head':
+                    begin, start = 0, 1
+                else:
+                    index = self._index(path, stat, mm, size)
+                    result['total_lines'] = index.total_newlines + (mm[size - 1:size] != b'\n')
+                    begin = index.line_offset(mm, start)
+                    if begin is None or begin >= size:
+                        return {**result, 'lines': [], 'start_line': start, 'offset': size, 'end_offset': size}
+                if mode != 'tail':
+                    result['start_line'] = start
+                    end = begin
+                    limit = min(size, begin + span)
+                    for _ in range(lines):
+                        found = mm.find(b'\n', end, limit)
+                        if found < 0:
+                            end = limit
+                            break
+                        end = found + 1
+                raw = mm[begin:end]
+        text = raw[:-1] if raw.endswith(b'\n') else raw
+        return {**result, 'lines': [_decode(line) for line in text.split(b'\n')], 'offset': begin, 'end_offset': end}
+
+    def _index(self, path, stat, mm, size):
+        identity = (stat.st_dev, stat.st_ino)
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is None or index.identity != identity or index.size > size:
+                # New, replaced or truncated (rotated) file: start over
+                index = _LineIndex(identity)
+            self._indexes[path] = index
+            self._indexes.move_to_end(path)
+            while len(self._indexes) > self.max_indexes:
+                self._indexes.popitem(last=False)
+            if index.size < size:
+                index.extend(mm, size)
+            return index
+
+
+def follow(path, offset, poll_interval=0.5, heartbeat=15.0):
+    """
+    Generate Server-Sent Events with lines appended to a file
+
+    Args:
+        path: File to follow
+        offset: Byte offset to start from (end_offset of a preview)
+
+    Yields:
+        SSE messages: "lines" events with {"lines": [...], "offset": n}, and
+        a "reset" event when the file is truncated or replaced by another file
+        (rotated), after which following restarts from its beginning
+    """
+    pending = b''
+    identity = None
+    last_sent = time.monotonic()
+    yield "retry: 2000\n\n"
+    while True:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            yield f"event: error\ndata: {json.dumps({'error': 'File is no longer available'})}\n\n"
+            return
+        size = stat.st_size
+        if identity is None:
+            identity = (stat.st_dev, stat.st_ino)
+        # A rotated log may already be as large as the old one, so compare the file itself too
+        if (stat.st_dev, stat.st_ino) != identity or size < offset:
+            identity = (stat.st_dev, stat.st_ino)
+            offset, pending = 0, b''
+            yield f"event: reset\ndata: {json.dumps({'offset': 0})}\n\n"
+        if size > offset:
+            with open(path, 'rb') as handle:
+                handle.seek(offset)
+                data = handle.read(min(size - offset, 4 * BLOCK_SIZE))
+            offset += len(data)
+            data = pending + data
+            # Only complete lines are sent; the rest waits for its newline
+            cut = data.rfind(b'\n') + 1
+            pending = data[cut:]
+            if len(pending) > MAX_LINE_CHARS * 4:
+                cut, pending = len(data), b''
+            if cut:
+                lines = [_decode(line) for line in data[:cut].rstrip(b'\n').split(b'\n')]
+                yield f"event: lines\ndata: {json.dumps({'lines': lines, 'offset': offset - len(pending)})}\n\n"
+                last_sent = time.monotonic()
+            if size > offset:
+                continue  # more already waiting
+        if time.monotonic() - last_sent > heartbeat:
+            # Comment line; keeps proxies from closing an idle stream
+            yield ": keep-alive\n\n"
+            last_sent = time.monotonic()
+        time.sleep(poll_interval)
+
+
+file_preview = FilePreview()
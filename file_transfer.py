@@ -0,0 +1,202 @@
+"""
+File Transfer - Resumable, range-aware file downloads
+
+send_file_range() answers GET/HEAD for a file on disk with:
+    - ETag and Last-Modified validators, 304 for If-None-Match /
+      If-Modified-Since and 412 for a failed If-Match / If-Unmodified-Since
+    - Range requests: one range as a 206, several as multipart/byteranges,
+      with If-Range so a resumed download never splices two file versions
+    - the body sent with socket.sendfile() when served by the Werkzeug
+      server, so large files go from the page cache to the socket without
+      passing through Python (on platforms without os.sendfile a large-buffer
+      copy loop is used instead)
+"""
+import logging
+import mimetypes
+import os
+import secrets
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from flask import Response
+from werkzeug.http import http_date, is_resource_modified, parse_date, quote_etag
+
+logger = logging.getLogger('PCGamingApp')
+
+CHUNK_SIZE = 1024 * 1024
+MAX_RANGES = 16  # requests with more (merged) ranges than this get the whole file
+
+
+def _file_etag(stat):
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def _parse_ranges(range_header, length):
+    """
+    Parse a Range header into sorted, merged (start, stop) byte ranges
+
+    Werkzeug's parser rejects overlapping or out-of-order ranges outright, so
+    the header is parsed here; overlapping and adjacent ranges are merged.
+
+    Returns:
+        List of (start, stop), empty if no range can be satisfied, or None if
+        the header is not a valid bytes range (it is then ignored)
+    """
+    units, _, specs = range_header.partition('=')
+    if units.strip().lower() != 'bytes':
+        return None
+    spans = []
+    for spec in specs.split(','):
+        first, dash, last = spec.strip().partition('-')
+        first, last = first.strip(), last.strip()
+        if not dash or not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+        if not first:
+            # Suffix range: the last N bytes
+            start, stop = max(0, length - int(last)), length
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            stop = length if not last else min(int(last) + 1, length)
+        if start < stop:
+            spans.append((start, stop))
+    spans.sort()
+    merged = []
+    for start, stop in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def _if_range_matches(request, etag, mtime):
+    value = request.headers.get('If-Range', '').strip()
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        # If-Range needs a strong match
+        return not value.startswith('W/') and request.if_range.etag == etag
+    # A date must equal Last-Modified exactly (RFC 9110, 13.1.5)
+    return request.if_range.date is not None and request.if_range.date.timestamp() == int(mtime)
+
+
+def _precondition_failed(request, etag, mtime):
+    if request.if_match and not request.if_match.contains(etag):
+        return True
+    since = request.headers.get('If-Unmodified-Since')
+    if since and not request.if_match:
+        date = parse_date(since)
+        return date is not None and int(mtime) > date.timestamp()
+    return False
+
+
+def send_region(environ, handle, start, stop):
+    """
+    Generate the bytes [start, stop) of an open file
+
+    Under the Werkzeug server the first (empty) chunk makes it send the
+    headers, after which the body is written straight to its socket.
+    """
+    sock = environ.get('werkzeug.socket')
+    if sock is not None and hasattr(os, 'sendfile'):
+        yield b''
+        if stop > start:
+            sock.sendfile(handle, start, stop - start)
+        return
+    handle.seek(start)
+    remaining = stop - start
+    buffer = bytearray(min(CHUNK_SIZE, remaining))
+    view = memoryview(buffer)
+    while remaining > 0:
+        count = handle.readinto(view[:min(remaining, len(buffer))])
+        if not count:
+            raise IOError("File truncated while sending")
+        remaining -= count
+        yield bytes(view[:count])
+
+
+def send_file_range(request, path, as_attachment=True, download_name=None, mimetype=None):
+    """
+    Build a validator- and range-aware response for a file
+
+    Args:
+        request: The current Flask request
+        path: File to send
+        as_attachment: Add Content-Disposition: attachment
+        download_name: File name offered to the browser (default: basename)
+        mimetype: Content type (default: guessed from the name)
+
+    Returns:
+        Flask Response (200, 206, 304, 412 or 416)
+    """
+    stat = os.stat(path)
+    length = stat.st_size
+    etag = _file_etag(stat)
+    download_name = download_name or os.path.basename(path)
+    mimetype = mimetype or mimetypes.guess_type(download_name)[0] or 'application/octet-stream'
+    headers = {
+        'ETag': quote_etag(etag),
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+        'Cache-Control': 'no-cache',
+    }
+    if as_attachment:
+        try:
+            download_name.encode('ascii')
+            headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        except UnicodeEncodeError:
+            headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+
+    if _precondition_failed(request, etag, stat.st_mtime):
+        return Response(status=412, headers=headers)
+    modified = datetime.fromtimestamp(int(stat.st_mtime), timezone.utc)
+    if not is_resource_modified(request.environ, etag, last_modified=modified):
+        return Response(status=304, headers=headers)
+
+    ranges = None
+    range_header = request.headers.get('Range')
+    if range_header and _if_range_matches(request, etag, stat.st_mtime):
+        ranges = _parse_ranges(range_header, length)
+        if ranges is not None and not ranges:
+            headers['Content-Range'] = f"bytes */{length}"
+            return Response(status=416, headers=headers)
+        if ranges is not None and len(ranges) > MAX_RANGES:
+            ranges = None
+
+    environ = request.environ
+    if ranges is None or ranges == [(0, length)]:
+        def body():
+            with open(path, 'rb') as handle:
+                yield from send_region(environ, handle, 0, length)
+        headers['Content-Length'] = str(length)
+        return Response(body(), status=200, headers=headers, mimetype=mimetype, direct_passthrough=True)
+
+    if len(ranges) == 1:
+        start, stop = ranges[0]
+
+        def body():
+            with open(path, 'rb') as handle:
+                yield from send_region(environ, handle, start, stop)
+        headers['Content-Range'] = f"bytes {start}-{stop - 1}/{length}"
+        headers['Content-Length'] = str(stop - start)
+        return Response(body(), status=206, headers=headers, mimetype=mimetype, direct_passthrough=True)
+
+    boundary = secrets.token_hex(16)
+    parts = [(f"--{boundary}\r\nContent-Type: {mimetype}\r\n"
+              f"Content-Range: bytes {start}-{stop - 1}/{length}\r\n\r\n").encode('latin-1')
+             for start, stop in ranges]
+    closing = f"--{boundary}--\r\n".encode('latin-1')
+    total = sum(len(part) + (stop - start) + 2 for part, (start, stop) in zip(parts, ranges)) + len(closing)
+
+    def body():
+        with open(path, 'rb') as handle:
+            for part, (start, stop) in zip(parts, ranges):
+                yield part
+                yield from send_region(environ, handle, start, stop)
+                yield b'\r\n'
+            yield closing
+    headers['Content-Length'] = str(total)
+    return Response(body(), status=206, headers=headers,
+                    content_type=f"multipart/byteranges; boundary={boundary}", direct_passthrough=True)
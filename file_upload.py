@@ -0,0 +1,270 @@
+"""
+File Upload - Resumable, chunked uploads streamed to disk
+
+An upload is created with its destination and total size, then its bytes
+are sent as a series of chunks, each a PUT at the upload's current offset.
+Chunk bodies are copied from the request stream to the partial file in
+small blocks, so memory use does not depend on file or chunk size. A chunk
+may carry its SHA-256; a chunk that does not match (or is cut short) is
+rolled back, and the client resumes from the offset the server reports.
+When the last byte arrives the partial file is renamed into place. If that
+rename fails (e.g. the name was taken meanwhile) the upload is left
+"received" with all of its bytes, and finish() retries just the rename. A
+whole-file hash mismatch ends the upload with status "error".
+
+Partial files live next to the destination as ".<name>.<id>.part".
+Uploads idle for longer than `expiry` seconds are forgotten (unfinished ones
+together with their partial file).
+"""
+import hashlib
+import logging
+import os
+import secrets
+import threading
+import time
+
+from utils.errors import UploadError
+
+logger = logging.getLogger('PCGamingApp')
+
+BLOCK_SIZE = 1024 * 1024
+
+
+class _Upload:
+    def __init__(self, upload_id, directory, name, size, sha256, overwrite):
+        self.id = upload_id
+        self.directory = directory
+        self.name = name
+        self.size = size
+        self.sha256 = sha256
+        self.overwrite = overwrite
+        self.part_path = os.path.join(directory, f".{name}.{upload_id}.part")
+        self.path = os.path.join(directory, name)
+        self.offset = 0
+        self.hash = hashlib.sha256()
+        self.status = 'uploading'
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def info(self):
+        return {'id': self.id, 'path': self.path, 'size': self.size, 'offset': self.offset, 'status': self.status}
+
+
+class UploadManager:
+    """Tracks in-progress uploads; each upload accepts one chunk at a time"""
+
+    def __init__(self, max_uploads=16, max_chunk_bytes=64 * 1024 * 1024, expiry=24 * 3600):
+        self.max_uploads = max_uploads
+        self.max_chunk_bytes = max_chunk_bytes
+        self.expiry = expiry
+        self._lock = threading.Lock()
+        self._uploads = {}
+
+    def create(self, directory, name, size, sha256=None, overwrite=False):
+        """
+        Start an upload
+
+        Args:
+            directory: Existing destination directory (already access-checked)
+            name: File name, without any path separators
+            size: Total size in bytes
+            sha256: Optional hex digest of the whole file, checked at the end
+            overwrite: Replace an existing file of the same name
+
+        Returns:
+            Upload info (id, path, size, offset, status)
+
+        Raises:
+            UploadError: If the request is invalid or too many uploads are active
+        """
+        if (not isinstance(name, str) or not name or name in ('.', '..') or os.path.basename(name) != name
+                or '/' in name or '\\' in name or '\0' in name):
+            raise UploadError("name must be a plain file name")
+        if not isinstance(size, int) or isinstance(size, bool) or size < 0:
+            raise UploadError("size must be a non-negative integer")
+        if sha256 is not None and (not isinstance(sha256, str) or len(sha256) != 64):
+            raise UploadError("sha256 must be a hex SHA-256 digest")
+        if not os.path.isdir(directory):
+            raise UploadError("Destination folder not found", 404)
+        if os.path.exists(os.path.join(directory, name)) and not overwrite:
+            raise UploadError("A file with that name already exists", 409)
+
+        self._expire()
+        with self._lock:
+            if sum(upload.status in ('uploading', 'received') for upload in self._uploads.values()) >= self.max_uploads:
+                raise UploadError("Too many uploads in progress", 429)
+            upload = _Upload(secrets.token_urlsafe(12), directory, name, size,
+                             sha256.lower() if sha256 else None, overwrite)
+            self._uploads[upload.id] = upload
+        try:
+            open(upload.part_path, 'wb').close()
+        except OSError as e:
+            self._discard(upload)
+            raise UploadError(f"Cannot write to destination: {e}", 403)
+        logger.info(f"Upload {upload.id} started: {upload.path} ({size} bytes)")
+        if size == 0:
+            with upload.lock:
+                self._finish(upload)
+        return upload.info()
+
+    def status(self, upload_id):
+        """Get an upload's info, or None if unknown"""
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        return upload.info() if upload else None
+
+    def write_chunk(self, upload_id, offset, stream, length, sha256=None):
+        """
+        Append one chunk read from a request stream
+
+        Args:
+            offset: Where the chunk starts; must equal the upload's offset
+            stream: File-like request body
+            length: Content-Length of the chunk
+            sha256: Optional hex digest of the chunk
+
+        Returns:
+            Upload info after the chunk
+
+        Raises:
+            UploadError: 404 unknown upload, 409 wrong offset or a concurrent
+                chunk, 413 chunk too large, 400 bad or short chunk, 422 hash
+                mismatch. offset is set to where the client should resume;
+                it is None when resuming cannot help (see finish()).
+        """
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError("Unknown upload", 404)
+        if length is None or length <= 0:
+            raise UploadError("Content-Length is required", 411)
+        if length > self.max_chunk_bytes:
+            raise UploadError(f"Chunks are limited to {self.max_chunk_bytes} bytes", 413)
+        if not upload.lock.acquire(blocking=False):
+            raise UploadError("Another chunk of this upload is in progress", 409, upload.offset)
+        try:
+            if upload.status != 'uploading':
+                raise UploadError(f"Upload is {upload.status}", 409)
+            if offset != upload.offset:
+                raise UploadError("Offset does not match", 409, upload.offset)
+            if offset + length > upload.size:
+                raise UploadError("Chunk extends past the declared size", 400, upload.offset)
+
+            chunk_hash = hashlib.sha256()
+            file_hash = upload.hash.copy()
+            remaining = length
+            try:
+                with open(upload.part_path, 'r+b') as handle:
+                    handle.seek(offset)
+                    try:
+                        while remaining > 0:
+                            block = stream.read(min(BLOCK_SIZE, remaining))
+                            if not block:
+                                break
+                            handle.write(block)
+                            chunk_hash.update(block)
+                            file_hash.update(block)
+                            remaining -= len(block)
+                        if remaining:
+                            raise UploadError("Chunk body ended early", 400, offset)
+                        if sha256 and chunk_hash.hexdigest() != sha256.lower():
+                            raise UploadError("Chunk SHA-256 does not match", 422, offset)
+                    except BaseException:
+                        # Roll back (also on a dropped connection) so the client resends the whole chunk
+                        handle.truncate(offset)
+                        upload.updated = time.monotonic()
+                        raise
+            except OSError as e:
+                raise UploadError(f"Error writing upload: {e}", 500, offset)
+
+            upload.offset += length
+            upload.hash = file_hash
+            upload.updated = time.monotonic()
+            if upload.offset == upload.size:
+                self._finish(upload)
+            return upload.info()
+        finally:
+            upload.lock.release()
+
+    def finish(self, upload_id):
+        """
+        Retry saving an upload whose bytes have all arrived
+
+        Returns:
+            Upload info
+
+        Raises:
+            UploadError: 404 unknown upload, 409 if the upload is not waiting
+                to be saved or the file name is taken, 500 if saving fails
+        """
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise UploadError("Unknown upload", 404)
+        with upload.lock:
+            if upload.status != 'received':
+                raise UploadError(f"Upload is {upload.status}", 409)
+            upload.updated = time.monotonic()
+            self._finish(upload)
+            return upload.info()
+
+    def cancel(self, upload_id):
+        """
+        Abort an upload and delete its partial file
+
+        Returns:
+            False if the upload is unknown
+        """
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None:
+            return False
+        with upload.lock:
+            upload.status = 'cancelled'
+            self._discard(upload)
+        return True
+
+    def _finish(self, upload):
+        if upload.sha256 and upload.hash.hexdigest() != upload.sha256:
+            # Kept (without its data) until it expires, so its status can be queried
+            upload.status = 'error'
+            self._remove_part(upload)
+            raise UploadError("File SHA-256 does not match; upload discarded", 422)
+        upload.status = 'received'
+        try:
+            if os.path.exists(upload.path) and not upload.overwrite:
+                raise UploadError("A file with that name already exists", 409)
+            os.replace(upload.part_path, upload.path)
+        except OSError as e:
+            raise UploadError(f"Error saving upload: {e}", 500)
+        # Kept until it expires so clients can still query the final status
+        upload.status = 'complete'
+        logger.info(f"Upload {upload.id} complete: {upload.path}")
+
+    def _discard(self, upload):
+        with self._lock:
+            self._uploads.pop(upload.id, None)
+        self._remove_part(upload)
+
+    def _remove_part(self, upload):
+        try:
+            os.remove(upload.part_path)
+        except OSError:
+            pass
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            stale = [upload for upload in self._uploads.values() if now - upload.updated > self.expiry]
+        for upload in stale:
+            if upload.lock.acquire(blocking=False):
+                try:
+                    if upload.status in ('complete', 'error'):
+                        with self._lock:
+                            self._uploads.pop(upload.id, None)
+                    else:
+                        logger.info(f"Upload {upload.id} expired")
+                        upload.status = 'expired'
+                        self._discard(upload)
+                finally:
+                    upload.lock.release()
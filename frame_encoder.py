@@ -0,0 +1,116 @@
+"""
+Frame Encoder - Fast JPEG/WebP encoding of screen frames for remote viewing
+"""
+import io
+import logging
+import threading
+
+from PIL import Image
+
+logger = logging.getLogger('PCGamingApp')
+
+# format name -> (Pillow format, MIME type)
+FRAME_FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'webp': ('WEBP', 'image/webp'),
+}
+MIN_QUALITY = 10
+MAX_QUALITY = 95
+
+
+class FrameEncoder:
+    """
+    Encodes PIL images into a reusable in-memory buffer
+
+    The BytesIO is rewound but never truncated, so its backing storage keeps
+    the size of the largest frame so far and encoding overwrites it in place
+    instead of growing and reallocating it. Only the bytes written for the
+    current frame are returned.
+    """
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+
+    def encode(self, image, fmt='jpeg', quality=70):
+        """
+        Encode an image
+
+        Args:
+            image: PIL image
+            fmt: 'jpeg' or 'webp'
+            quality: 10-95
+
+        Returns:
+            Encoded bytes
+        """
+        pil_format, _ = FRAME_FORMATS[fmt]
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+
+        buffer = self._buffer
+        buffer.seek(0)
+        if fmt == 'jpeg':
+            # 4:2:0 subsampling and no optimize pass favour speed over size
+            image.save(buffer, format=pil_format, quality=quality, subsampling=2, optimize=False)
+        else:
+            # method 0 is the fastest WebP encoder setting
+            image.save(buffer, format=pil_format, quality=quality, method=0)
+        length = buffer.tell()
+        # The view must be released before the next save may resize the buffer
+        with buffer.getbuffer() as view:
+            return bytes(view[:length])
+
+
+def validate_frame_options(fmt, quality):
+    """
+    Normalise frame format and quality request parameters
+
+    Returns:
+        Tuple (format, quality)
+
+    Raises:
+        ValueError: If the format or quality is invalid
+    """
+    fmt = (fmt or 'jpeg').lower()
+    if fmt == 'jpg':
+        fmt = 'jpeg'
+    if fmt not in FRAME_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FRAME_FORMATS)}")
+    quality = int(quality)
+    if not MIN_QUALITY <= quality <= MAX_QUALITY:
+        raise ValueError(f"quality must be between {MIN_QUALITY} and {MAX_QUALITY}")
+    return fmt, quality
+
+
+def resize_frame(image, size):
+    """
+    Downscale an image for a smaller viewer
+
+    Args:
+        image: PIL image
+        size: Target (width, height)
+
+    Returns:
+        The resized image, or the original if it already has that size
+    """
+    if tuple(size) == image.size:
+        return image
+    # reducing_gap lets Pillow do a cheap integer reduce before resampling
+    return image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+
+def frame_mimetype(fmt):
+    """Get the MIME type of a frame format"""
+    return FRAME_FORMATS[fmt][1]
+
+
+# One encoder (and buffer) per thread, since Flask serves requests concurrently
+_local = threading.local()
+
+
+def encode_frame(image, fmt='jpeg', quality=70):
+    """Encode an image with the calling thread's FrameEncoder"""
+    encoder = getattr(_local, 'encoder', None)
+    if encoder is None:
+        encoder = _local.encoder = FrameEncoder()
+    return encoder.encode(image, fmt, quality)
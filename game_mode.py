@@ -0,0 +1,209 @@
+"""
+Game Mode - Automatic CPU priority and affinity management while a game runs
+"""
+import logging
+import threading
+import time
+
+import psutil
+
+from config import (
+    GAME_MODE_ENABLED, GAME_MODE_GAMES, GAME_MODE_BACKGROUND,
+    GAME_MODE_BACKGROUND_ACTION, GAME_MODE_BACKGROUND_CORES
+)
+from processes import priority_value, process_sampler
+
+logger = logging.getLogger('PCGamingApp')
+
+BACKGROUND_ACTIONS = ('lower', 'pin', 'both')
+AFFINITY_SUPPORTED = hasattr(psutil.Process, 'cpu_affinity')
+
+
+class GameModeEngine:
+    """
+    Watches the process sampler for configured games
+
+    When a game starts it is raised to high priority and pinned to the
+    preferred cores, while configured background processes are lowered
+    and/or pinned to the remaining cores. The original priority and affinity
+    of every touched process is recorded and restored when the last game
+    exits or game mode is disabled.
+    """
+
+    def __init__(self, games=None, background=None, background_action='both',
+                 background_cores=2, enabled=True):
+        self.lock = threading.RLock()
+        self.enabled = enabled
+        self.games = set()
+        self.background = set()
+        self.background_action = 'both'
+        self.background_cores = 2
+        self.active_game = None
+        self.activated_at = None
+        # pid -> (process, original nice, original affinity or None)
+        self._saved = {}
+        self.configure(games=games or [], background=background or [],
+                       background_action=background_action, background_cores=background_cores)
+
+    def configure(self, games=None, background=None, background_action=None,
+                  background_cores=None, enabled=None):
+        """
+        Update game mode settings. Changes take effect immediately.
+
+        Raises:
+            ValueError: If an option is invalid
+        """
+        if background_action is not None and background_action not in BACKGROUND_ACTIONS:
+            raise ValueError(f"background_action must be one of {', '.join(BACKGROUND_ACTIONS)}")
+        if background_cores is not None and int(background_cores) < 1:
+            raise ValueError("background_cores must be at least 1")
+
+        with self.lock:
+            self._deactivate()
+            if games is not None:
+                self.games = {name.strip().lower() for name in games if name.strip()}
+            if background is not None:
+                self.background = {name.strip().lower() for name in background if name.strip()}
+            if background_action is not None:
+                self.background_action = background_action
+            if background_cores is not None:
+                self.background_cores = int(background_cores)
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if self.enabled:
+                self._scan(process_sampler)
+
+    def core_split(self):
+        """
+        Split logical cores between the game and background processes
+
+        Returns:
+            Tuple (game_cores, background_cores), or (None, None) if the
+            machine has too few cores to split
+        """
+        cores = list(range(psutil.cpu_count() or 1))
+        if len(cores) <= self.background_cores:
+            return None, None
+        return cores[self.background_cores:], cores[:self.background_cores]
+
+    def on_tick(self, sampler, started, exited):
+        """Process sampler listener"""
+        with self.lock:
+            if not self.enabled:
+                return
+
+            if self.active_game is not None:
+                for pid in exited:
+                    self._saved.pop(pid, None)
+                if self.active_game['pid'] in exited:
+                    self._handle_game_exit(sampler)
+                    return
+                # Apply to background processes launched during the session
+                for pid in started:
+                    entry = sampler.table.get(pid)
+                    if entry is not None and entry.key in self.background:
+                        self._apply_background(entry.process)
+                return
+
+            for pid in started:
+                entry = sampler.table.get(pid)
+                if entry is not None and entry.key in self.games:
+                    self._activate(sampler, entry)
+                    return
+
+    def status(self):
+        """Get the current game mode state"""
+        with self.lock:
+            game_cores, background_cores = self.core_split()
+            return {
+                'enabled': self.enabled,
+                'active': self.active_game is not None,
+                'game': dict(self.active_game) if self.active_game else None,
+                'active_since': self.activated_at,
+                'managed_processes': len(self._saved),
+                'games': sorted(self.games),
+                'background': sorted(self.background),
+                'background_action': self.background_action,
+                'background_cores': self.background_cores,
+                'affinity_supported': AFFINITY_SUPPORTED,
+                'game_core_set': game_cores,
+                'background_core_set': background_cores,
+            }
+
+    def _scan(self, sampler):
+        """Look for an already running game in the whole process table"""
+        with sampler.lock:
+            for name in self.games:
+                for pid in sampler.by_name.get(name, ()):
+                    self._activate(sampler, sampler.table[pid])
+                    return
+
+    def _handle_game_exit(self, sampler):
+        """Restore everything, then switch to another running game if any"""
+        logger.info(f"Game mode: {self.active_game['name']} exited, restoring processes")
+        self._deactivate()
+        self._scan(sampler)
+
+    def _activate(self, sampler, entry):
+        logger.info(f"Game mode: detected {entry.name} (PID {entry.pid})")
+        self.active_game = {'pid': entry.pid, 'name': entry.name}
+        self.activated_at = time.time()
+        game_cores, _ = self.core_split()
+        self._adjust(entry.process, priority_value('high'), game_cores)
+
+        for name in self.background:
+            for pid in sampler.by_name.get(name, ()):
+                self._apply_background(sampler.table[pid].process)
+
+    def _apply_background(self, process):
+        _, background_cores = self.core_split()
+        nice = priority_value('below_normal') if self.background_action in ('lower', 'both') else None
+        affinity = background_cores if self.background_action in ('pin', 'both') else None
+        self._adjust(process, nice, affinity)
+
+    def _adjust(self, process, nice=None, affinity=None):
+        """Change priority/affinity of a process, remembering the original values"""
+        try:
+            if process.pid not in self._saved:
+                original_affinity = process.cpu_affinity() if AFFINITY_SUPPORTED else None
+                self._saved[process.pid] = (process, process.nice(), original_affinity)
+            if nice is not None:
+                process.nice(nice)
+            if affinity is not None and AFFINITY_SUPPORTED:
+                process.cpu_affinity(affinity)
+        except (psutil.NoSuchProcess, psutil.ZombieProcess):
+            self._saved.pop(process.pid, None)
+        except psutil.AccessDenied:
+            logger.warning(f"Game mode: access denied adjusting PID {process.pid}")
+        except Exception as e:
+            logger.error(f"Game mode: error adjusting PID {process.pid}: {e}")
+
+    def _deactivate(self):
+        """Restore original priority and affinity of every managed process"""
+        for pid, (process, nice, affinity) in list(self._saved.items()):
+            try:
+                if not process.is_running():
+                    continue
+                process.nice(nice)
+                if affinity is not None:
+                    process.cpu_affinity(affinity)
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                pass
+            except psutil.AccessDenied:
+                logger.warning(f"Game mode: access denied restoring PID {pid}")
+            except Exception as e:
+                logger.error(f"Game mode: error restoring PID {pid}: {e}")
+        self._saved.clear()
+        self.active_game = None
+        self.activated_at = None
+
+
+# Global engine instance, driven by the process sampler
+game_mode = GameModeEngine(
+    games=GAME_MODE_GAMES,
+    background=GAME_MODE_BACKGROUND,
+    background_action=GAME_MODE_BACKGROUND_ACTION,
+    background_cores=GAME_MODE_BACKGROUND_CORES,
+    enabled=GAME_MODE_ENABLED
+)
+process_sampler.add_listener(game_mode.on_tick)
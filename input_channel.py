@@ -0,0 +1,307 @@
+"""
+Input Channel - Ordered, non-blocking remote mouse/keyboard input
+
+Viewers push input events (over the /remote/input/ws WebSocket or the
+/remote/input batch endpoint) into one server-side queue that a single
+worker thread replays. Queued mouse moves collapse into the latest position,
+so a burst of touchpad moves costs one pointer update instead of one
+blocking call each; clicks, scrolls and keys keep their order. Text is typed
+as a job whose progress can be polled, since long text is pasted through the
+clipboard and may take a moment.
+
+Event format (JSON object, or a list of them):
+    {"type": "move", "x": 10, "y": -4, "relative": true}
+    {"type": "click", "button": "left"}
+    {"type": "scroll", "clicks": -3, "x": 800, "y": 600}
+    {"type": "key", "key": "enter"}
+    {"type": "text", "text": "hello"}
+
+Any event may carry an integer "id"; frames that first reflect it are tagged
+with that id so the viewer can measure input-to-photon latency (see latency).
+Ids are scoped to the viewer that sent them (the "viewer" query parameter of
+the WebSocket, batch endpoint and tile stream), so a viewer's stream only
+carries its own ids.
+"""
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+
+from latency import latency_tracker
+from remote_desktop import move_mouse, click_mouse, scroll_mouse, press_key, inject_text, get_mouse_position
+
+logger = logging.getLogger('PCGamingApp')
+
+EVENT_TYPES = ('move', 'click', 'scroll', 'key', 'text')
+MOUSE_BUTTONS = ('left', 'right', 'middle')
+
+
+def parse_event(data):
+    """
+    Validate one input event from a viewer
+
+    Returns:
+        Normalised event dictionary
+
+    Raises:
+        ValueError: If the event is malformed
+    """
+    if not isinstance(data, dict):
+        raise ValueError("event must be an object")
+    event = _parse_action(data)
+    if data.get('id') is not None:
+        try:
+            event['id'] = int(data['id'])
+        except (TypeError, ValueError):
+            raise ValueError("id must be an integer")
+        if not 0 <= event['id'] < 2 ** 32:
+            raise ValueError("id must be an unsigned 32-bit integer")
+    return event
+
+
+def _parse_action(data):
+    kind = data.get('type')
+    if kind not in EVENT_TYPES:
+        raise ValueError(f"type must be one of {', '.join(EVENT_TYPES)}")
+    try:
+        if kind == 'move':
+            return {'type': kind, 'x': float(data.get('x', 0)), 'y': float(data.get('y', 0)),
+                    'relative': bool(data.get('relative', False))}
+        if kind == 'click':
+            button = data.get('button', 'left')
+            if button not in MOUSE_BUTTONS:
+                raise ValueError(f"button must be one of {', '.join(MOUSE_BUTTONS)}")
+            return {'type': kind, 'button': button}
+        if kind == 'scroll':
+            return {'type': kind, 'clicks': int(data.get('clicks', 0)),
+                    'x': float(data.get('x', 0)), 'y': float(data.get('y', 0))}
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid {kind} event: {e}")
+    value = data.get(kind)
+    if not isinstance(value, str) or not value:
+        raise ValueError(f"{kind} is required")
+    return {'type': kind, kind: value}
+
+
+class InputQueue:
+    """
+    FIFO of input events that coalesces consecutive mouse moves
+
+    A move arriving while the previous queued event is also a move is merged
+    into it: an absolute move replaces it, a relative move adds its offset.
+    Queued events carry "ids", a list of (viewer, id) pairs, and a merged
+    move keeps the ids of every move it absorbed.
+    """
+
+    def __init__(self, max_events=256):
+        self.max_events = max_events
+        self._events = deque()
+        self._condition = threading.Condition()
+        self.coalesced = 0
+
+    def put(self, event):
+        """
+        Queue an event
+
+        Returns:
+            False if the queue is full and the event was dropped
+        """
+        with self._condition:
+            tail = self._events[-1] if self._events else None
+            if event['type'] == 'move' and tail is not None and tail['type'] == 'move':
+                if event['relative']:
+                    tail['x'] += event['x']
+                    tail['y'] += event['y']
+                else:
+                    tail.update(x=event['x'], y=event['y'], relative=False)
+                # The merged move keeps the oldest receive time, so queueing
+                # delay is not understated
+                tail['ids'].extend(event.get('ids', ()))
+                self.coalesced += 1
+                return True
+            if len(self._events) >= self.max_events:
+                return False
+            self._events.append(dict(event, ids=list(event.get('ids', ()))))
+            self._condition.notify()
+            return True
+
+    def get(self, timeout=None):
+        """Take the oldest event, or None on timeout"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._events, timeout):
+                return None
+            return self._events.popleft()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._events)
+
+
+class InputChannel:
+    """Replays queued input events on one worker thread and tracks the cursor"""
+
+    def __init__(self, idle_timeout=30.0, max_jobs=64):
+        self.queue = InputQueue()
+        self.idle_timeout = idle_timeout
+        self.max_jobs = max_jobs
+        self._jobs = OrderedDict()
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._cursor_changed = threading.Condition(self._lock)
+        self._thread = None
+        self.cursor = (0, 0)
+        self.cursor_seq = 0
+        self.stats = {'events': 0, 'errors': 0, 'dropped': 0}
+
+    def submit(self, events, viewer=None):
+        """
+        Queue one event or a list of events for replay
+
+        Args:
+            events: Event dictionary or list of them
+            viewer: Id of the sending viewer, which scopes the events' ids
+
+        Returns:
+            Number of events accepted
+
+        Raises:
+            ValueError: If any event is malformed (none are queued)
+        """
+        if not isinstance(events, list):
+            events = [events]
+        parsed = [parse_event(event) for event in events]
+        accepted = sum(self._queue(event, viewer) for event in parsed)
+        self._ensure_running()
+        return accepted
+
+    def type_text(self, text):
+        """
+        Queue text to be typed
+
+        Returns:
+            Job status dictionary (see job_status)
+
+        Raises:
+            ValueError: If text is empty
+        """
+        event = parse_event({'type': 'text', 'text': text})
+        self._queue(event)
+        self._ensure_running()
+        return self.job_status(event['job'])
+
+    def job_status(self, job_id):
+        """
+        Get a text job's status
+
+        Returns:
+            Dictionary (id, status, chars, method, seconds), or None if unknown.
+            status is queued, typing, done, error or dropped.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def _queue(self, event, viewer=None):
+        event['received'] = time.monotonic()
+        input_id = event.pop('id', None)
+        event['ids'] = [] if input_id is None else [(viewer, input_id)]
+        if event['type'] == 'text':
+            event['job'] = self._new_job(event['text'])
+        if self.queue.put(event):
+            return True
+        self.stats['dropped'] += 1
+        if event['type'] == 'text':
+            self._finish_job(event['job'], 'dropped')
+        return False
+
+    def _new_job(self, text):
+        with self._lock:
+            job_id = str(next(self._job_ids))
+            self._jobs[job_id] = {'id': job_id, 'status': 'queued', 'chars': len(text),
+                                  'method': None, 'seconds': None}
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+            return job_id
+
+    def _update_job(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                job.update(fields)
+
+    def _finish_job(self, job_id, status, method=None, seconds=None):
+        self._update_job(job_id, status=status, method=method,
+                         seconds=round(seconds, 3) if seconds is not None else None)
+
+    def wait_cursor(self, after_seq, timeout=None):
+        """
+        Wait for the cursor to move after after_seq
+
+        Returns:
+            Tuple (seq, (x, y))
+        """
+        with self._cursor_changed:
+            self._cursor_changed.wait_for(lambda: self.cursor_seq > after_seq, timeout)
+            return self.cursor_seq, self.cursor
+
+    def status(self):
+        return {
+            'running': self._thread is not None,
+            'queued': len(self.queue),
+            'coalesced': self.queue.coalesced,
+            'cursor': {'x': self.cursor[0], 'y': self.cursor[1]},
+            **self.stats,
+        }
+
+    def _ensure_running(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='InputChannel', daemon=True)
+                self._thread.start()
+
+    def _apply(self, event):
+        kind = event['type']
+        if kind == 'move':
+            # No animation: the viewer already sends intermediate positions
+            return move_mouse(event['x'], event['y'], event['relative'], duration=0)
+        if kind == 'click':
+            return click_mouse(event['button'])
+        if kind == 'scroll':
+            return scroll_mouse(event['x'], event['y'], event['clicks'])
+        if kind == 'key':
+            return press_key(event['key'])
+        self._update_job(event['job'], status='typing')
+        started = time.monotonic()
+        method = inject_text(event['text'])
+        self._finish_job(event['job'], 'done' if method else 'error', method, time.monotonic() - started)
+        return method is not None
+
+    def _run(self):
+        logger.info("Input channel started")
+        while True:
+            event = self.queue.get(timeout=self.idle_timeout)
+            if event is None:
+                with self._lock:
+                    # Re-check under the lock so a concurrent submit is not lost
+                    if not len(self.queue):
+                        self._thread = None
+                        logger.info("Input channel idle, stopping")
+                        return
+                continue
+
+            self.stats['events'] += 1
+            started = time.monotonic()
+            if not self._apply(event):
+                self.stats['errors'] += 1
+            latency_tracker.input_applied(event['ids'], event['received'], started, time.monotonic())
+            if event['type'] in ('move', 'scroll'):
+                position = get_mouse_position()
+                with self._cursor_changed:
+                    if position != self.cursor:
+                        self.cursor = position
+                        self.cursor_seq += 1
+                        self._cursor_changed.notify_all()
+
+
+input_channel = InputChannel()
@@ -0,0 +1,171 @@
+"""
+Latency - Input-to-photon instrumentation for remote desktop
+
+Every stage between a viewer's input and the frame that shows its effect is
+timed into a histogram:
+
+    input_queue       input received -> replay starts
+    input_apply       replaying the input (pyautogui call)
+    input_to_capture  input applied -> first capture that can show it starts
+    capture           screen grab
+    encode            resize + encode of a frame (or tile diff)
+    send              writing a frame to the viewer's socket
+    input_to_send     input received -> first frame reflecting it written
+    round_trip        viewer-reported: input sent -> reflecting frame drawn
+
+Inputs applied by the input channel get a server sequence number. Each
+captured frame remembers the last sequence applied before its capture began,
+so a stream can tell which inputs a frame is the first to reflect and tag it
+with its own viewer's input ids (an applied input holds the (viewer, id)
+pairs of every move coalesced into it).
+"""
+import bisect
+import logging
+import threading
+from collections import deque, namedtuple
+
+logger = logging.getLogger('PCGamingApp')
+
+STAGES = (
+    'input_queue', 'input_apply', 'input_to_capture', 'capture',
+    'encode', 'send', 'input_to_send', 'round_trip',
+)
+# Bucket upper bounds in milliseconds (the last bucket is open-ended)
+BUCKETS_MS = (1, 2, 5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500, 1000, 2000, 5000)
+
+AppliedInput = namedtuple('AppliedInput', 'seq ids received applied')
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of durations"""
+
+    def __init__(self, bounds_ms=BUCKETS_MS):
+        self.bounds = bounds_ms
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000.0
+        self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, fraction):
+        """Estimate a percentile (ms) by interpolating within its bucket"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                low = self.bounds[index - 1] if index > 0 else 0.0
+                high = self.bounds[index] if index < len(self.bounds) else self.max
+                return round(low + (high - low) * (rank - seen) / count, 2)
+            seen += count
+        return round(self.max, 2)
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else None,
+            'p50_ms': self.percentile(0.5),
+            'p90_ms': self.percentile(0.9),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': round(self.max, 2),
+            'buckets': {
+                (f"le_{bound}" if index < len(self.bounds) else 'inf'): count
+                for index, (bound, count) in enumerate(zip(self.bounds + (None,), self.counts))
+            },
+        }
+
+
+class LatencyTracker:
+    """Per-stage histograms plus the applied-input log used to tag frames"""
+
+    def __init__(self, max_inputs=256):
+        self._lock = threading.Lock()
+        self._histograms = {stage: LatencyHistogram() for stage in STAGES}
+        self._inputs = deque(maxlen=max_inputs)
+        self.applied_seq = 0
+        self._captured_seq = 0
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._histograms[stage].record(seconds)
+
+    def input_applied(self, ids, received, started, finished):
+        """
+        Log an input replayed by the input channel (monotonic timestamps)
+
+        Args:
+            ids: (viewer, id) pairs of the viewer inputs it carried out
+
+        Returns:
+            The input's server sequence number
+        """
+        with self._lock:
+            self._histograms['input_queue'].record(started - received)
+            self._histograms['input_apply'].record(finished - started)
+            self.applied_seq += 1
+            self._inputs.append(AppliedInput(self.applied_seq, tuple(ids), received, finished))
+            return self.applied_seq
+
+    def frame_captured(self, input_seq, started, finished):
+        """
+        Log a capture that began after input `input_seq` was applied
+
+        Args:
+            input_seq: applied_seq read just before the capture started
+            started, finished: Monotonic capture timestamps
+        """
+        with self._lock:
+            self._histograms['capture'].record(finished - started)
+            if input_seq > self._captured_seq:
+                for entry in self._since(self._captured_seq, input_seq):
+                    self._histograms['input_to_capture'].record(max(0.0, started - entry.applied))
+                self._captured_seq = input_seq
+
+    def inputs_between(self, after_seq, upto_seq, viewer=None):
+        """
+        Get a viewer's inputs with after_seq < seq <= upto_seq
+
+        Returns:
+            Tuple (inputs, ids): the AppliedInputs carrying ids of `viewer`
+            (older ones may have been forgotten) and those ids
+        """
+        with self._lock:
+            inputs, ids = [], []
+            for entry in self._since(after_seq, upto_seq):
+                own = [input_id for source, input_id in entry.ids if source == viewer]
+                if own:
+                    inputs.append(entry)
+                    ids.extend(own)
+            return inputs, ids
+
+    def inputs_sent(self, inputs, sent):
+        """
+        Log that the first frame reflecting `inputs` finished sending at `sent`
+
+        Only the stream of the viewer that sent an input reports it, so each
+        input is recorded once.
+        """
+        with self._lock:
+            for entry in inputs:
+                self._histograms['input_to_send'].record(sent - entry.received)
+
+    def summary(self):
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {stage: LatencyHistogram() for stage in STAGES}
+
+    def _since(self, after_seq, upto_seq):
+        return [entry for entry in self._inputs if after_seq < entry.seq <= upto_seq]
+
+
+latency_tracker = LatencyTracker()
@@ -0,0 +1,185 @@
+"""
+Process History - Bounded CPU/RAM history for the heaviest processes
+
+A decayed Space-Saving summary picks the processes that have recently been
+among the top consumers. Only those get a history, stored in a fixed pool of
+preallocated ring buffers, so memory stays constant no matter how many
+short-lived processes the host spawns.
+"""
+import heapq
+import logging
+import threading
+import time
+from array import array
+
+import psutil
+
+from config import HISTORY_TRACKED_PROCESSES, HISTORY_LENGTH, HISTORY_DECAY
+from processes import process_sampler
+
+logger = logging.getLogger('PCGamingApp')
+
+
+class RingBuffer:
+    """Fixed-size time series of (timestamp, cpu percent, rss MB) samples"""
+
+    def __init__(self, size):
+        self.size = size
+        self.timestamps = array('d', bytes(8 * size))
+        self.cpu = array('f', bytes(4 * size))
+        self.rss_mb = array('f', bytes(4 * size))
+        self.head = 0
+        self.count = 0
+
+    def reset(self):
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp, cpu, rss_mb):
+        self.timestamps[self.head] = timestamp
+        self.cpu[self.head] = cpu
+        self.rss_mb[self.head] = rss_mb
+        self.head = (self.head + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+    def series(self):
+        """Get samples oldest first"""
+        start = (self.head - self.count) % self.size
+        indexes = [(start + i) % self.size for i in range(self.count)]
+        return {
+            'timestamps': [round(self.timestamps[i], 3) for i in indexes],
+            'cpu_percent': [round(self.cpu[i], 1) for i in indexes],
+            'memory_mb': [round(self.rss_mb[i], 1) for i in indexes],
+        }
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitter summary with exponential decay
+
+    Holds at most `capacity` counters. An unmonitored item replaces the item
+    with the smallest counter and inherits its count as overestimation error.
+    Counters are multiplied by `decay` every round so past heavy hitters fade.
+    """
+
+    def __init__(self, capacity, decay=0.9):
+        self.capacity = capacity
+        self.decay = decay
+        self.counts = {}
+        self.errors = {}
+
+    def decay_all(self):
+        for key in self.counts:
+            self.counts[key] *= self.decay
+            self.errors[key] *= self.decay
+
+    def offer(self, key, weight):
+        """
+        Add weight to an item
+
+        Returns:
+            The evicted key, or None
+        """
+        if key in self.counts:
+            self.counts[key] += weight
+            return None
+        if len(self.counts) < self.capacity:
+            self.counts[key] = weight
+            self.errors[key] = 0.0
+            return None
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        del self.errors[victim]
+        self.counts[key] = floor + weight
+        self.errors[key] = floor
+        return victim
+
+    def discard(self, key):
+        self.counts.pop(key, None)
+        self.errors.pop(key, None)
+
+    def top(self):
+        return sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+
+
+class ProcessHistory:
+    """Keeps ring-buffer histories for the current heavy-hitter processes"""
+
+    def __init__(self, capacity=16, length=150, decay=0.9):
+        self.lock = threading.Lock()
+        self.summary = SpaceSaving(capacity, decay)
+        self._free = [RingBuffer(length) for _ in range(capacity)]
+        self._buffers = {}
+        self._names = {}
+
+    def on_tick(self, sampler, started, exited):
+        """Process sampler listener"""
+        cpu_count = psutil.cpu_count() or 1
+        total_memory = psutil.virtual_memory().total or 1
+        now = time.time()
+
+        with self.lock:
+            for pid in exited:
+                self._evict(pid)
+
+            self.summary.decay_all()
+            # Only this tick's top consumers are offered, so the cost per tick
+            # is O(n log k) instead of touching the summary for every process
+            weight = lambda entry: entry.cpu_percent / cpu_count + entry.rss * 100 / total_memory
+            for entry in heapq.nlargest(self.summary.capacity, sampler.table.values(), key=weight):
+                victim = self.summary.offer(entry.pid, weight(entry))
+                if victim is not None:
+                    self._evict(victim)
+                if entry.pid not in self._buffers:
+                    buffer = self._free.pop()
+                    buffer.reset()
+                    self._buffers[entry.pid] = buffer
+                    self._names[entry.pid] = entry.name
+
+            for pid, buffer in self._buffers.items():
+                entry = sampler.table.get(pid)
+                if entry is not None:
+                    buffer.append(now, entry.cpu_percent, entry.rss / 1024 / 1024)
+
+    def _evict(self, pid):
+        self.summary.discard(pid)
+        buffer = self._buffers.pop(pid, None)
+        self._names.pop(pid, None)
+        if buffer is not None:
+            self._free.append(buffer)
+
+    def get_history(self, pid=None):
+        """
+        Get histories of the tracked processes, heaviest first
+
+        Args:
+            pid: Only return this process
+
+        Returns:
+            List of dictionaries with pid, name, score and series
+        """
+        with self.lock:
+            result = []
+            for key, score in self.summary.top():
+                if pid is not None and key != pid:
+                    continue
+                buffer = self._buffers.get(key)
+                if buffer is None:
+                    continue
+                result.append({
+                    'pid': key,
+                    'name': self._names.get(key),
+                    'score': round(score, 2),
+                    'error': round(self.summary.errors[key], 2),
+                    **buffer.series(),
+                })
+            return result
+
+
+# Global history instance, driven by the process sampler
+process_history = ProcessHistory(
+    capacity=HISTORY_TRACKED_PROCESSES,
+    length=HISTORY_LENGTH,
+    decay=HISTORY_DECAY
+)
+process_sampler.add_listener(process_history.on_tick)
@@ -0,0 +1,336 @@
+"""
+Process Rules - Declarative automatic process actions evaluated per sampler tick
+
+A rule is a dictionary such as:
+
+    {"name": "calm discord", "when_running": ["cs2.exe"],
+     "target": "discord.exe", "action": "priority", "priority": "below_normal"}
+    {"name": "kill chrome", "while_game": true, "target": "chrome.exe",
+     "metric": "rss_mb", "above": 2048, "action": "kill"}
+    {"name": "cpu hog", "target": "*", "metric": "cpu_percent",
+     "above": 90, "for_seconds": 30, "action": "alert"}
+
+Rules are compiled into name indexes so each tick only touches processes that
+started, exited, or are targeted by a metric condition.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+import psutil
+
+from processes import kill_process, priority_value, process_sampler, PRIORITY_LEVELS
+from game_mode import game_mode
+
+logger = logging.getLogger('PCGamingApp')
+
+RULE_ACTIONS = ('priority', 'kill', 'alert')
+RULE_METRICS = {
+    'cpu_percent': lambda entry: entry.cpu_percent,
+    'rss_mb': lambda entry: entry.rss / 1024 / 1024,
+}
+WILDCARD = '*'
+
+
+class ProcessRule:
+    """A compiled rule"""
+
+    def __init__(self, rule_id, spec):
+        if not isinstance(spec, dict):
+            raise ValueError(f"rule-{rule_id}: a rule must be an object")
+        self.id = rule_id
+        self.spec = dict(spec)
+        self.name = str(spec.get('name') or f"rule-{rule_id}")
+        self.target = str(spec.get('target', '')).strip().lower()
+        when_running = spec.get('when_running', [])
+        if not isinstance(when_running, list) or not all(isinstance(name, str) for name in when_running):
+            raise ValueError(f"{self.name}: when_running must be a list of process names")
+        self.when_running = [name.strip().lower() for name in when_running if name.strip()]
+        self.while_game = bool(spec.get('while_game', False))
+        self.metric = spec.get('metric')
+        self.above = float(spec['above']) if spec.get('above') is not None else None
+        self.for_seconds = float(spec.get('for_seconds', 0))
+        self.action = spec.get('action')
+        self.priority = spec.get('priority', 'below_normal')
+
+        if not self.target:
+            raise ValueError(f"{self.name}: target is required")
+        if self.action not in RULE_ACTIONS:
+            raise ValueError(f"{self.name}: action must be one of {', '.join(RULE_ACTIONS)}")
+        if self.action == 'priority' and self.priority not in PRIORITY_LEVELS:
+            raise ValueError(f"{self.name}: priority must be one of {', '.join(PRIORITY_LEVELS)}")
+        if self.metric is not None:
+            if self.metric not in RULE_METRICS:
+                raise ValueError(f"{self.name}: metric must be one of {', '.join(RULE_METRICS)}")
+            if self.above is None:
+                raise ValueError(f"{self.name}: metric rules need an 'above' threshold")
+        if self.target == WILDCARD and self.metric is None:
+            raise ValueError(f"{self.name}: wildcard targets need a metric condition")
+
+    @property
+    def conditional(self):
+        return bool(self.when_running) or self.while_game
+
+
+class ProcessRuleEngine:
+    """
+    Evaluates process rules against the process sampler table
+
+    Index layout:
+        _by_target      name -> rules without a metric condition
+        _metric_named   name -> rules with a metric condition
+        _metric_any     metric -> wildcard rules, sorted by threshold
+        _by_requirement name -> rules gated on that process running
+    """
+
+    def __init__(self, max_alerts=100):
+        self.lock = threading.RLock()
+        self.rules = []
+        self.alerts = deque(maxlen=max_alerts)
+        self._next_id = 1
+        self._by_id = {}
+        self._by_target = {}
+        self._metric_named = {}
+        self._metric_any = {}
+        self._by_requirement = {}
+        # rule id -> whether its when_running/while_game gate held last tick
+        self._gate = {}
+        # (rule id, pid) -> time the metric condition was first met
+        self._breach_since = {}
+        self._checked = set()
+        # (rule id, pid) pairs that already fired for the current breach/gate
+        self._fired = set()
+        # (rule id, pid) -> (process, original nice) for reversible priority actions
+        self._restore = {}
+        self._game_active = False
+
+    # ---------- configuration ----------
+
+    def set_rules(self, specs):
+        """
+        Replace all rules
+
+        Raises:
+            ValueError: If a rule specification is invalid
+        """
+        compiled = []
+        next_id = self._next_id
+        for spec in specs:
+            compiled.append(ProcessRule(next_id, spec))
+            next_id += 1
+
+        with self.lock:
+            self._restore_all()
+            self.rules = compiled
+            self._next_id = next_id
+            self._compile()
+            self._gate.clear()
+            self._breach_since.clear()
+            self._fired.clear()
+            self._game_active = game_mode.active_game is not None
+            self._evaluate_all(process_sampler)
+
+    def get_rules(self):
+        with self.lock:
+            return [dict(rule.spec, id=rule.id) for rule in self.rules]
+
+    def get_alerts(self):
+        with self.lock:
+            return list(self.alerts)
+
+    def _compile(self):
+        self._by_id = {rule.id: rule for rule in self.rules}
+        self._by_target = {}
+        self._metric_named = {}
+        self._metric_any = {}
+        self._by_requirement = {}
+        for rule in self.rules:
+            if rule.metric is None:
+                self._by_target.setdefault(rule.target, []).append(rule)
+            elif rule.target == WILDCARD:
+                self._metric_any.setdefault(rule.metric, []).append(rule)
+            else:
+                self._metric_named.setdefault(rule.target, []).append(rule)
+            for name in rule.when_running:
+                self._by_requirement.setdefault(name, []).append(rule)
+        for rules in self._metric_any.values():
+            rules.sort(key=lambda rule: rule.above)
+
+    # ---------- evaluation ----------
+
+    def on_tick(self, sampler, started, exited):
+        """Process sampler listener"""
+        with self.lock:
+            if not self.rules:
+                return
+            now = time.time()
+
+            for pid in exited:
+                self._forget_pid(pid)
+
+            # Rules whose gate may have flipped this tick
+            dirty = set()
+            game_active = game_mode.active_game is not None
+            if game_active != self._game_active:
+                self._game_active = game_active
+                dirty.update(rule.id for rule in self.rules if rule.while_game)
+            changed_names = {sampler.table[pid].key for pid in started if pid in sampler.table}
+            changed_names.update(sampler.exited[pid].key for pid in exited if pid in sampler.exited)
+            for name in changed_names:
+                dirty.update(rule.id for rule in self._by_requirement.get(name, ()))
+
+            for rule_id in dirty:
+                self._update_gate(sampler, self._by_id[rule_id])
+
+            # Newly started targets of simple rules whose gate holds after the
+            # update above (a gate that just opened already fired for them;
+            # _fire skips pids that already fired)
+            for pid in started:
+                entry = sampler.table.get(pid)
+                if entry is None:
+                    continue
+                for rule in self._by_target.get(entry.key, ()):
+                    if self._gate.get(rule.id, False):
+                        self._fire(rule, entry)
+
+            # Metric conditions on named targets
+            for name, rules in self._metric_named.items():
+                pids = sampler.by_name.get(name)
+                if not pids:
+                    continue
+                for rule in rules:
+                    if not self._gate.get(rule.id, False):
+                        continue
+                    for pid in pids:
+                        self._check_metric(rule, sampler.table[pid], now)
+
+            # Wildcard metric conditions: one pass per metric, skipping
+            # processes under the lowest threshold
+            for metric, rules in self._metric_any.items():
+                active = [rule for rule in rules if self._gate.get(rule.id, False)]
+                if not active:
+                    continue
+                read = RULE_METRICS[metric]
+                floor = active[0].above
+                for entry in sampler.table.values():
+                    value = read(entry)
+                    if value <= floor:
+                        continue
+                    for rule in active:
+                        self._check_metric(rule, entry, now, value)
+
+            # Windows of processes that were not over a threshold this tick are reset
+            for key in [key for key in self._breach_since if key not in self._checked]:
+                del self._breach_since[key]
+                self._fired.discard(key)
+            self._checked.clear()
+
+    def _evaluate_all(self, sampler):
+        """Full evaluation used after rules change"""
+        with sampler.lock:
+            for rule in self.rules:
+                self._update_gate(sampler, rule)
+
+    def _gate_holds(self, sampler, rule):
+        if rule.while_game and game_mode.active_game is None:
+            return False
+        return all(sampler.by_name.get(name) for name in rule.when_running)
+
+    def _update_gate(self, sampler, rule):
+        holds = self._gate_holds(sampler, rule)
+        previous = self._gate.get(rule.id)
+        self._gate[rule.id] = holds
+        if holds == previous:
+            return
+        if holds:
+            if rule.metric is None:
+                for pid in sampler.by_name.get(rule.target, ()):
+                    self._fire(rule, sampler.table[pid])
+        else:
+            self._release(rule)
+
+    def _check_metric(self, rule, entry, now, value=None):
+        if value is None:
+            value = RULE_METRICS[rule.metric](entry)
+        key = (rule.id, entry.pid)
+        if value <= rule.above:
+            return
+        self._checked.add(key)
+        since = self._breach_since.setdefault(key, now)
+        if now - since >= rule.for_seconds:
+            self._fire(rule, entry, value)
+
+    def _fire(self, rule, entry, value=None):
+        key = (rule.id, entry.pid)
+        if key in self._fired:
+            return
+        self._fired.add(key)
+
+        if rule.action == 'alert':
+            self._alert(rule, entry, value)
+        elif rule.action == 'kill':
+            self._alert(rule, entry, value)
+            threading.Thread(target=self._kill, args=(rule, entry.pid), daemon=True).start()
+        elif rule.action == 'priority':
+            try:
+                original = entry.process.nice()
+                entry.process.nice(priority_value(rule.priority))
+                if rule.conditional:
+                    self._restore[key] = (entry.process, original)
+                logger.info(f"Rule '{rule.name}': set {entry.name} (PID {entry.pid}) priority to {rule.priority}")
+            except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                pass
+            except psutil.AccessDenied:
+                logger.warning(f"Rule '{rule.name}': access denied changing priority of PID {entry.pid}")
+
+    def _kill(self, rule, pid):
+        success, message = kill_process(pid)
+        if success:
+            logger.info(f"Rule '{rule.name}': {message}")
+        else:
+            logger.warning(f"Rule '{rule.name}': {message}")
+
+    def _alert(self, rule, entry, value):
+        alert = {
+            'rule': rule.name,
+            'action': rule.action,
+            'pid': entry.pid,
+            'name': entry.name,
+            'metric': rule.metric,
+            'value': round(value, 1) if value is not None else None,
+            'timestamp': time.time(),
+        }
+        self.alerts.append(alert)
+        logger.warning(f"Rule '{rule.name}' triggered for {entry.name} (PID {entry.pid})")
+
+    def _release(self, rule):
+        """Undo reversible actions of a rule whose gate stopped holding"""
+        for key in [key for key in self._fired if key[0] == rule.id]:
+            self._fired.discard(key)
+            self._breach_since.pop(key, None)
+            saved = self._restore.pop(key, None)
+            if saved is None:
+                continue
+            process, original = saved
+            try:
+                if process.is_running():
+                    process.nice(original)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+
+    def _restore_all(self):
+        for rule in self.rules:
+            self._release(rule)
+
+    def _forget_pid(self, pid):
+        for rule in self.rules:
+            key = (rule.id, pid)
+            self._fired.discard(key)
+            self._restore.pop(key, None)
+            self._breach_since.pop(key, None)
+
+
+# Global engine instance, driven by the process sampler
+process_rules = ProcessRuleEngine()
+process_sampler.add_listener(process_rules.on_tick)
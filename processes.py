@@ -1,45 +1,45 @@
 """
 Process Manager - Get process information and manage processes
 """
+import heapq
+import numpy as np
 import psutil
 import logging
+import threading
+import time
+
+from config import PROCESS_SAMPLE_INTERVAL
 
 logger = logging.getLogger('PCGamingApp')
 
 
-def get_top_processes(limit=10, sort_by='cpu'):
+def get_top_processes(limit=10, sort_by='cpu', offset=0, name=None, min_memory_mb=None):
     """
     Get top processes by CPU or memory usage
     
+    Reads the columnar snapshot published by the process sampler, so sorting,
+    filtering and paging are vectorized and only the returned page is turned
+    into dictionaries.
+    
     Args:
         limit: Number of processes to return
-        sort_by: 'cpu' or 'memory'
+        sort_by: 'cpu', 'memory', 'io', 'threads', 'pid' or 'name' (anything
+                 else sorts by memory)
+        offset: Number of processes to skip (for paging)
+        name: Only include processes whose name contains this text
+        min_memory_mb: Only include processes using more memory than this
     
     Returns:
         List of process dictionaries
     """
     try:
-        processes = []
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent', 'memory_info']):
-            try:
-                pinfo = proc.info
-                processes.append({
-                    'pid': pinfo['pid'],
-                    'name': pinfo['name'],
-                    'cpu_percent': round(pinfo['cpu_percent'] or 0, 1),
-                    'memory_percent': round(pinfo['memory_percent'] or 0, 1),
-                    'memory_mb': round((pinfo['memory_info'].rss / 1024 / 1024), 1) if pinfo['memory_info'] else 0
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                pass
-        
-        # Sort by specified metric
-        if sort_by == 'cpu':
-            processes.sort(key=lambda x: x['cpu_percent'], reverse=True)
-        else:  # memory
-            processes.sort(key=lambda x: x['memory_percent'], reverse=True)
-        
-        return processes[:limit]
+        # Never tick here: listeners (game mode, process rules) only run on the sampler thread
+        snapshot = process_sampler.wait_for_snapshot(timeout=process_sampler.interval)
+        if snapshot is None:
+            return []
+        return snapshot.query(limit, sort_by, offset, name, min_memory_mb)
+    except ValueError:
+        raise
     except Exception as e:
         logger.error(f"Error getting top processes: {e}")
         return []
@@ -73,3 +73,427 @@ def kill_process(pid):
         logger.error(f"Error killing process {pid}: {e}")
         return False, f"Error killing process: {str(e)}"
 
+
+
+# ==================== PRIORITY CONTROL ====================
+
+# Named priority levels mapped to platform values (Windows priority classes
+# or POSIX nice values)
+PRIORITY_LEVELS = ('low', 'below_normal', 'normal', 'above_normal', 'high')
+
+
+def priority_value(level):
+    """
+    Translate a named priority level into a value accepted by Process.nice()
+    
+    Args:
+        level: One of PRIORITY_LEVELS
+    
+    Returns:
+        Platform specific priority value
+    """
+    if level not in PRIORITY_LEVELS:
+        raise ValueError(f"Unknown priority level: {level}")
+    
+    if psutil.WINDOWS:
+        return {
+            'low': psutil.IDLE_PRIORITY_CLASS,
+            'below_normal': psutil.BELOW_NORMAL_PRIORITY_CLASS,
+            'normal': psutil.NORMAL_PRIORITY_CLASS,
+            'above_normal': psutil.ABOVE_NORMAL_PRIORITY_CLASS,
+            'high': psutil.HIGH_PRIORITY_CLASS,
+        }[level]
+    return {
+        'low': 19,
+        'below_normal': 10,
+        'normal': 0,
+        'above_normal': -5,
+        'high': -10,
+    }[level]
+
+
+def set_process_priority(pid, level):
+    """
+    Change the scheduling priority of a process
+    
+    Args:
+        pid: Process ID
+        level: One of PRIORITY_LEVELS
+    
+    Returns:
+        Tuple (success: bool, message: str)
+    """
+    try:
+        process = psutil.Process(pid)
+        process.nice(priority_value(level))
+        return True, f"Process {pid} ({process.name()}) priority set to {level}"
+    except ValueError as e:
+        return False, str(e)
+    except psutil.NoSuchProcess:
+        return False, f"Process {pid} not found"
+    except psutil.AccessDenied:
+        return False, f"Access denied. Cannot change priority of process {pid}. Try running as administrator."
+    except Exception as e:
+        logger.error(f"Error setting priority of process {pid}: {e}")
+        return False, f"Error setting priority: {str(e)}"
+
+
+# ==================== PROCESS SAMPLER ====================
+
+IO_COUNTERS_SUPPORTED = hasattr(psutil.Process, 'io_counters')
+
+
+class ProcessEntry:
+    """Cached state of a single process in the sampler table"""
+    
+    __slots__ = (
+        'pid', 'name', 'key', 'name_id', 'process', 'cpu_percent', 'rss', 'num_threads',
+        'io', 'io_time', 'read_bps', 'write_bps', 'read_ops', 'write_ops'
+    )
+    
+    def __init__(self, pid, name, process, name_id=0):
+        self.pid = pid
+        self.name = name
+        self.key = name.lower()
+        self.name_id = name_id
+        self.process = process
+        self.cpu_percent = 0.0
+        self.rss = 0
+        self.num_threads = 0
+        # Last io_counters() reading and the rates derived from it
+        self.io = None
+        self.io_time = 0.0
+        self.read_bps = 0.0
+        self.write_bps = 0.0
+        self.read_ops = 0.0
+        self.write_ops = 0.0
+    
+    def update_io(self, io, now):
+        """Diff a new io_counters() reading against the previous one"""
+        previous, elapsed = self.io, now - self.io_time
+        self.io, self.io_time = io, now
+        if previous is None or elapsed <= 0:
+            return
+        # Counters can go backwards if the PID was reused; clamp to zero
+        self.read_bps = max(io.read_bytes - previous.read_bytes, 0) / elapsed
+        self.write_bps = max(io.write_bytes - previous.write_bytes, 0) / elapsed
+        self.read_ops = max(io.read_count - previous.read_count, 0) / elapsed
+        self.write_ops = max(io.write_count - previous.write_count, 0) / elapsed
+
+
+class NameTable:
+    """Interns process names so snapshots store small integer IDs"""
+    
+    def __init__(self):
+        self.ids = {}
+        self.names = []
+    
+    @classmethod
+    def from_entries(cls, entries):
+        """Build a table holding only the names of `entries`, renumbering their name_id"""
+        table = cls()
+        for entry in entries:
+            entry.name_id = table.intern(entry.name)
+        return table
+    
+    def intern(self, name):
+        name_id = self.ids.get(name)
+        if name_id is None:
+            name_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return name_id
+
+
+class ProcessSnapshot:
+    """
+    Immutable struct-of-arrays view of the process table
+    
+    Built once per sampler tick; every request sorts, filters and pages it
+    with NumPy instead of building and sorting a dictionary per process.
+    """
+    
+    def __init__(self, columns, names, total_memory):
+        self.pid = columns['pid']
+        self.cpu = columns['cpu']
+        self.rss = columns['rss']
+        self.io = columns['io']
+        self.threads = columns['threads']
+        self.name_id = columns['name_id']
+        # Names are only appended to (a compacted table is a new list), so a
+        # reference to the shared list is stable
+        self.names = names
+        self.name_count = len(names)
+        self.total_memory = total_memory
+    
+    @classmethod
+    def from_entries(cls, entries, name_table):
+        entries = list(entries)
+        count = len(entries)
+        columns = {
+            'pid': np.fromiter((e.pid for e in entries), dtype=np.int64, count=count),
+            'cpu': np.fromiter((e.cpu_percent for e in entries), dtype=np.float32, count=count),
+            'rss': np.fromiter((e.rss for e in entries), dtype=np.int64, count=count),
+            'io': np.fromiter((e.read_bps + e.write_bps for e in entries), dtype=np.float32, count=count),
+            'threads': np.fromiter((e.num_threads for e in entries), dtype=np.int32, count=count),
+            'name_id': np.fromiter((e.name_id for e in entries), dtype=np.int32, count=count),
+        }
+        return cls(columns, name_table.names, psutil.virtual_memory().total or 1)
+    
+    def __len__(self):
+        return len(self.pid)
+    
+    def _sort_key(self, sort_by):
+        """Get an array where larger values sort first"""
+        if sort_by == 'cpu':
+            return self.cpu
+        if sort_by == 'memory':
+            return self.rss
+        if sort_by == 'io':
+            return self.io
+        if sort_by == 'threads':
+            return self.threads
+        if sort_by == 'pid':
+            return -self.pid
+        if sort_by == 'name':
+            # Rank the vocabulary once, then sort ascending by rank
+            vocabulary = self.names[:self.name_count]
+            order = sorted(range(self.name_count), key=lambda i: vocabulary[i].lower())
+            rank = np.empty(self.name_count, dtype=np.int32)
+            rank[order] = np.arange(self.name_count, dtype=np.int32)
+            return -rank[self.name_id]
+        return self.rss
+    
+    def query(self, limit=10, sort_by='cpu', offset=0, name=None, min_memory_mb=None):
+        """Filter, sort and page the snapshot into a list of dictionaries"""
+        key = self._sort_key(sort_by)
+        indexes = np.arange(len(self))
+        
+        mask = None
+        if name:
+            needle = name.lower()
+            vocabulary = self.names[:self.name_count]
+            matches = np.fromiter((needle in n.lower() for n in vocabulary), dtype=bool, count=self.name_count)
+            mask = matches[self.name_id]
+        if min_memory_mb is not None:
+            over = self.rss > int(float(min_memory_mb) * 1024 * 1024)
+            mask = over if mask is None else mask & over
+        if mask is not None:
+            indexes = np.flatnonzero(mask)
+        
+        offset = max(int(offset), 0)
+        wanted = offset + max(int(limit), 0)
+        if wanted == 0 or len(indexes) == 0:
+            return []
+        values = key[indexes]
+        if wanted < len(indexes):
+            # Partial selection of the first page(s) before the final sort
+            part = np.argpartition(-values, wanted - 1)[:wanted]
+            indexes, values = indexes[part], values[part]
+        order = np.argsort(-values, kind='stable')
+        page = indexes[order][offset:wanted]
+        
+        memory_percent = self.rss[page] * (100.0 / self.total_memory)
+        return [
+            {
+                'pid': int(self.pid[i]),
+                'name': self.names[self.name_id[i]],
+                'cpu_percent': round(float(self.cpu[i]), 1),
+                'memory_percent': round(float(percent), 1),
+                'memory_mb': round(int(self.rss[i]) / 1024 / 1024, 1),
+                'num_threads': int(self.threads[i]),
+            }
+            for i, percent in zip(page.tolist(), memory_percent.tolist())
+        ]
+
+
+SORT_COLUMNS = ('cpu', 'memory', 'io', 'threads', 'pid', 'name')
+
+
+class ProcessSampler:
+    """
+    Persistent process table refreshed on a background thread
+    
+    psutil.Process objects are kept alive between ticks so cpu_percent() has
+    a baseline and per-process state is never rebuilt. Listeners are called
+    after every tick as listener(sampler, started, exited) where started and
+    exited are sets of PIDs; entries of exited PIDs stay available in
+    sampler.exited until the next tick.
+    """
+    
+    def __init__(self, interval=2.0):
+        self.interval = interval
+        self.table = {}
+        self.by_name = {}
+        self.exited = {}
+        self.names = NameTable()
+        self.snapshot = None
+        self._ready = threading.Event()
+        self.tick_count = 0
+        self.last_tick = 0.0
+        self.lock = threading.RLock()
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+    
+    def add_listener(self, listener):
+        """Register a callable invoked after every tick"""
+        with self.lock:
+            if listener not in self._listeners:
+                self._listeners.append(listener)
+    
+    def remove_listener(self, listener):
+        """Unregister a tick listener"""
+        with self.lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+    
+    def pids_by_name(self, name):
+        """Get the PIDs of running processes with the given executable name"""
+        with self.lock:
+            return set(self.by_name.get(name.lower(), ()))
+    
+    def wait_for_snapshot(self, timeout=None):
+        """Get the latest snapshot, waiting up to `timeout` for the first tick (None if none yet)"""
+        self._ready.wait(timeout)
+        return self.snapshot
+    
+    def tick(self):
+        """
+        Refresh the process table once and notify listeners
+        
+        Returns:
+            Tuple (started: set, exited: set) of PIDs
+        """
+        with self.lock:
+            current = set(psutil.pids())
+            known = set(self.table)
+            started = set()
+            exited = known - current
+            
+            for pid in current - known:
+                try:
+                    process = psutil.Process(pid)
+                    name = process.name()
+                    entry = ProcessEntry(pid, name, process, self.names.intern(name))
+                    # Prime cpu_percent so the next call has a baseline
+                    process.cpu_percent(None)
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+                self.table[pid] = entry
+                self.by_name.setdefault(entry.key, set()).add(pid)
+                started.add(pid)
+            
+            now = time.monotonic()
+            for pid, entry in list(self.table.items()):
+                if pid in exited:
+                    continue
+                try:
+                    with entry.process.oneshot():
+                        entry.cpu_percent = entry.process.cpu_percent(None)
+                        entry.rss = entry.process.memory_info().rss
+                        entry.num_threads = entry.process.num_threads()
+                        if IO_COUNTERS_SUPPORTED:
+                            entry.update_io(entry.process.io_counters(), now)
+                except psutil.NoSuchProcess:
+                    exited.add(pid)
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    pass
+            
+            self.exited = {}
+            for pid in exited:
+                entry = self.table.pop(pid, None)
+                if entry is None:
+                    continue
+                self.exited[pid] = entry
+                pids = self.by_name.get(entry.key)
+                if pids is not None:
+                    pids.discard(pid)
+                    if not pids:
+                        del self.by_name[entry.key]
+            # A PID that appeared and vanished within the same tick is not reported
+            started -= exited
+            # Names of processes that exited are only dropped by rebuilding the
+            # table, once they clearly outnumber the live ones
+            if len(self.names.names) > 2 * len(self.by_name) + 64:
+                self.names = NameTable.from_entries(self.table.values())
+            self.snapshot = ProcessSnapshot.from_entries(self.table.values(), self.names)
+            self._ready.set()
+            
+            self.tick_count += 1
+            self.last_tick = time.time()
+            listeners = list(self._listeners)
+        
+        for listener in listeners:
+            try:
+                listener(self, started, exited)
+            except Exception as e:
+                logger.error(f"Process sampler listener {listener} failed: {e}")
+        
+        return started, exited
+    
+    def start(self):
+        """Start the background sampling thread"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='ProcessSampler', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Stop the background sampling thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+    
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Error sampling processes: {e}")
+            self._stop.wait(self.interval)
+
+
+IO_SORT_KEYS = {
+    'total': lambda entry: entry.read_bps + entry.write_bps,
+    'read': lambda entry: entry.read_bps,
+    'write': lambda entry: entry.write_bps,
+    'ops': lambda entry: entry.read_ops + entry.write_ops,
+}
+
+
+def get_top_io_processes(limit=10, sort_by='total', sampler=None):
+    """
+    Get the processes with the highest disk I/O rates since the last tick
+    
+    Args:
+        limit: Number of processes to return
+        sort_by: 'total', 'read', 'write' or 'ops'
+        sampler: ProcessSampler to read from (defaults to the global one)
+    
+    Returns:
+        List of process dictionaries
+    """
+    if sort_by not in IO_SORT_KEYS:
+        raise ValueError(f"sort_by must be one of {', '.join(IO_SORT_KEYS)}")
+    sampler = sampler or process_sampler
+    key = IO_SORT_KEYS[sort_by]
+    
+    with sampler.lock:
+        top = heapq.nlargest(limit, sampler.table.values(), key=key)
+        return [
+            {
+                'pid': entry.pid,
+                'name': entry.name,
+                'read_mb_s': round(entry.read_bps / 1024 / 1024, 2),
+                'write_mb_s': round(entry.write_bps / 1024 / 1024, 2),
+                'read_ops_s': round(entry.read_ops, 1),
+                'write_ops_s': round(entry.write_ops, 1),
+            }
+            for entry in top if key(entry) > 0
+        ]
+
+
+# Global sampler instance
+process_sampler = ProcessSampler(interval=PROCESS_SAMPLE_INTERVAL)
@@ -5,8 +5,13 @@ import pyautogui
 import io
 import base64
 import logging
+import sys
 import time
 
+from capture_target import capture_target
+from clipboard_manager import get_clipboard, set_clipboard, PYPERCLIP_AVAILABLE
+from frame_encoder import encode_frame, frame_mimetype
+
 logger = logging.getLogger('PCGamingApp')
 
 # Disable pyautogui failsafe for remote control
@@ -14,6 +19,12 @@ pyautogui.FAILSAFE = False
 # Set pause between actions (reduce for faster response)
 pyautogui.PAUSE = 0.01
 
+# Text at least this long (or containing characters without a key) is pasted
+PASTE_THRESHOLD = 32
+# Time the target application gets to read the clipboard before it is restored
+CLIPBOARD_RESTORE_DELAY = 0.25
+PASTE_MODIFIER = 'command' if sys.platform == 'darwin' else 'ctrl'
+
 
 def get_screen_frame():
     """
@@ -23,7 +34,7 @@ def get_screen_frame():
         Base64 encoded image string and timestamp
     """
     try:
-        screenshot = pyautogui.screenshot()
+        screenshot = capture_screen()
         
         # Convert to bytes
         img_buffer = io.BytesIO()
@@ -39,20 +50,50 @@ def get_screen_frame():
         raise
 
 
-def move_mouse(x, y, relative=False):
+def capture_screen():
+    """
+    Capture the selected capture target (whole desktop by default)
+    
+    Returns:
+        PIL image (reused by the next capture on the same thread)
+    """
+    return capture_target.capture()
+
+
+def get_screen_frame_bytes(fmt='jpeg', quality=70):
+    """
+    Get current screen as raw encoded image bytes
+    
+    Args:
+        fmt: 'jpeg' or 'webp'
+        quality: Encoder quality (10-95)
+    
+    Returns:
+        Tuple (image bytes, MIME type, timestamp)
+    """
+    try:
+        screenshot = capture_screen()
+        return encode_frame(screenshot, fmt, quality), frame_mimetype(fmt), time.time()
+    except Exception as e:
+        logger.error(f"Error getting screen frame: {e}")
+        raise
+
+
+def move_mouse(x, y, relative=False, duration=0.1):
     """
     Move mouse to coordinates
     
     Args:
-        x: X coordinate
-        y: Y coordinate
+        x: X coordinate, relative to the capture target
+        y: Y coordinate, relative to the capture target
         relative: If True, move relative to current position
+        duration: Seconds to animate the move over (blocks meanwhile); 0 jumps
     """
     try:
         if relative:
-            pyautogui.moveRel(x, y, duration=0.1)
+            pyautogui.moveRel(x, y, duration=duration)
         else:
-            pyautogui.moveTo(x, y, duration=0.1)
+            pyautogui.moveTo(*capture_target.to_desktop(x, y), duration=duration)
         return True
     except Exception as e:
         logger.error(f"Error moving mouse: {e}")
@@ -83,11 +124,12 @@ def scroll_mouse(x, y, clicks):
     Scroll mouse wheel
     
     Args:
-        x: X coordinate
-        y: Y coordinate
+        x: X coordinate, relative to the capture target
+        y: Y coordinate, relative to the capture target
         clicks: Number of scroll clicks (positive for up, negative for down)
     """
     try:
+        x, y = capture_target.to_desktop(x, y)
         pyautogui.scroll(clicks, x=x, y=y)
         return True
     except Exception as e:
@@ -117,24 +159,113 @@ def type_text(text):
     Args:
         text: Text to type
     """
+    return inject_text(text) is not None
+
+
+def paste_text(text):
+    """
+    Inject text by pasting it from the clipboard
+    
+    The previous clipboard content is restored afterwards.
+    
+    Args:
+        text: Text to paste
+    
+    Returns:
+        Success status
+    """
+    previous = get_clipboard()
+    if not set_clipboard(text):
+        return False
     try:
-        pyautogui.write(text, interval=0.01)
+        pyautogui.hotkey(PASTE_MODIFIER, 'v')
+        time.sleep(CLIPBOARD_RESTORE_DELAY)
         return True
     except Exception as e:
-        logger.error(f"Error typing text: {e}")
+        logger.error(f"Error pasting text: {e}")
         return False
+    finally:
+        if previous is not None:
+            set_clipboard(previous)
+
+
+def inject_text(text):
+    """
+    Type text in roughly constant time
+    
+    Long text, and text with characters that have no key (non-ASCII), is
+    pasted from the clipboard; short text is sent as one batch of key events
+    without per-character delays.
+    
+    Args:
+        text: Text to type
+    
+    Returns:
+        'paste' or 'keys' for the method used, or None on failure (including
+        non-ASCII text that cannot be pasted, since typing would drop it)
+    """
+    try:
+        if PYPERCLIP_AVAILABLE and (len(text) >= PASTE_THRESHOLD or not text.isascii()):
+            if paste_text(text):
+                return 'paste'
+            logger.warning("Clipboard paste failed, typing text instead")
+        if not text.isascii():
+            dropped = ''.join(sorted({char for char in text if not char.isascii()}))
+            logger.warning(f"Cannot type non-ASCII characters {dropped!r} without the clipboard")
+            return None
+        # interval=0 and a single pause after the batch instead of one per key
+        pyautogui.write(text, interval=0)
+        return 'keys'
+    except Exception as e:
+        logger.error(f"Error injecting text: {e}")
+        return None
+
+
+def get_mouse_position():
+    """
+    Get the current cursor position
+    
+    Returns:
+        Tuple (x, y) relative to the capture target
+    """
+    try:
+        x, y = capture_target.from_desktop(*pyautogui.position())
+        return int(x), int(y)
+    except Exception as e:
+        logger.error(f"Error getting mouse position: {e}")
+        return (0, 0)
 
 
-def get_screen_size():
+def get_screen_size(monitor=None):
     """
     Get screen size
     
+    Args:
+        monitor: Monitor index (0 = whole desktop), or None for the size of
+            the current capture target
+    
     Returns:
         Tuple (width, height)
     """
     try:
-        return pyautogui.size()
+        if monitor is None:
+            _, _, width, height = capture_target.bounds()
+            return width, height
+        screen = get_monitors()[monitor]
+        return screen['width'], screen['height']
+    except IndexError:
+        raise ValueError(f"Unknown monitor {monitor}")
     except Exception as e:
         logger.error(f"Error getting screen size: {e}")
         return (1920, 1080)  # Default fallback
 
+
+def get_monitors():
+    """
+    Get the geometry of every monitor
+    
+    Returns:
+        List of dictionaries (index, left, top, width, height); index 0 is the
+        bounding box of all monitors
+    """
+    return capture_target.monitors()
@@ -0,0 +1,56 @@
+"""
+Remote Stream - MJPEG (multipart/x-mixed-replace) streaming of the screen
+"""
+import logging
+import time
+
+from latency import latency_tracker
+
+logger = logging.getLogger('PCGamingApp')
+
+BOUNDARY = 'frame'
+
+
+def mjpeg_stream(hub, controller, fmt='jpeg', mimetype='image/jpeg', idle_timeout=5.0):
+    """
+    Generate a multipart/x-mixed-replace body from the shared capture loop
+
+    Args:
+        hub: CaptureHub publishing captured frames
+        controller: AdaptiveController providing fps, size and quality and
+            receiving send timings
+        fmt: Encoding of each part
+        mimetype: Content type of each part
+        idle_timeout: Give up if no frame is produced for this many seconds
+
+    Yields:
+        Multipart chunks, one per frame
+    """
+    token = hub.subscribe(controller)
+    seq = 0
+    try:
+        while True:
+            # Always the newest frame: anything captured while the previous
+            # chunk was being written is dropped rather than queued
+            frame = hub.wait(seq, timeout=idle_timeout)
+            if frame is None:
+                logger.warning("Remote stream stalled, closing")
+                return
+            seq = frame.seq
+            started = time.monotonic()
+            data = hub.encode(frame, controller.frame_size(*frame.image.size), fmt, controller.quality)
+            chunk = (
+                f"--{BOUNDARY}\r\nContent-Type: {mimetype}\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n"
+            ).encode('ascii') + data + b"\r\n"
+            sent = time.monotonic()
+            yield chunk
+            # The server resumes the generator once the chunk was written, so
+            # this measures socket backpressure towards the viewer
+            controller.on_sent(seq, len(chunk), time.monotonic() - sent)
+            latency_tracker.record('send', time.monotonic() - sent)
+            # The hub runs at the fastest viewer's rate; slower viewers skip frames
+            time.sleep(max(0.0, 1.0 / controller.fps - (time.monotonic() - started)))
+    finally:
+        # Runs when the client disconnects and the server closes the generator
+        hub.unsubscribe(token)
@@ -0,0 +1,247 @@
+"""
+Replay Buffer - Instant replay of the last seconds of the screen
+
+A background recorder takes frames from the shared capture loop, keeps them
+JPEG-compressed in a ring buffer bounded by a byte budget, and on request
+writes the most recent seconds to a clip file from a separate thread, so
+saving never stalls capture.
+
+Clips are Matroska files with the JPEG frames muxed as-is (no re-encoding)
+when PyAV is installed, otherwise raw concatenated MJPEG.
+"""
+import io
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from fractions import Fraction
+from pathlib import Path
+
+from PIL import Image
+
+logger = logging.getLogger('PCGamingApp')
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+
+class ReplayBuffer:
+    """Byte-budgeted ring buffer of (timestamp, JPEG bytes) frames"""
+
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._frames = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def append(self, timestamp, data):
+        with self._lock:
+            self._frames.append((timestamp, data))
+            self._bytes += len(data)
+            # Evict the oldest frames until the buffer fits its budget again
+            while self._bytes > self.budget_bytes and len(self._frames) > 1:
+                _, old = self._frames.popleft()
+                self._bytes -= len(old)
+                self.dropped += 1
+
+    def snapshot(self, seconds=None):
+        """
+        Get the buffered frames, optionally only the last `seconds`
+
+        Returns:
+            List of (timestamp, bytes); the bytes are shared, not copied
+        """
+        with self._lock:
+            frames = list(self._frames)
+        if seconds is not None and frames:
+            cutoff = frames[-1][0] - seconds
+            frames = [frame for frame in frames if frame[0] >= cutoff]
+        return frames
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self._bytes = 0
+
+    def status(self):
+        with self._lock:
+            span = self._frames[-1][0] - self._frames[0][0] if self._frames else 0.0
+            return {
+                'frames': len(self._frames),
+                'bytes': self._bytes,
+                'budget_bytes': self.budget_bytes,
+                'seconds': round(span, 1),
+                'dropped': self.dropped,
+            }
+
+
+def write_clip(frames, path, fps=10):
+    """
+    Write buffered JPEG frames to a clip file
+
+    Args:
+        frames: List of (timestamp, JPEG bytes)
+        path: Output path without extension
+        fps: Nominal frame rate (frames keep their capture timestamps)
+
+    Returns:
+        Path of the written file
+    """
+    if AV_AVAILABLE:
+        path = path.with_suffix('.mkv')
+        start = frames[0][0]
+        with av.open(str(path), mode='w', format='matroska') as container:
+            stream = container.add_stream('mjpeg', rate=fps)
+            stream.time_base = Fraction(1, 1000)
+            first = _jpeg_size(frames[0][1])
+            stream.width, stream.height = first
+            stream.pix_fmt = 'yuvj420p'
+            for timestamp, data in frames:
+                # Already JPEG: mux the bytes directly instead of re-encoding
+                packet = av.Packet(data)
+                packet.stream = stream
+                packet.pts = packet.dts = int((timestamp - start) * 1000)
+                packet.time_base = stream.time_base
+                container.mux(packet)
+    else:
+        path = path.with_suffix('.mjpeg')
+        with open(path, 'wb') as handle:
+            for _, data in frames:
+                handle.write(data)
+    return path
+
+
+def _jpeg_size(data):
+    with Image.open(io.BytesIO(data)) as image:
+        return image.size
+
+
+class ReplayRecorder:
+    """
+    Background recorder feeding a ReplayBuffer from the capture hub
+
+    Frames are downscaled to at most max_width and encoded through the hub,
+    so a viewer watching at the same size and quality shares the encode.
+    """
+
+    def __init__(self, hub, output_dir, budget_bytes, fps=10, quality=60, max_width=1280, max_jobs=16):
+        self.hub = hub
+        self.output_dir = Path(output_dir)
+        self.buffer = ReplayBuffer(budget_bytes)
+        self.fps = fps
+        self.quality = quality
+        self.max_width = max_width
+        self.max_jobs = max_jobs
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = None
+        self._jobs = OrderedDict()
+        self._job_ids = itertools.count(1)
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            # Each run gets its own stop event, so stopping an old thread can
+            # never reach a newer one
+            self._stop = threading.Event()
+            self._thread = threading.Thread(target=self._run, args=(self._stop,), name='ReplayRecorder', daemon=True)
+            self._thread.start()
+        logger.info("Replay recorder started")
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._stop.set()
+        if thread is not None:
+            thread.join(timeout=5)
+            logger.info("Replay recorder stopped")
+
+    def save_clip(self, seconds=None):
+        """
+        Save the last `seconds` (default: everything buffered) in the background
+
+        Returns:
+            Job status dictionary (see job_status)
+
+        Raises:
+            ValueError: If nothing has been recorded yet
+        """
+        frames = self.buffer.snapshot(seconds)
+        if not frames:
+            raise ValueError("The replay buffer is empty")
+        with self._lock:
+            job_id = str(next(self._job_ids))
+            self._jobs[job_id] = {
+                'id': job_id, 'status': 'saving', 'path': None, 'frames': len(frames),
+                'seconds': round(frames[-1][0] - frames[0][0], 1), 'bytes': None, 'error': None,
+            }
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+        threading.Thread(target=self._write, args=(job_id, frames), name='ReplayClip', daemon=True).start()
+        return self.job_status(job_id)
+
+    def job_status(self, job_id):
+        """
+        Get a clip job's status
+
+        Returns:
+            Dictionary (id, status, path, frames, seconds, bytes, error), or
+            None if unknown. status is saving, done or error.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def status(self):
+        return {'recording': self.running, 'fps': self.fps, 'quality': self.quality, **self.buffer.status()}
+
+    def _write(self, job_id, frames):
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(frames[-1][0]))
+        try:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            path = write_clip(frames, self.output_dir / f"replay-{stamp}-{job_id}", self.fps)
+            fields = {'status': 'done', 'path': str(path), 'bytes': path.stat().st_size}
+            logger.info(f"Saved replay clip {path}")
+        except Exception as e:
+            logger.error(f"Error saving replay clip: {e}")
+            fields = {'status': 'error', 'error': str(e)}
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(fields)
+
+    def _run(self, stop):
+        # The recorder subscribes like a viewer; self.fps drives the capture rate
+        token = self.hub.subscribe(self)
+        seq = 0
+        try:
+            while not stop.is_set():
+                started = time.monotonic()
+                frame = self.hub.wait(seq, timeout=1.0)
+                if frame is None:
+                    continue
+                seq = frame.seq
+                width, height = frame.image.size
+                if width > self.max_width:
+                    width, height = self.max_width, max(1, round(height * self.max_width / width))
+                try:
+                    data = self.hub.encode(frame, (width, height), 'jpeg', self.quality)
+                except Exception as e:
+                    logger.error(f"Error encoding replay frame: {e}")
+                    stop.wait(1.0)
+                    continue
+                self.buffer.append(frame.timestamp, data)
+                # The hub may run faster for viewers; record at our own rate
+                stop.wait(max(0.0, 1.0 / self.fps - (time.monotonic() - started)))
+        finally:
+            self.hub.unsubscribe(token)
@@ -0,0 +1,238 @@
+"""
+Screen Capture - Pluggable screen grab backends with reusable buffers
+
+Backends:
+    mss        Fast native grab (GDI BitBlt / XShm / CoreGraphics) decoded into
+               a per-thread preallocated PIL image
+    pyautogui  Generic fallback through pyautogui.screenshot()
+    synthetic  Generated frames for headless tests and benchmarks
+
+Monitor indexes follow mss: 0 is the whole virtual desktop, 1..n are the
+individual monitors. A region is (left, top, width, height) relative to the
+selected monitor.
+
+Images returned by grab() may be reused by the next grab() on the same
+thread; call .copy() to keep one.
+"""
+import logging
+import threading
+from abc import ABC, abstractmethod
+
+import numpy as np
+from PIL import Image
+
+from config import CAPTURE_BACKEND
+
+logger = logging.getLogger('PCGamingApp')
+
+try:
+    import mss
+    MSS_AVAILABLE = True
+except ImportError:
+    MSS_AVAILABLE = False
+
+try:
+    import pyautogui
+    PYAUTOGUI_AVAILABLE = True
+except ImportError:
+    PYAUTOGUI_AVAILABLE = False
+
+
+class CaptureBackend(ABC):
+    """Base class for capture backends"""
+
+    name = 'base'
+
+    @abstractmethod
+    def monitors(self):
+        """
+        Get monitor geometry
+
+        Returns:
+            List of dictionaries (index, left, top, width, height); index 0 is
+            the bounding box of all monitors
+        """
+
+    @abstractmethod
+    def grab(self, monitor=0, region=None):
+        """
+        Capture a monitor or a region of it
+
+        Returns:
+            PIL RGB image
+        """
+
+    def close(self):
+        pass
+
+    def _bounds(self, monitor, region):
+        """Resolve a monitor index and optional region to absolute bounds"""
+        monitors = self.monitors()
+        if not 0 <= monitor < len(monitors):
+            raise ValueError(f"monitor must be between 0 and {len(monitors) - 1}")
+        screen = monitors[monitor]
+        if region is None:
+            return screen['left'], screen['top'], screen['width'], screen['height']
+        left, top, width, height = (int(value) for value in region)
+        # Clip the region to the monitor
+        right = min(left + width, screen['width'])
+        bottom = min(top + height, screen['height'])
+        left, top = max(0, left), max(0, top)
+        width, height = right - left, bottom - top
+        if width <= 0 or height <= 0:
+            raise ValueError("region is outside the monitor")
+        return screen['left'] + left, screen['top'] + top, width, height
+
+
+class MssBackend(CaptureBackend):
+    """Capture with mss into a reused per-thread PIL image"""
+
+    name = 'mss'
+
+    def __init__(self):
+        # mss handles are not thread-safe, so each thread gets its own
+        self._local = threading.local()
+
+    def _state(self):
+        state = self._local
+        if not hasattr(state, 'sct'):
+            state.sct = mss.mss()
+            state.images = {}
+        return state
+
+    def monitors(self):
+        return [
+            {'index': index, 'left': m['left'], 'top': m['top'], 'width': m['width'], 'height': m['height']}
+            for index, m in enumerate(self._state().sct.monitors)
+        ]
+
+    def grab(self, monitor=0, region=None):
+        state = self._state()
+        left, top, width, height = self._bounds(monitor, region)
+        shot = state.sct.grab({'left': left, 'top': top, 'width': width, 'height': height})
+
+        # Decode BGRA straight into an image of the same size kept from the
+        # previous grab, instead of allocating a new one every frame
+        image = state.images.get(shot.size)
+        if image is None:
+            image = state.images[shot.size] = Image.new('RGB', shot.size)
+        image.frombytes(shot.raw, 'raw', 'BGRX')
+        return image
+
+    def close(self):
+        sct = getattr(self._local, 'sct', None)
+        if sct is not None:
+            sct.close()
+            del self._local.sct
+
+
+class PyAutoGuiBackend(CaptureBackend):
+    """Capture through pyautogui (single monitor geometry only)"""
+
+    name = 'pyautogui'
+
+    def monitors(self):
+        width, height = pyautogui.size()
+        screen = {'left': 0, 'top': 0, 'width': width, 'height': height}
+        return [dict(screen, index=0), dict(screen, index=1)]
+
+    def grab(self, monitor=0, region=None):
+        left, top, width, height = self._bounds(monitor, region)
+        if region is None and monitor in (0, 1):
+            return pyautogui.screenshot()
+        return pyautogui.screenshot(region=(left, top, width, height))
+
+
+class SyntheticBackend(CaptureBackend):
+    """
+    Generated frames for headless environments
+
+    Renders a static gradient with a moving block into one preallocated
+    buffer, so consecutive frames differ in a small region like a real desktop.
+    """
+
+    name = 'synthetic'
+
+    def __init__(self, width=1920, height=1080, monitors=1):
+        self.width = width
+        self.height = height
+        self.count = monitors
+        self._lock = threading.Lock()
+        self._frame = 0
+        x = np.linspace(0, 255, width * monitors, dtype=np.float32)
+        y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+        self._background = np.empty((height, width * monitors, 3), dtype=np.uint8)
+        self._background[..., 0] = (x * 0.5).astype(np.uint8)
+        self._background[..., 1] = (y * 0.5).astype(np.uint8)
+        self._background[..., 2] = 128
+        self._pixels = self._background.copy()
+
+    def monitors(self):
+        screens = [{'index': 0, 'left': 0, 'top': 0, 'width': self.width * self.count, 'height': self.height}]
+        for index in range(self.count):
+            screens.append({
+                'index': index + 1, 'left': index * self.width, 'top': 0,
+                'width': self.width, 'height': self.height
+            })
+        return screens
+
+    def grab(self, monitor=0, region=None):
+        left, top, width, height = self._bounds(monitor, region)
+        with self._lock:
+            size = 64
+            x = (self._frame * 16) % max(1, self._pixels.shape[1] - size)
+            y = (self._frame * 9) % max(1, self._pixels.shape[0] - size)
+            self._pixels[:] = self._background
+            self._pixels[y:y + size, x:x + size] = 255
+            self._frame += 1
+            return Image.fromarray(self._pixels[top:top + height, left:left + width])
+
+
+_BACKENDS = {
+    'mss': MssBackend,
+    'pyautogui': PyAutoGuiBackend,
+    'synthetic': SyntheticBackend,
+}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name='auto'):
+    """
+    Create a capture backend by name
+
+    'auto' prefers mss, then pyautogui.
+    """
+    if name == 'auto':
+        if MSS_AVAILABLE:
+            name = 'mss'
+        elif PYAUTOGUI_AVAILABLE:
+            name = 'pyautogui'
+        else:
+            raise ImportError("No screen capture backend available. Install mss or pyautogui.")
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown capture backend: {name}")
+    if name == 'mss' and not MSS_AVAILABLE:
+        raise ImportError("mss is not installed")
+    if name == 'pyautogui' and not PYAUTOGUI_AVAILABLE:
+        raise ImportError("pyautogui is not installed")
+    return _BACKENDS[name]()
+
+
+def get_capture_backend():
+    """Get the shared capture backend selected by CAPTURE_BACKEND"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(CAPTURE_BACKEND)
+            logger.info(f"Screen capture backend: {_backend.name}")
+        return _backend
+
+
+def set_capture_backend(backend):
+    """Replace the shared capture backend (e.g. with a SyntheticBackend in tests)"""
+    global _backend
+    with _backend_lock:
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
@@ -1,46 +1,259 @@
 """
 Screenshot Capture - Take screenshots of the PC screen
+
+Screenshots are written once to a gallery directory and served from disk.
+Thumbnails are rendered on demand by a small worker pool and kept in an LRU
+disk cache keyed by the screenshot's content hash and thumbnail size.
 """
 import io
-import base64
+import os
+import re
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PIL import Image
+
+from screen_capture import get_capture_backend
 
 logger = logging.getLogger('PCGamingApp')
 
-try:
-    import pyautogui
-    # Disable pyautogui failsafe for headless operation
-    pyautogui.FAILSAFE = False
-    PYAUTOGUI_AVAILABLE = True
-except ImportError:
-    PYAUTOGUI_AVAILABLE = False
-    logger.warning("pyautogui not available. Screenshot feature will be disabled.")
+SCREENSHOT_FORMATS = {'png': 'PNG', 'jpeg': 'JPEG'}
+# Only files named like this are served, which also rules out path traversal
+_SCREENSHOT_NAME = re.compile(r'^screenshot-[0-9]{8}-[0-9]{6}-[0-9]{3}\.(png|jpg)$')
 
 
-def take_screenshot():
+class ThumbnailCache:
     """
-    Take a screenshot of the current screen
-    
-    Returns:
-        Base64 encoded image string
+    LRU cache of JPEG thumbnails on disk
+
+    Entries are named <sha1 of source>-<size>.jpg, so a thumbnail is valid
+    for as long as the source content is unchanged. Recency survives restarts
+    through the files' modification times, and the least recently used
+    thumbnails are deleted once the cache exceeds its byte budget.
     """
-    if not PYAUTOGUI_AVAILABLE:
-        raise ImportError("pyautogui is not installed. Please install it to use screenshot feature.")
-    
-    try:
-        # Take screenshot
-        screenshot = pyautogui.screenshot()
-        
-        # Convert to bytes
-        img_buffer = io.BytesIO()
-        screenshot.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
-        
-        # Encode to base64
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-        
-        return img_base64
-    except Exception as e:
-        logger.error(f"Error taking screenshot: {e}")
-        raise
 
+    def __init__(self, directory, budget_bytes, workers=2):
+        self.directory = Path(directory)
+        self.budget_bytes = budget_bytes
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._entries = None  # file name -> bytes, oldest first
+        self._bytes = 0
+        self._pending = {}
+        self._digests = {}  # source path -> (size, mtime, digest), one per path
+        self._executor = None
+
+    def get(self, source, size):
+        """
+        Get the thumbnail of an image, rendering it if needed
+
+        Args:
+            source: Path of the full-size image
+            size: Longest side of the thumbnail in pixels
+
+        Returns:
+            Path of the cached thumbnail
+        """
+        name = f"{self.digest(source)}-{size}.jpg"
+        with self._lock:
+            self._load()
+            if name in self._entries:
+                self._entries.move_to_end(name)
+                path = self.directory / name
+                try:
+                    os.utime(path)
+                    return path
+                except FileNotFoundError:
+                    # Deleted behind our back; render it again
+                    self._bytes -= self._entries.pop(name)
+            future = self._pending.get(name)
+            if future is None:
+                # Concurrent requests for the same thumbnail share one render
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='Thumbnail')
+                future = self._pending[name] = self._executor.submit(self._render, Path(source), name, size)
+        return future.result()
+
+    def digest(self, source, data=None):
+        """SHA-1 of a file's content, memoised by path, size and mtime"""
+        stat = os.stat(source)
+        source = str(source)
+        version = (stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            memo = self._digests.get(source)
+        if memo is not None and memo[:2] == version:
+            return memo[2]
+        # Hashed outside the lock; a concurrent hash of the same file agrees
+        if data is None:
+            sha = hashlib.sha1()
+            with open(source, 'rb') as handle:
+                for chunk in iter(lambda: handle.read(1024 * 1024), b''):
+                    sha.update(chunk)
+        else:
+            sha = hashlib.sha1(data)
+        digest = sha.hexdigest()
+        with self._lock:
+            self._digests[source] = version + (digest,)
+        return digest
+
+    def forget(self, source):
+        """Drop the memoised digest of a deleted source"""
+        with self._lock:
+            self._digests.pop(str(source), None)
+
+    def status(self):
+        with self._lock:
+            self._load()
+            return {'thumbnails': len(self._entries), 'bytes': self._bytes, 'budget_bytes': self.budget_bytes}
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith('.jpg'):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name, stat.st_size))
+        self._entries = OrderedDict((name, size) for _, name, size in sorted(found))
+        self._bytes = sum(self._entries.values())
+
+    def _render(self, source, name, size):
+        try:
+            path = self.directory / name
+            with Image.open(source) as image:
+                # For JPEG sources, draft() decodes at a reduced scale directly
+                image.draft('RGB', (size, size))
+                image = image.convert('RGB')
+                image.thumbnail((size, size), Image.BILINEAR, reducing_gap=2.0)
+                temporary = path.with_suffix('.tmp')
+                image.save(temporary, format='JPEG', quality=80)
+            os.replace(temporary, path)
+            with self._lock:
+                self._entries[name] = path.stat().st_size
+                self._bytes += self._entries[name]
+                self._evict()
+            return path
+        finally:
+            with self._lock:
+                self._pending.pop(name, None)
+
+    def _evict(self):
+        evicted = set()
+        while self._bytes > self.budget_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            evicted.add(name.split('-', 1)[0])
+            try:
+                os.remove(self.directory / name)
+            except OSError:
+                pass
+        if evicted:
+            # Digests go with the last thumbnail of their source
+            evicted -= {name.split('-', 1)[0] for name in self._entries}
+            for source in [source for source, memo in self._digests.items() if memo[2] in evicted]:
+                del self._digests[source]
+
+
+class ScreenshotGallery:
+    """Screenshots saved to a directory, with cached thumbnails"""
+
+    def __init__(self, directory, thumbnails):
+        self.directory = Path(directory)
+        self.thumbnails = thumbnails
+        self._lock = threading.Lock()
+
+    def capture(self, fmt='png'):
+        """
+        Take a screenshot and save it to the gallery
+
+        Args:
+            fmt: 'png' (lossless) or 'jpeg'
+
+        Returns:
+            Screenshot info dictionary (see info)
+        """
+        if fmt not in SCREENSHOT_FORMATS:
+            raise ValueError(f"format must be one of {', '.join(SCREENSHOT_FORMATS)}")
+        image = get_capture_backend().grab()
+        buffer = io.BytesIO()
+        if fmt == 'png':
+            # Low compression: a screenshot is saved once, quickly
+            image.save(buffer, format='PNG', compress_level=1)
+        else:
+            image.save(buffer, format='JPEG', quality=92)
+        data = buffer.getvalue()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        now = time.time()
+        extension = 'png' if fmt == 'png' else 'jpg'
+        with self._lock:
+            # Names carry milliseconds; bump on the rare collision
+            while True:
+                stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now))
+                name = f"screenshot-{stamp}-{int(now * 1000) % 1000:03d}.{extension}"
+                if not (self.directory / name).exists():
+                    break
+                now += 0.001
+            path = self.directory / name
+            temporary = path.with_suffix('.tmp')
+            temporary.write_bytes(data)
+            os.replace(temporary, path)
+        self.thumbnails.digest(path, data)
+        logger.info(f"Saved screenshot {path}")
+        return self.info(path)
+
+    def info(self, path):
+        stat = path.stat()
+        return {
+            'name': path.name,
+            'size': stat.st_size,
+            'modified': stat.st_mtime,
+            'url': f"/screenshots/{path.name}",
+            'thumbnail': f"/screenshots/{path.name}/thumbnail",
+        }
+
+    def list(self, offset=0, limit=50):
+        """
+        List screenshots, newest first
+
+        Returns:
+            Dictionary with total and items (see info)
+        """
+        if not self.directory.is_dir():
+            return {'total': 0, 'items': []}
+        found = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if _SCREENSHOT_NAME.match(entry.name) and entry.is_file():
+                    found.append(entry.name)
+        # Names embed the capture time, so sorting names sorts by age
+        found.sort(reverse=True)
+        page = found[offset:offset + limit]
+        return {'total': len(found), 'items': [self.info(self.directory / name) for name in page]}
+
+    def path(self, name):
+        """
+        Resolve a screenshot name to its file
+
+        Raises:
+            FileNotFoundError: If there is no such screenshot
+        """
+        path = self.directory / name
+        if not _SCREENSHOT_NAME.match(name) or not path.is_file():
+            raise FileNotFoundError(name)
+        return path
+
+    def thumbnail(self, name, size):
+        return self.thumbnails.get(self.path(name), size)
+
+    def delete(self, name):
+        path = self.path(name)
+        path.unlink()
+        self.thumbnails.forget(path)
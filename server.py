@@ -0,0 +1,1943 @@
+"""
+PC Gaming App - Main Flask Application
+Modernized backend with better error handling, structure, and performance
+"""
+from flask import Flask, Response, jsonify, render_template, request, send_file, send_from_directory
+from werkzeug.serving import WSGIRequestHandler
+import socket
+import logging
+import os
+import sys
+import ctypes
+import webbrowser
+import threading
+import time
+import json
+from urllib.parse import quote
+
+from config import (
+    SERVER_HOST, SERVER_PORT, DEBUG, LIB_FOLDER, LOGS_FOLDER,
+    APP_VERSION, BASE_DIR, REMOTE_FRAME_FORMAT, REMOTE_FRAME_QUALITY,
+    REMOTE_STREAM_FPS, REMOTE_STREAM_MAX_FPS, REMOTE_TILE_SIZE, REMOTE_KEYFRAME_INTERVAL,
+    REMOTE_TARGET_LATENCY, REMOTE_ENCODE_WORKERS, REMOTE_VIDEO_BITRATE,
+    REPLAY_ENABLED, REPLAY_MEMORY_MB, REPLAY_FPS, REPLAY_QUALITY, REPLAY_MAX_WIDTH, REPLAY_DIR,
+    SCREENSHOT_DIR, THUMBNAIL_DIR, THUMBNAIL_CACHE_MB, THUMBNAIL_SIZES, THUMBNAIL_WORKERS,
+    FILE_INDEX_ENABLED, FILE_INDEX_INTERVAL, FILE_INDEX_WORKERS, FILE_INDEX_MAX_FILES, FILE_INDEX_EXCLUDE,
+    UPLOAD_MAX_ACTIVE, UPLOAD_MAX_CHUNK_MB, UPLOAD_EXPIRY
+)
+from utils.logger import setup_logger
+from utils.errors import handle_api_errors, UploadError
+from utils.cache import metrics_cache
+
+# Check for admin privileges and request if needed
+def is_admin():
+    """Check if the script is running with administrator privileges."""
+    try:
+        return ctypes.windll.shell32.IsUserAnAdmin()
+    except:
+        return False
+
+def run_as_admin():
+    """Restart the script with administrator privileges."""
+    if sys.frozen:
+        # If running as exe, use the exe path
+        script = sys.executable
+    else:
+        # If running as script, use the script path
+        script = sys.argv[0]
+    params = " ".join(sys.argv[1:]) if len(sys.argv) > 1 else ""
+    
+    ctypes.windll.shell32.ShellExecuteW(None, "runas", sys.executable, f'"{script}" {params}', None, 1)
+    sys.exit()
+
+# Import metric modules
+from gpu import get_gpu_metrics
+import cpu
+from ram import get_ram_metrics, clear_cache_mem
+from disk import get_disk_metrics, clear_temp_files
+import updater
+import media
+import psutil
+from system_info import get_system_info
+from network_monitor import get_network_stats, get_active_connections
+from frame_encoder import validate_frame_options, frame_mimetype
+from remote_stream import mjpeg_stream, BOUNDARY
+from capture_hub import CaptureHub
+from encode_pool import EncodePool
+from stream_control import AdaptiveController, register_controller, unregister_controller, get_controller
+from tile_encoder import TileDiffEncoder, tile_stream
+from video_stream import video_stream, video_codecs, video_mimetype
+from replay_buffer import ReplayRecorder
+from file_listing import directory_cache
+from file_index import FileIndex
+from file_transfer import send_file_range
+from zip_stream import zip_stream
+from file_upload import UploadManager
+from file_preview import file_preview, follow as follow_file
+from screenshot import ScreenshotGallery, ThumbnailCache, SCREENSHOT_FORMATS
+from latency import latency_tracker
+from processes import process_sampler, get_top_processes, get_top_io_processes, IO_COUNTERS_SUPPORTED, SORT_COLUMNS
+from game_mode import game_mode
+from process_rules import process_rules
+from process_history import process_history
+# Try to import remote desktop module, handle gracefully if not available
+try:
+    from remote_desktop import (
+        get_screen_frame, capture_screen, move_mouse, click_mouse, scroll_mouse,
+        press_key, get_screen_size, get_monitors
+    )
+    from capture_target import capture_target
+    from input_channel import input_channel
+    REMOTE_DESKTOP_AVAILABLE = True
+except ImportError:
+    REMOTE_DESKTOP_AVAILABLE = False
+    logger.warning("Remote desktop module not available. Install pyautogui to enable remote desktop features.")
+
+# WebSocket support for the low-latency input channel is optional
+try:
+    from flask_sock import Sock
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
+# Shared capture loop for all remote viewers, encoding in worker processes
+encode_pool = EncodePool(workers=REMOTE_ENCODE_WORKERS) if REMOTE_ENCODE_WORKERS > 0 else None
+capture_hub = CaptureHub(capture_screen, pool=encode_pool) if REMOTE_DESKTOP_AVAILABLE else None
+
+# Instant replay recorder fed by the same capture loop
+replay_recorder = ReplayRecorder(
+    capture_hub, REPLAY_DIR, REPLAY_MEMORY_MB * 1024 * 1024,
+    fps=REPLAY_FPS, quality=REPLAY_QUALITY, max_width=REPLAY_MAX_WIDTH
+) if REMOTE_DESKTOP_AVAILABLE else None
+
+# Screenshots saved to disk, with thumbnails rendered and cached on demand
+screenshot_gallery = ScreenshotGallery(
+    SCREENSHOT_DIR, ThumbnailCache(THUMBNAIL_DIR, THUMBNAIL_CACHE_MB * 1024 * 1024, workers=THUMBNAIL_WORKERS)
+)
+
+# Initialize Flask app
+app = Flask(__name__)
+
+sock = Sock(app) if WEBSOCKET_AVAILABLE else None
+
+# Setup logging
+logger = setup_logger('PCGamingApp')
+log = logging.getLogger('werkzeug')
+log.setLevel(logging.ERROR)
+
+# Background filename index behind /files/search
+file_index = FileIndex(
+    os.path.expanduser('~'), exclude=FILE_INDEX_EXCLUDE, workers=FILE_INDEX_WORKERS,
+    interval=FILE_INDEX_INTERVAL, max_files=FILE_INDEX_MAX_FILES
+)
+
+# Resumable chunked uploads into the home directory
+upload_manager = UploadManager(
+    max_uploads=UPLOAD_MAX_ACTIVE, max_chunk_bytes=UPLOAD_MAX_CHUNK_MB * 1024 * 1024, expiry=UPLOAD_EXPIRY
+)
+
+
+def start_background_services():
+    """
+    Start the app's background threads
+    
+    Only called from main(), never on import, so nothing that imports this
+    module starts another sampler, game mode / process rule engine, file
+    index crawl or replay recorder of its own.
+    """
+    # Shared process sampler (drives game mode and process rules)
+    process_sampler.start()
+    if FILE_INDEX_ENABLED:
+        file_index.start()
+    if replay_recorder and REPLAY_ENABLED:
+        replay_recorder.start()
+
+
+# Try to import speedtest, handle gracefully if not available or incompatible
+try:
+    import speedtest
+    SPEEDTEST_CLI_AVAILABLE = True
+except (ImportError, AttributeError, ModuleNotFoundError) as e:
+    SPEEDTEST_CLI_AVAILABLE = False
+
+# Import custom speed test (always available)
+try:
+    from speedtest_custom import run_speed_test
+    SPEEDTEST_AVAILABLE = True
+except ImportError as e:
+    SPEEDTEST_AVAILABLE = False
+    logger.warning(f"Custom speed test not available: {e}")
+
+
+def get_ip_address() -> str:
+    """Get the local IP address of the machine"""
+    try:
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(('8.8.8.8', 80))
+        ip_address = s.getsockname()[0]
+        s.close()
+        return ip_address
+    except Exception as e:
+        logger.warning(f"Could not determine IP address: {e}")
+        return '127.0.0.1'
+
+
+@app.route('/favicon.ico')
+def favicon():
+    """Serve favicon"""
+    return send_from_directory(LIB_FOLDER, 'cpu.png')
+
+
+@app.after_request
+def log_bad_requests(response):
+    """Log non-200 responses and add CORS headers"""
+    # Add CORS headers to allow requests from Qt WebEngine
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+    response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
+    
+    if response.status_code not in [200, 304]:
+        logger.warning(f"Bad Request: {request.method} {request.path} - Status {response.status_code}")
+    return response
+
+
+@app.route("/")
+def index():
+    """Main page route"""
+    ip_address = get_ip_address()
+    return render_template("index.html", ip_address=ip_address, version=APP_VERSION)
+
+
+# ==================== METRICS ENDPOINTS ====================
+
+@app.route("/metrics/cpu")
+@handle_api_errors
+def cpu_metrics():
+    """Get CPU metrics with caching"""
+    cached = metrics_cache.get('cpu')
+    if cached:
+        return jsonify(cached)
+    
+    try:
+        cpu_usage = psutil.cpu_percent(interval=0.1)
+        cpu_freq = psutil.cpu_freq()
+        current = cpu_freq.current if cpu_freq else None
+        max_freq = cpu_freq.max if cpu_freq else None
+        
+        temperature = cpu.get_cpu_temperature_metrics()
+        
+        data = {
+            "usage": round(cpu_usage, 2),
+            "Frequency-curent": round(current, 2) if current else "N/A",
+            "Frequency-max": round(max_freq, 2) if max_freq else "N/A",
+            "temperature": temperature if temperature else "N/A",
+        }
+        
+        metrics_cache.set('cpu', data)
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Error fetching CPU metrics: {e}")
+        return jsonify({
+            "usage": "Unavailable",
+            "Frequency-current": "Unavailable",
+            "Frequency-max": "Unavailable",
+            "temperature": "Unavailable",
+        }), 500
+
+
+@app.route("/metrics/ram")
+@handle_api_errors
+def ram_metrics():
+    """Get RAM metrics with caching"""
+    cached = metrics_cache.get('ram')
+    if cached:
+        return jsonify(cached)
+    
+    try:
+        ram_metrics_data = get_ram_metrics()
+        metrics_cache.set('ram', ram_metrics_data)
+        return jsonify(ram_metrics_data)
+    except Exception as e:
+        logger.error(f"Error fetching RAM metrics: {e}")
+        return jsonify({
+            "usage": "Unavailable",
+            "total": "Unavailable",
+            "free": "Unavailable"
+        }), 500
+
+
+@app.route("/metrics/disk")
+@handle_api_errors
+def disk_metrics():
+    """Get disk metrics with caching"""
+    cached = metrics_cache.get('disk')
+    if cached:
+        return jsonify(cached)
+    
+    try:
+        disk_metrics_data = get_disk_metrics()
+        metrics_cache.set('disk', disk_metrics_data)
+        return jsonify(disk_metrics_data)
+    except Exception as e:
+        logger.error(f"Error fetching Disk metrics: {e}")
+        return jsonify({
+            "usage": "Unavailable",
+            "free_space": "Unavailable",
+            "read_speed": "Unavailable",
+            "write_speed": "Unavailable"
+        }), 500
+
+
+@app.route("/metrics/gpu")
+@handle_api_errors
+def gpu_metrics():
+    """Get GPU metrics with caching"""
+    cached = metrics_cache.get('gpu')
+    if cached:
+        return jsonify(cached)
+    
+    try:
+        gpu_metrics_data = get_gpu_metrics()
+        metrics_cache.set('gpu', gpu_metrics_data)
+        return jsonify(gpu_metrics_data)
+    except Exception as e:
+        logger.error(f"Error fetching GPU metrics: {e}")
+        return jsonify({
+            "name": "Unavailable",
+            "temperature": "Unavailable",
+            "utilization": "Unavailable",
+            "memory_used": "Unavailable",
+            "memory_total": "Unavailable"
+        }), 500
+
+
+# ==================== SPEED TEST ENDPOINT ====================
+
+@app.route("/speed_test", methods=["GET"])
+@handle_api_errors
+def speed_test_endpoint():
+    """Run internet speed test using custom implementation"""
+    if not SPEEDTEST_AVAILABLE:
+        return jsonify({
+            "error": "Speed test feature is not available.",
+            "available": False
+        }), 503
+    
+    try:
+        # Use custom speed test implementation
+        results = run_speed_test()
+        
+        if results["download_speed"] == 0 and results["upload_speed"] == 0:
+            return jsonify({
+                "error": "Speed test failed. Please check your internet connection and try again.",
+                "available": True
+            }), 500
+        
+        return jsonify({
+            "download_speed": f"{results['download_speed']:.2f}",
+            "upload_speed": f"{results['upload_speed']:.2f}",
+            "ping": f"{results['ping']:.2f}",
+            "available": True
+        })
+    except Exception as e:
+        logger.error(f"Error during speed test: {str(e)}")
+        return jsonify({
+            "error": f"Speed test failed: {str(e)}. Please try again later.",
+            "available": True
+        }), 500
+
+
+# ==================== AUDIO ENDPOINTS ====================
+
+from pycaw.pycaw import AudioUtilities
+from icon import icon_mapping
+
+
+def get_audio_sessions():
+    """Retrieve all active audio sessions"""
+    try:
+        sessions = AudioUtilities.GetAllSessions()
+        session_list = []
+        for session in sessions:
+            if session.Process:
+                app_name = session.Process.name()
+                volume = session.SimpleAudioVolume
+                session_list.append({
+                    "name": app_name,
+                    "icon": icon_mapping.get(app_name.lower(), "fas fa-volume-up"),
+                    "volume": round(volume.GetMasterVolume() * 100, 0) if volume else 0,
+                    "muted": volume.GetMute() if volume else False
+                })
+        return session_list
+    except Exception as e:
+        logger.error(f"Error getting audio sessions: {e}")
+        return []
+
+
+def set_volume(app_name: str, level: float):
+    """Set the volume level for a specific app"""
+    try:
+        sessions = AudioUtilities.GetAllSessions()
+        for session in sessions:
+            if session.Process and session.Process.name() == app_name:
+                volume = session.SimpleAudioVolume
+                if level == 0:  # Mute
+                    volume.SetMute(1, None)
+                elif level > 0:  # Set specific volume
+                    volume.SetMute(0, None)
+                    volume.SetMasterVolume(min(level, 1.0), None)
+                return True
+        return False
+    except Exception as e:
+        logger.error(f"Error setting volume: {e}")
+        return False
+
+
+@app.route('/get_audio_sessions', methods=['GET'])
+@handle_api_errors
+def get_sessions():
+    """Endpoint to fetch all audio sessions"""
+    sessions = get_audio_sessions()
+    return jsonify({"sessions": sessions})
+
+
+@app.route('/set_volume', methods=['POST'])
+@handle_api_errors
+def handle_volume():
+    """Endpoint to handle volume actions"""
+    data = request.json
+    app_name = data.get("app_name")
+    level = data.get("level")
+    
+    if not app_name or level is None:
+        return jsonify({"error": "Invalid data"}), 400
+    
+    success = set_volume(app_name, level)
+    if success:
+        return jsonify({"message": f"Volume updated for {app_name}"}), 200
+    else:
+        return jsonify({"error": f"App {app_name} not found"}), 404
+
+
+# ==================== SYSTEM ACTION ENDPOINTS ====================
+
+@app.route("/clear_cache", methods=["POST"])
+@handle_api_errors
+def clear_cache():
+    """Clear system cache/memory"""
+    try:
+        clear_cache_mem()
+        metrics_cache.clear()  # Clear metrics cache
+        return jsonify({"status": "success", "message": "Memory cache cleared successfully"}), 200
+    except PermissionError as e:
+        logger.warning(f"Permission denied clearing cache: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e),
+            "requires_admin": True
+        }), 403
+    except FileNotFoundError as e:
+        logger.error(f"File not found clearing cache: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 404
+    except Exception as e:
+        logger.error(f"Error clearing cache: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
+@app.route("/clear_temp_files", methods=["POST"])
+@handle_api_errors
+def clear_temp_files_route():
+    """Clear temporary files"""
+    try:
+        results = clear_temp_files()
+        message = (
+            f"Cleared {results['total_deleted']} files. "
+            f"Skipped {results['total_skipped']} files in use."
+        )
+        if results['total_errors'] > 0:
+            message += f" {results['total_errors']} errors occurred."
+        
+        return jsonify({
+            "status": "success",
+            "message": message,
+            "details": results
+        }), 200
+    except Exception as e:
+        logger.error(f"Error clearing temp files: {e}")
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+
+# ==================== PROCESS MANAGER ENDPOINTS ====================
+
+@app.route('/processes', methods=['GET'])
+@handle_api_errors
+def processes_endpoint():
+    """Get a sorted, filtered page of the process table"""
+    sort_by = request.args.get('sort_by', 'cpu')
+    if sort_by not in SORT_COLUMNS:
+        return jsonify({'error': f"sort_by must be one of {', '.join(SORT_COLUMNS)}", 'processes': []}), 400
+    try:
+        processes = get_top_processes(
+            limit=int(request.args.get('limit', 10)),
+            sort_by=sort_by,
+            offset=int(request.args.get('offset', 0)),
+            name=request.args.get('name'),
+            min_memory_mb=request.args.get('min_memory_mb')
+        )
+        return jsonify({'processes': processes})
+    except ValueError as e:
+        return jsonify({'error': str(e), 'processes': []}), 400
+
+
+@app.route('/processes/io_top', methods=['GET'])
+@handle_api_errors
+def top_io_processes_endpoint():
+    """Get the processes doing the most disk I/O"""
+    if not IO_COUNTERS_SUPPORTED:
+        return jsonify({'error': 'Per-process I/O counters are not supported on this platform.', 'processes': []}), 503
+    try:
+        limit = int(request.args.get('limit', 10))
+        sort_by = request.args.get('sort_by', 'total')
+        return jsonify({'processes': get_top_io_processes(limit=limit, sort_by=sort_by)})
+    except ValueError as e:
+        return jsonify({'error': str(e), 'processes': []}), 400
+
+
+@app.route('/processes/history', methods=['GET'])
+@handle_api_errors
+def process_history_endpoint():
+    """Get CPU/RAM history of the heaviest recent processes"""
+    try:
+        pid = request.args.get('pid')
+        return jsonify({'processes': process_history.get_history(int(pid) if pid else None)})
+    except ValueError:
+        return jsonify({'error': 'pid must be an integer', 'processes': []}), 400
+
+
+@app.route('/game_mode', methods=['GET'])
+@handle_api_errors
+def game_mode_status_endpoint():
+    """Get game mode state and configuration"""
+    return jsonify(game_mode.status())
+
+
+@app.route('/game_mode', methods=['POST'])
+@handle_api_errors
+def game_mode_config_endpoint():
+    """Update game mode configuration"""
+    data = request.json or {}
+    try:
+        game_mode.configure(
+            games=data.get('games'),
+            background=data.get('background'),
+            background_action=data.get('background_action'),
+            background_cores=data.get('background_cores'),
+            enabled=data.get('enabled')
+        )
+        return jsonify(game_mode.status())
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/process_rules', methods=['GET'])
+@handle_api_errors
+def get_process_rules_endpoint():
+    """Get configured process rules"""
+    return jsonify({'rules': process_rules.get_rules()})
+
+
+@app.route('/process_rules', methods=['POST'])
+@handle_api_errors
+def set_process_rules_endpoint():
+    """Replace the process rules"""
+    data = request.json or {}
+    rules = data.get('rules')
+    if not isinstance(rules, list):
+        return jsonify({'error': 'rules must be a list'}), 400
+    try:
+        process_rules.set_rules(rules)
+        return jsonify({'rules': process_rules.get_rules()})
+    except (TypeError, ValueError, KeyError) as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/process_rules/alerts', methods=['GET'])
+@handle_api_errors
+def process_rule_alerts_endpoint():
+    """Get recent alerts raised by process rules"""
+    return jsonify({'alerts': process_rules.get_alerts()})
+
+
+# ==================== SYSTEM INFO ENDPOINTS ====================
+
+@app.route('/system_info', methods=['GET'])
+@handle_api_errors
+def system_info_endpoint():
+    """Get detailed system information"""
+    try:
+        info = get_system_info()
+        return jsonify(info)
+    except Exception as e:
+        logger.error(f"Error getting system info: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+# ==================== NETWORK MONITOR ENDPOINTS ====================
+
+@app.route('/network_stats', methods=['GET'])
+@handle_api_errors
+def network_stats_endpoint():
+    """Get real-time network statistics"""
+    try:
+        stats = get_network_stats()
+        return jsonify(stats)
+    except Exception as e:
+        logger.error(f"Error getting network stats: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/network_connections', methods=['GET'])
+@handle_api_errors
+def network_connections_endpoint():
+    """Get active network connections"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        connections = get_active_connections(limit=limit)
+        return jsonify({'connections': connections})
+    except Exception as e:
+        logger.error(f"Error getting network connections: {e}")
+        return jsonify({'error': str(e), 'connections': []}), 500
+
+
+# ==================== REMOTE DESKTOP ENDPOINTS ====================
+
+@app.route('/remote/screen_size', methods=['GET'])
+@handle_api_errors
+def get_screen_size_endpoint():
+    """
+    Get screen size
+    
+    width/height are those of the capture target (the coordinate space of
+    mouse input), or of one monitor with ?monitor=<index>.
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop feature is not available.', 'available': False}), 503
+    try:
+        monitor = request.args.get('monitor')
+        try:
+            width, height = get_screen_size(int(monitor) if monitor is not None else None)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'width': width,
+            'height': height,
+            'monitors': get_monitors(),
+            'target': capture_target.status(),
+            'available': True
+        })
+    except Exception as e:
+        logger.error(f"Error getting screen size: {e}")
+        return jsonify({'error': str(e), 'width': 1920, 'height': 1080, 'available': True}), 500
+
+
+@app.route('/remote/capture_target', methods=['GET'])
+@handle_api_errors
+def get_capture_target_endpoint():
+    """Get the capture target and monitor geometry"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    try:
+        target = capture_target.status()
+    except ValueError as e:
+        # e.g. the target window was closed
+        target = {'error': str(e)}
+    return jsonify({'target': target, 'monitors': get_monitors()})
+
+
+@app.route('/remote/capture_target', methods=['POST'])
+@handle_api_errors
+def set_capture_target_endpoint():
+    """
+    Select what remote viewers see
+    
+    Body: {"type": "desktop"}, {"type": "monitor", "monitor": 2},
+    {"type": "region", "monitor": 1, "left", "top", "width", "height"} or
+    {"type": "window", "pid": 1234} / {"type": "window", "name": "game.exe"}
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    try:
+        return jsonify({'target': capture_target.configure(request.json or {})})
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/remote/frame', methods=['GET'])
+@handle_api_errors
+def get_screen_frame_endpoint():
+    """Get current screen frame"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({
+            'error': 'Remote desktop feature is not available. Please install pyautogui.',
+            'available': False
+        }), 503
+    
+    try:
+        img_base64, timestamp = get_screen_frame()
+        return jsonify({
+            'image': img_base64,
+            'format': 'png',
+            'timestamp': timestamp,
+            'available': True
+        })
+    except Exception as e:
+        logger.error(f"Error getting screen frame: {e}")
+        return jsonify({'error': str(e), 'available': True}), 500
+
+
+@app.route('/remote/frame/image', methods=['GET'])
+@handle_api_errors
+def get_screen_frame_image_endpoint():
+    """Get current screen frame as raw JPEG/WebP bytes"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({
+            'error': 'Remote desktop feature is not available. Please install pyautogui.',
+            'available': False
+        }), 503
+    
+    try:
+        fmt, quality = validate_frame_options(
+            request.args.get('format', REMOTE_FRAME_FORMAT),
+            request.args.get('quality', REMOTE_FRAME_QUALITY)
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        # Polling viewers share the capture loop with streaming viewers
+        frame = capture_hub.poll(REMOTE_STREAM_FPS)
+        if frame is None:
+            return jsonify({'error': 'No frame captured', 'available': True}), 503
+        image = capture_hub.encode(frame, frame.image.size, fmt, quality)
+        response = Response(image, mimetype=frame_mimetype(fmt))
+        response.headers['Cache-Control'] = 'no-store'
+        response.headers['X-Frame-Timestamp'] = f"{frame.timestamp:.3f}"
+        return response
+    except Exception as e:
+        logger.error(f"Error getting screen frame: {e}")
+        return jsonify({'error': str(e), 'available': True}), 500
+
+
+def _stream_controller():
+    """
+    Build an AdaptiveController from stream request parameters
+    
+    Query parameters: fps, quality, width/height (viewer size in device
+    pixels), adaptive (0 to disable) and id (used by /remote/stream/ack).
+    
+    Raises:
+        ValueError: If a parameter is invalid
+    """
+    _, quality = validate_frame_options('jpeg', request.args.get('quality', REMOTE_FRAME_QUALITY))
+    fps = float(request.args.get('fps', REMOTE_STREAM_FPS))
+    if not 0 < fps <= REMOTE_STREAM_MAX_FPS:
+        raise ValueError(f"fps must be between 0 and {REMOTE_STREAM_MAX_FPS}")
+    viewport = None
+    if request.args.get('width') and request.args.get('height'):
+        viewport = (int(request.args['width']), int(request.args['height']))
+        if min(viewport) <= 0:
+            raise ValueError("width and height must be positive")
+    return AdaptiveController(
+        fps, quality,
+        viewport=viewport,
+        target_latency=REMOTE_TARGET_LATENCY,
+        adaptive=request.args.get('adaptive', '1') != '0'
+    )
+
+
+def _register_stream(response, controller):
+    """Register a stream controller under the viewer's id until the response is closed"""
+    stream_id = request.args.get('id')
+    if stream_id:
+        register_controller(stream_id, controller)
+        # Also runs when the server closes a response whose body never started
+        response.call_on_close(lambda: unregister_controller(stream_id, controller))
+    return response
+
+
+@app.route('/remote/stream', methods=['GET'])
+@handle_api_errors
+def remote_stream_endpoint():
+    """Stream the screen as MJPEG (multipart/x-mixed-replace)"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({
+            'error': 'Remote desktop feature is not available. Please install pyautogui.',
+            'available': False
+        }), 503
+    
+    try:
+        controller = _stream_controller()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Browsers only render JPEG parts in an MJPEG stream
+    response = Response(
+        mjpeg_stream(capture_hub, controller, 'jpeg'),
+        mimetype=f'multipart/x-mixed-replace; boundary={BOUNDARY}'
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return _register_stream(response, controller)
+
+
+@app.route('/remote/tiles/stream', methods=['GET'])
+@handle_api_errors
+def remote_tile_stream_endpoint():
+    """
+    Stream only the changed screen tiles (see tile_encoder for the format)
+    
+    Query parameters as for /remote/stream, plus viewer: frames are tagged
+    with the input ids this viewer sent over /remote/input/ws.
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({
+            'error': 'Remote desktop feature is not available. Please install pyautogui.',
+            'available': False
+        }), 503
+    
+    try:
+        controller = _stream_controller()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    encoder = TileDiffEncoder(
+        tile_size=REMOTE_TILE_SIZE,
+        quality=controller.quality,
+        keyframe_interval=REMOTE_KEYFRAME_INTERVAL
+    )
+    response = Response(
+        tile_stream(capture_hub, controller, encoder, viewer=request.args.get('viewer')),
+        mimetype='application/octet-stream'
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return _register_stream(response, controller)
+
+
+@app.route('/remote/video/status', methods=['GET'])
+@handle_api_errors
+def remote_video_status_endpoint():
+    """Get the video codecs available for /remote/video/stream"""
+    codecs = video_codecs() if REMOTE_DESKTOP_AVAILABLE else []
+    return jsonify({
+        'available': bool(codecs),
+        'codecs': codecs,
+        'mimetypes': {codec: video_mimetype(codec) for codec in codecs}
+    })
+
+
+@app.route('/remote/video/stream', methods=['GET'])
+@handle_api_errors
+def remote_video_stream_endpoint():
+    """
+    Stream the screen as low-latency H.264 (fragmented MP4) or VP8 (WebM)
+    
+    Query parameters as for /remote/stream, plus codec and bitrate. Returns
+    501 when no video encoder is installed; viewers then use an image stream.
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({
+            'error': 'Remote desktop feature is not available. Please install pyautogui.',
+            'available': False
+        }), 503
+    
+    codecs = video_codecs()
+    if not codecs:
+        return jsonify({'error': 'No video encoder available. Install PyAV to enable video streaming.'}), 501
+    codec = request.args.get('codec', codecs[0])
+    if codec not in codecs:
+        return jsonify({'error': f"codec must be one of {', '.join(codecs)}"}), 400
+    try:
+        controller = _stream_controller()
+        bitrate = int(request.args.get('bitrate', REMOTE_VIDEO_BITRATE))
+        if bitrate <= 0:
+            raise ValueError("bitrate must be positive")
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    response = Response(
+        video_stream(capture_hub, controller, codec, bitrate),
+        mimetype=video_mimetype(codec).split(';')[0]
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return _register_stream(response, controller)
+
+
+@app.route('/remote/capture_status', methods=['GET'])
+@handle_api_errors
+def remote_capture_status_endpoint():
+    """Get shared capture loop statistics (viewers, captures, encodes)"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    return jsonify(capture_hub.status())
+
+
+@app.route('/remote/replay', methods=['GET'])
+@handle_api_errors
+def replay_status_endpoint():
+    """Get instant replay recorder state and buffer usage"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    return jsonify(replay_recorder.status())
+
+
+@app.route('/remote/replay', methods=['POST'])
+@handle_api_errors
+def replay_control_endpoint():
+    """Start or stop the instant replay recorder"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    data = request.json or {}
+    if 'enabled' not in data:
+        return jsonify({'error': 'enabled is required'}), 400
+    if data['enabled']:
+        replay_recorder.start()
+    else:
+        replay_recorder.stop()
+        replay_recorder.buffer.clear()
+    return jsonify(replay_recorder.status())
+
+
+@app.route('/remote/replay/clip', methods=['POST'])
+@handle_api_errors
+def replay_clip_endpoint():
+    """
+    Save the last seconds of the replay buffer to a clip file
+    
+    Body: {"seconds": 30} (default: the whole buffer). Returns 202 with a job;
+    poll /remote/replay/clip/<id> for the file path.
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    data = request.json or {}
+    try:
+        seconds = float(data['seconds']) if data.get('seconds') is not None else None
+        if seconds is not None and seconds <= 0:
+            raise ValueError("seconds must be positive")
+        return jsonify(replay_recorder.save_clip(seconds)), 202
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/remote/replay/clip/<job_id>', methods=['GET'])
+@handle_api_errors
+def replay_clip_status_endpoint(job_id):
+    """Get the status of a replay clip job"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    job = replay_recorder.job_status(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+
+@app.route('/remote/stream/ack', methods=['POST'])
+@handle_api_errors
+def remote_stream_ack_endpoint():
+    """Acknowledge a displayed frame so the stream can adapt to viewer latency"""
+    data = request.json or {}
+    controller = get_controller(str(data.get('id', '')))
+    if controller is None:
+        return jsonify({'error': 'Unknown stream'}), 404
+    try:
+        controller.on_ack(int(data.get('seq', -1)))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'seq must be an integer'}), 400
+    return jsonify(controller.status())
+
+
+@app.route('/remote/latency', methods=['GET'])
+@handle_api_errors
+def remote_latency_endpoint():
+    """Get per-stage input-to-photon latency histograms"""
+    return jsonify(latency_tracker.summary())
+
+
+@app.route('/remote/latency', methods=['POST'])
+@handle_api_errors
+def remote_latency_report_endpoint():
+    """
+    Report viewer-measured round trips or reset the histograms
+    
+    Body: {"round_trip_ms": [..]} and/or {"reset": true}
+    """
+    data = request.json or {}
+    if data.get('reset'):
+        latency_tracker.reset()
+    samples = data.get('round_trip_ms', [])
+    if not isinstance(samples, list):
+        return jsonify({'error': 'round_trip_ms must be a list'}), 400
+    try:
+        samples = [float(sample) for sample in samples]
+    except (TypeError, ValueError):
+        return jsonify({'error': 'round_trip_ms must contain numbers'}), 400
+    # Ignore clock glitches and inputs that were never reflected in time
+    samples = [sample for sample in samples if 0 <= sample < 60000]
+    for sample in samples:
+        latency_tracker.record('round_trip', sample / 1000.0)
+    return jsonify({'recorded': len(samples)})
+
+
+@app.route('/remote/input', methods=['POST'])
+@handle_api_errors
+def remote_input_endpoint():
+    """
+    Queue a batch of input events without waiting for them to run
+
+    Fallback for viewers without WebSocket support; see input_channel for the
+    event format. Query parameter viewer scopes the events' ids.
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    try:
+        accepted = input_channel.submit(request.json, viewer=request.args.get('viewer'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    x, y = input_channel.cursor
+    return jsonify({'accepted': accepted, 'cursor': {'x': x, 'y': y}}), 202
+
+
+@app.route('/remote/input/status', methods=['GET'])
+@handle_api_errors
+def remote_input_status_endpoint():
+    """Get input channel statistics (queued, coalesced, cursor)"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    return jsonify({**input_channel.status(), 'websocket': WEBSOCKET_AVAILABLE})
+
+
+if WEBSOCKET_AVAILABLE:
+    @sock.route('/remote/input/ws')
+    def remote_input_socket(ws):
+        """
+        Full-duplex input channel
+
+        Receives input events (JSON) and sends back
+        {"type": "cursor", "x": ..., "y": ...} whenever the cursor moves, or
+        {"type": "error", "message": ...} for a rejected event. Query
+        parameter viewer scopes the events' ids to that viewer's tile stream.
+        """
+        if not REMOTE_DESKTOP_AVAILABLE:
+            ws.close(reason=1011, message='Remote desktop not available')
+            return
+        viewer = request.args.get('viewer')
+        cursor_seq = input_channel.cursor_seq
+        while True:
+            # Short receive timeout so cursor updates go out between events
+            message = ws.receive(timeout=0.02)
+            if message is not None:
+                try:
+                    input_channel.submit(json.loads(message), viewer=viewer)
+                except ValueError as e:
+                    ws.send(json.dumps({'type': 'error', 'message': str(e)}))
+            seq, (x, y) = input_channel.wait_cursor(cursor_seq, timeout=0)
+            if seq != cursor_seq:
+                cursor_seq = seq
+                ws.send(json.dumps({'type': 'cursor', 'x': x, 'y': y}))
+
+
+@app.route('/remote/mouse/move', methods=['POST'])
+@handle_api_errors
+def mouse_move_endpoint():
+    """Move mouse"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    
+    try:
+        data = request.json
+        x = float(data.get('x', 0))
+        y = float(data.get('y', 0))
+        relative = data.get('relative', False)
+        
+        if move_mouse(x, y, relative):
+            return jsonify({'status': 'success'})
+        else:
+            return jsonify({'status': 'error', 'message': 'Failed to move mouse'}), 500
+    except Exception as e:
+        logger.error(f"Error moving mouse: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/remote/mouse/click', methods=['POST'])
+@handle_api_errors
+def mouse_click_endpoint():
+    """Click mouse at current position (does not move mouse)"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    
+    try:
+        data = request.json
+        button = data.get('button', 'left')
+        # Ignore x, y coordinates - always click at current mouse position
+        # This prevents the mouse from jumping around, especially in multi-monitor setups
+        if click_mouse(button, None, None):
+            return jsonify({'status': 'success'})
+        else:
+            return jsonify({'status': 'error', 'message': 'Failed to click'}), 500
+    except Exception as e:
+        logger.error(f"Error clicking mouse: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/remote/mouse/scroll', methods=['POST'])
+@handle_api_errors
+def mouse_scroll_endpoint():
+    """Scroll mouse"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    
+    try:
+        data = request.json
+        x = float(data.get('x', 0))
+        y = float(data.get('y', 0))
+        clicks = int(data.get('clicks', 0))
+        
+        if scroll_mouse(x, y, clicks):
+            return jsonify({'status': 'success'})
+        else:
+            return jsonify({'status': 'error', 'message': 'Failed to scroll'}), 500
+    except Exception as e:
+        logger.error(f"Error scrolling mouse: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/remote/keyboard/press', methods=['POST'])
+@handle_api_errors
+def keyboard_press_endpoint():
+    """Press a key"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    
+    try:
+        data = request.json
+        key = data.get('key')
+        
+        if not key:
+            return jsonify({'error': 'Key is required'}), 400
+        
+        if press_key(key):
+            return jsonify({'status': 'success'})
+        else:
+            return jsonify({'status': 'error', 'message': 'Failed to press key'}), 500
+    except Exception as e:
+        logger.error(f"Error pressing key: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/remote/keyboard/type', methods=['POST'])
+@handle_api_errors
+def keyboard_type_endpoint():
+    """
+    Type text in the background
+    
+    Returns 202 with a job; poll /remote/keyboard/type/<id> for completion.
+    """
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    
+    try:
+        data = request.json
+        text = data.get('text', '')
+        if not text:
+            return jsonify({'error': 'Text is required'}), 400
+        
+        job = input_channel.type_text(text)
+        if job['status'] == 'dropped':
+            return jsonify({'status': 'error', 'message': 'Input queue is full', 'job': job}), 503
+        return jsonify({'status': 'queued', 'job': job}), 202
+    except Exception as e:
+        logger.error(f"Error typing text: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/remote/keyboard/type/<job_id>', methods=['GET'])
+@handle_api_errors
+def keyboard_type_status_endpoint(job_id):
+    """Get the status of a text typing job"""
+    if not REMOTE_DESKTOP_AVAILABLE:
+        return jsonify({'error': 'Remote desktop not available'}), 503
+    job = input_channel.job_status(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job)
+
+
+# ==================== SCREENSHOT ENDPOINTS ====================
+
+@app.route('/screenshots', methods=['POST'])
+@handle_api_errors
+def take_screenshot_endpoint():
+    """
+    Take a screenshot and save it to the gallery
+    
+    Body: {"format": "png"} or {"format": "jpeg"}. Returns 201 with the
+    screenshot's name and URLs; the image itself is fetched separately.
+    """
+    data = request.get_json(silent=True) or {}
+    fmt = data.get('format', 'png')
+    if fmt not in SCREENSHOT_FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(SCREENSHOT_FORMATS)}"}), 400
+    return jsonify(screenshot_gallery.capture(fmt)), 201
+
+
+@app.route('/screenshots', methods=['GET'])
+@handle_api_errors
+def list_screenshots_endpoint():
+    """List saved screenshots, newest first (?offset=0&limit=50)"""
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(200, max(1, int(request.args.get('limit', 50))))
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+    return jsonify({**screenshot_gallery.list(offset, limit), 'offset': offset, 'limit': limit})
+
+
+@app.route('/screenshots/<name>', methods=['GET'])
+@handle_api_errors
+def get_screenshot_endpoint(name):
+    """Get a screenshot as a binary image (supports ETag and Range requests)"""
+    try:
+        path = screenshot_gallery.path(name)
+    except FileNotFoundError:
+        return jsonify({'error': 'Screenshot not found'}), 404
+    # Screenshots never change once written, so clients may cache them
+    return send_file(path, conditional=True, max_age=86400)
+
+
+@app.route('/screenshots/<name>/thumbnail', methods=['GET'])
+@handle_api_errors
+def get_screenshot_thumbnail_endpoint(name):
+    """Get a cached JPEG thumbnail of a screenshot (?size=256)"""
+    try:
+        size = int(request.args.get('size', 256))
+    except ValueError:
+        size = None
+    if size not in THUMBNAIL_SIZES:
+        return jsonify({'error': f"size must be one of {', '.join(map(str, THUMBNAIL_SIZES))}"}), 400
+    try:
+        path = screenshot_gallery.thumbnail(name, size)
+    except FileNotFoundError:
+        return jsonify({'error': 'Screenshot not found'}), 404
+    return send_file(path, mimetype='image/jpeg', conditional=True, max_age=86400)
+
+
+@app.route('/screenshots/<name>', methods=['DELETE'])
+@handle_api_errors
+def delete_screenshot_endpoint(name):
+    """Delete a screenshot (its thumbnails age out of the cache)"""
+    try:
+        screenshot_gallery.delete(name)
+    except FileNotFoundError:
+        return jsonify({'error': 'Screenshot not found'}), 404
+    return jsonify({'success': True})
+
+
+# ==================== FILE EXPLORER ENDPOINTS ====================
+
+@app.route('/files/list', methods=['GET'])
+@handle_api_errors
+def list_files_endpoint():
+    """
+    List files in a directory, one page at a time
+    
+    Query: path, sort (name|size|date), order (asc|desc), limit, cursor (the
+    next_cursor of the previous page). Directories come first.
+    """
+    try:
+        path = request.args.get('path', '~')
+        logger.debug(f"File list request for path: {path}")
+        
+        # Expand ~ to home directory
+        if path == '~' or path.startswith('~/'):
+            path = os.path.expanduser(path)
+        
+        # Convert to absolute path
+        path = os.path.abspath(path)
+        home_dir = os.path.abspath(os.path.expanduser('~'))
+        
+        logger.debug(f"Expanded path: {path}, Home dir: {home_dir}")
+        
+        # Security: prevent directory traversal - only allow access to home directory and subdirectories
+        if not path.startswith(home_dir):
+            logger.warning(f"Access denied for path: {path}")
+            return jsonify({'error': 'Access denied. Only home directory access is allowed.'}), 403
+        
+        if not os.path.exists(path):
+            logger.warning(f"Path does not exist: {path}")
+            return jsonify({'error': f'Path does not exist: {path}'}), 404
+        
+        if not os.path.isdir(path):
+            logger.warning(f"Path is not a directory: {path}")
+            return jsonify({'error': 'Path is not a directory'}), 400
+        
+        try:
+            limit = min(1000, max(1, int(request.args.get('limit', 200))))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        
+        try:
+            return jsonify(directory_cache.page(
+                path,
+                sort=request.args.get('sort', 'name'),
+                order=request.args.get('order', 'asc'),
+                cursor=request.args.get('cursor'),
+                limit=limit
+            ))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        except PermissionError:
+            return jsonify({'error': 'Permission denied'}), 403
+    except Exception as e:
+        logger.error(f"Error listing files: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/files/search', methods=['GET'])
+@handle_api_errors
+def search_files_endpoint():
+    """
+    Search file and folder names under the home directory
+    
+    Query: q (every word must appear in the name), limit. Results come from
+    the background index, so very recent changes may be missing.
+    """
+    try:
+        limit = min(500, max(1, int(request.args.get('limit', 50))))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    try:
+        return jsonify(file_index.search(request.args.get('q', ''), limit))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+
+@app.route('/files/index', methods=['GET'])
+@handle_api_errors
+def file_index_status_endpoint():
+    """Get the filename index's size and crawl statistics"""
+    return jsonify(file_index.status())
+
+
+@app.route('/files/index', methods=['POST'])
+@handle_api_errors
+def file_index_refresh_endpoint():
+    """Start a crawl of the home directory now"""
+    file_index.start()
+    file_index.refresh()
+    return jsonify(file_index.status()), 202
+
+
+@app.route('/files/download', methods=['GET'])
+@handle_api_errors
+def download_file_endpoint():
+    """
+    Download a file
+    
+    Supports Range (including multiple ranges) and If-Range for resuming and
+    parallel chunked downloads, plus ETag/Last-Modified validators.
+    """
+    try:
+        file_path = request.args.get('path')
+        
+        if not file_path:
+            return jsonify({'error': 'File path is required'}), 400
+        
+        # Security check
+        if not os.path.abspath(file_path).startswith(os.path.abspath(os.path.expanduser('~'))):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        if not os.path.exists(file_path) or os.path.isdir(file_path):
+            return jsonify({'error': 'File not found'}), 404
+        
+        return send_file_range(request, file_path, as_attachment=True)
+    except Exception as e:
+        logger.error(f"Error downloading file: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/files/download_zip', methods=['GET'])
+@handle_api_errors
+def download_zip_endpoint():
+    """
+    Download a folder as a ZIP archive
+    
+    The archive is built while it streams (no temporary file, constant
+    memory), so the download starts immediately even for huge folders; the
+    total size is therefore not known in advance.
+    """
+    try:
+        folder = request.args.get('path')
+        
+        if not folder:
+            return jsonify({'error': 'Folder path is required'}), 400
+        
+        folder = os.path.abspath(os.path.expanduser(folder))
+        # Security check
+        if not folder.startswith(os.path.abspath(os.path.expanduser('~'))):
+            return jsonify({'error': 'Access denied'}), 403
+        
+        if not os.path.isdir(folder):
+            return jsonify({'error': 'Folder not found'}), 404
+        
+        name = os.path.basename(folder) or 'archive'
+        return Response(
+            zip_stream(folder),
+            mimetype='application/zip',
+            headers={'Content-Disposition': f"attachment; filename*=UTF-8''{quote(name)}.zip"},
+            direct_passthrough=True
+        )
+    except Exception as e:
+        logger.error(f"Error downloading folder: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/files/upload', methods=['POST'])
+@handle_api_errors
+def create_upload_endpoint():
+    """
+    Start a resumable upload
+    
+    Body: {"path": "<folder>", "name": "file.zip", "size": 123,
+    "sha256": "<optional whole-file digest>", "overwrite": false}. Returns
+    201 with the upload id; send the bytes with PUT /files/upload/<id>.
+    """
+    data = request.get_json(silent=True) or {}
+    folder = os.path.abspath(os.path.expanduser(data.get('path') or '~'))
+    # Security check
+    if not folder.startswith(os.path.abspath(os.path.expanduser('~'))):
+        return jsonify({'error': 'Access denied'}), 403
+    try:
+        upload = upload_manager.create(folder, data.get('name'), data.get('size'),
+                                       data.get('sha256'), bool(data.get('overwrite')))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+    return jsonify({**upload, 'max_chunk_bytes': upload_manager.max_chunk_bytes}), 201
+
+
+@app.route('/files/upload/<upload_id>', methods=['GET'])
+@handle_api_errors
+def upload_status_endpoint(upload_id):
+    """Get an upload's progress; offset is where the next chunk must start"""
+    upload = upload_manager.status(upload_id)
+    if upload is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    return jsonify(upload)
+
+
+@app.route('/files/upload/<upload_id>', methods=['PUT'])
+@handle_api_errors
+def upload_chunk_endpoint(upload_id):
+    """
+    Upload one chunk (raw request body) at ?offset=
+    
+    An optional X-Chunk-SHA256 header is verified before the chunk is
+    accepted. Errors include the offset to resume from (null when resuming
+    cannot help) and the upload's status; "received" means every byte
+    arrived but saving the file failed, see POST /files/upload/<id>/finish.
+    """
+    try:
+        offset = int(request.args.get('offset', ''))
+    except ValueError:
+        return jsonify({'error': 'offset must be an integer'}), 400
+    try:
+        return jsonify(upload_manager.write_chunk(
+            upload_id, offset, request.stream, request.content_length,
+            request.headers.get('X-Chunk-SHA256')
+        ))
+    except UploadError as e:
+        upload = upload_manager.status(upload_id)
+        return jsonify({'error': str(e), 'offset': e.offset, 'status': upload and upload['status']}), e.status
+
+
+@app.route('/files/upload/<upload_id>/finish', methods=['POST'])
+@handle_api_errors
+def finish_upload_endpoint(upload_id):
+    """Retry saving an upload whose bytes have all arrived (status "received")"""
+    try:
+        return jsonify(upload_manager.finish(upload_id))
+    except UploadError as e:
+        return jsonify({'error': str(e)}), e.status
+
+
+@app.route('/files/upload/<upload_id>', methods=['DELETE'])
+@handle_api_errors
+def cancel_upload_endpoint(upload_id):
+    """Abort an upload and delete its partial file"""
+    if not upload_manager.cancel(upload_id):
+        return jsonify({'error': 'Unknown upload'}), 404
+    return jsonify({'success': True})
+
+
+def _preview_path():
+    """Resolve ?path= for previews: files in the home directory or the app's logs"""
+    file_path = request.args.get('path')
+    if not file_path:
+        return None, (jsonify({'error': 'File path is required'}), 400)
+    file_path = os.path.abspath(os.path.expanduser(file_path))
+    allowed = (os.path.abspath(os.path.expanduser('~')), os.path.abspath(LOGS_FOLDER))
+    if not file_path.startswith(allowed):
+        return None, (jsonify({'error': 'Access denied'}), 403)
+    if not os.path.isfile(file_path):
+        return None, (jsonify({'error': 'File not found'}), 404)
+    return file_path, None
+
+
+@app.route('/files/preview', methods=['GET'])
+@handle_api_errors
+def preview_file_endpoint():
+    """
+    Read lines of a text file without downloading it
+    
+    Query: path, mode (tail|head|lines), lines (default 100), start (1-based
+    first line, lines mode). end_offset in the response is where
+    /files/preview/follow continues.
+    """
+    file_path, error = _preview_path()
+    if error:
+        return error
+    try:
+        lines = int(request.args.get('lines', 100))
+        start = int(request.args.get('start', 1))
+        return jsonify(file_preview.read(file_path, request.args.get('mode', 'tail'), lines, start))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except PermissionError:
+        return jsonify({'error': 'Permission denied'}), 403
+
+
+@app.route('/files/preview/follow', methods=['GET'])
+@handle_api_errors
+def follow_file_endpoint():
+    """
+    Stream lines appended to a file as Server-Sent Events
+    
+    Query: path, offset (default: the current end of the file).
+    """
+    file_path, error = _preview_path()
+    if error:
+        return error
+    try:
+        offset = int(request.args.get('offset', os.path.getsize(file_path)))
+    except ValueError:
+        return jsonify({'error': 'offset must be an integer'}), 400
+    return Response(
+        follow_file(file_path, max(0, offset)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ==================== UPDATE ENDPOINTS ====================
+
+@app.route('/get-app-version', methods=['GET'])
+def get_app_version():
+    """Get current app version"""
+    return jsonify({'version': APP_VERSION})
+
+
+@app.route('/check-update', methods=['GET'])
+@handle_api_errors
+def check_update():
+    """Check if an update is available"""
+    try:
+        is_update_available = updater.check_update()
+        return jsonify(is_update_available)
+    except Exception as e:
+        logger.error(f"Error checking for updates: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/update', methods=['POST'])
+@handle_api_errors
+def update():
+    """Trigger the update process"""
+    try:
+        updater.update_app()
+        return jsonify({'status': 'Updating...'}), 200
+    except Exception as e:
+        logger.error(f"Error during update: {e}")
+        return jsonify({'status': f'Error during update: {e}'}), 500
+
+
+# ==================== SYSTEM CONTROL ENDPOINTS ====================
+
+@app.route('/shutdown', methods=['POST'])
+@handle_api_errors
+def shutdown():
+    """Shutdown the system"""
+    try:
+        os.system("shutdown /s /t 1")
+        return jsonify({"message": "System shutting down"}), 200
+    except Exception as e:
+        logger.error(f"Error shutting down: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/restart', methods=['POST'])
+@handle_api_errors
+def restart():
+    """Restart the system"""
+    try:
+        os.system("shutdown /r /t 1")
+        return jsonify({"message": "System restarting"}), 200
+    except Exception as e:
+        logger.error(f"Error restarting: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/logout', methods=['POST'])
+@handle_api_errors
+def logout():
+    """Logout current user"""
+    try:
+        os.system("shutdown /l")
+        return jsonify({"message": "User logged out"}), 200
+    except Exception as e:
+        logger.error(f"Error logging out: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/lock', methods=['POST'])
+@handle_api_errors
+def lock():
+    """Lock the system"""
+    try:
+        os.system("rundll32.exe user32.dll,LockWorkStation")
+        return jsonify({"message": "System locked"}), 200
+    except Exception as e:
+        logger.error(f"Error locking system: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/exit', methods=['POST'])
+@handle_api_errors
+def exit_app():
+    """Close/exit the application (terminates the exe process)"""
+    try:
+        logger.info("Application exit requested")
+        # Schedule exit in a separate thread to allow response to be sent
+        import threading
+        def force_exit():
+            import time
+            time.sleep(0.5)  # Give time for response to be sent
+            # Force exit - this will terminate the exe process
+            os._exit(0)
+        
+        shutdown_thread = threading.Thread(target=force_exit)
+        shutdown_thread.daemon = True
+        shutdown_thread.start()
+        
+        return jsonify({"message": "Application closing..."}), 200
+    except Exception as e:
+        logger.error(f"Error exiting application: {e}")
+        # Force exit as fallback
+        import threading
+        threading.Timer(0.5, lambda: os._exit(0)).start()
+        return jsonify({"message": "Application closing..."}), 200
+
+
+# ==================== MEDIA ENDPOINTS ====================
+
+@app.route('/media/<command>', methods=['POST'])
+@handle_api_errors
+def execute_command(command):
+    """Execute media control commands"""
+    valid_commands = ['prev_track', 'play_pause', 'next_track']
+    
+    if command not in valid_commands:
+        return jsonify({"error": "Invalid command"}), 400
+    
+    try:
+        media.send_media_key(command)
+        return jsonify({"message": f"Command '{command}' executed successfully!"})
+    except Exception as e:
+        logger.error(f"Error executing media command: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+# ==================== STARTUP ====================
+
+def startup_message():
+    """Display startup message with IP and port"""
+    print("=" * 60)
+    print("\n🚀 PC Gaming App is running!")
+    print("   Closing this window will stop the app.\n")
+    
+    ip_address = get_ip_address()
+    port = SERVER_PORT
+    link = f"http://{ip_address}:{port}"
+    
+    print(f"📱 Access on your phone: {link}")
+    print(f"💻 Access on this PC: http://localhost:{port}")
+    print("=" * 60)
+    
+    # Check for updates on startup
+    print("\n🔍 Checking for updates...")
+    try:
+        if updater.check_update():
+            latest_version = updater.get_latest_tag_name()
+            print(f"⚠️  UPDATE AVAILABLE!")
+            print(f"   Current version: {APP_VERSION}")
+            print(f"   Latest version: {latest_version}")
+            print(f"   Check the web interface to update.\n")
+        else:
+            print(f"✅ You are running the latest version ({APP_VERSION})\n")
+    except Exception as e:
+        logger.warning(f"Could not check for updates on startup: {e}")
+        print(f"⚠️  Could not check for updates. Will check in web interface.\n")
+    
+    print(r"""
+           /\     /\
+          {  `---'  }
+          {  O   O  }
+          ~~>  V  <~~
+           \  \|/  /
+            `-----'____
+            /     \    \_
+           {  **   }\  )_\_   _
+           |  \_/  |/ /  \_\_/ )
+            \__/  /(_/     \__/
+              (__/
+    """)
+
+
+def main():
+    """
+    Run the app: request admin rights, start background services, then serve
+    the UI in a standalone window (or the browser as a fallback)
+    
+    Called by the Monitor.py entry point.
+    """
+    # Request admin privileges on startup
+    if not is_admin():
+        if DEBUG:
+            print("Requesting administrator privileges...")
+        run_as_admin()
+    
+    if DEBUG:
+        print("Running with administrator privileges.")
+    
+    start_background_services()
+    startup_message()
+    
+    ip_address = get_ip_address()
+    url = f'http://{ip_address}:{SERVER_PORT}'
+    
+    # Check if we should use standalone window or browser
+    use_standalone_window = True  # Set to False to use browser instead
+    
+    if use_standalone_window:
+        try:
+            from PyQt5.QtWidgets import QApplication
+            from PyQt5.QtCore import QUrl, QSettings
+            from PyQt5.QtWebEngineWidgets import QWebEngineView, QWebEngineSettings
+            
+            def run_flask_server():
+                """Run Flask server in a separate thread"""
+                WSGIRequestHandler.protocol_version = "HTTP/1.1"
+                # Use 0.0.0.0 to allow access from other devices on the network
+                # The standalone window will connect via localhost, but other devices can use the IP
+                host = '0.0.0.0'  # Listen on all interfaces
+                logger.info(f"Starting server on {host}:{SERVER_PORT}")
+                if DEBUG:
+                    logger.info(f"Access from this PC: http://127.0.0.1:{SERVER_PORT}")
+                    logger.info(f"Access from network: http://{get_ip_address()}:{SERVER_PORT}")
+                try:
+                    # Use Werkzeug's development server directly for better thread compatibility
+                    from werkzeug.serving import make_server
+                    server = make_server(host, SERVER_PORT, app, threaded=True)
+                    logger.info(f"Server started successfully on {host}:{SERVER_PORT}")
+                    server.serve_forever()
+                except Exception as e:
+                    logger.error(f"Flask server error: {e}")
+                    import traceback
+                    logger.error(traceback.format_exc())
+            
+            # Start Flask server in a separate thread (daemon=True so it stops when main thread exits)
+            server_thread = threading.Thread(target=run_flask_server, daemon=True)
+            server_thread.start()
+            
+            # Wait for server to fully start with better checking
+            max_wait = 10
+            waited = 0
+            server_ready = False
+            while waited < max_wait:
+                try:
+                    import urllib.request
+                    # First check if port is open
+                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                    sock.settimeout(1)
+                    result = sock.connect_ex(('127.0.0.1', SERVER_PORT))
+                    sock.close()
+                    if result == 0:
+                        # Port is open, try HTTP request
+                        response = urllib.request.urlopen(f'http://127.0.0.1:{SERVER_PORT}', timeout=2)
+                        if response.getcode() == 200:
+                            logger.info("Server is ready!")
+                            server_ready = True
+                            break
+                except Exception as e:
+                    pass
+                time.sleep(0.5)
+                waited += 0.5
+                if waited % 1 == 0:  # Log every second
+                    logger.info(f"Waiting for server to start... ({waited:.1f}s)")
+            
+            if not server_ready:
+                logger.error(f"Server failed to start after {max_wait} seconds!")
+                logger.error("Falling back to browser mode...")
+                # Fallback to browser
+                ip_address = get_ip_address()
+                fallback_url = f'http://{ip_address}:{SERVER_PORT}'
+                if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+                    try:
+                        webbrowser.open(fallback_url)
+                    except Exception as e:
+                        logger.warning(f"Could not open browser: {e}")
+                WSGIRequestHandler.protocol_version = "HTTP/1.1"
+                logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
+                app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
+            else:
+                # Server is ready, create the window
+                # Create Qt application
+                qt_app = QApplication(sys.argv)
+                qt_app.setApplicationName("PC Gaming Monitor")
+                
+                # Set application icon
+                from PyQt5.QtGui import QIcon
+                icon_path = str(BASE_DIR / 'icon.png')
+                if os.path.exists(icon_path):
+                    qt_app.setWindowIcon(QIcon(icon_path))
+                    logger.info(f"Set application icon: {icon_path}")
+                else:
+                    logger.warning(f"Icon not found at {icon_path}")
+                
+                # Enable local content access for Qt WebEngine
+                QWebEngineSettings.globalSettings().setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
+                QWebEngineSettings.globalSettings().setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
+                
+                # Create web view window
+                browser = QWebEngineView()
+                browser.setWindowTitle("PC Gaming Monitor")
+                browser.resize(1400, 900)
+                browser.setMinimumSize(800, 600)
+                
+                # Set window icon
+                if os.path.exists(icon_path):
+                    browser.setWindowIcon(QIcon(icon_path))
+                
+                # Enable JavaScript and other features
+                settings = browser.settings()
+                settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
+                settings.setAttribute(QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
+                settings.setAttribute(QWebEngineSettings.LocalContentCanAccessFileUrls, True)
+                
+                # Enable JavaScript console logging only in debug mode
+                if DEBUG:
+                    from PyQt5.QtWebEngineWidgets import QWebEnginePage
+                    
+                    class ConsolePage(QWebEnginePage):
+                        def javaScriptConsoleMessage(self, level, message, lineNumber, sourceID):
+                            level_str = {0: 'INFO', 1: 'WARNING', 2: 'ERROR'}.get(level, 'UNKNOWN')
+                            logger.info(f"JS Console [{level_str}]: {message} (line {lineNumber})")
+                    
+                    # Set custom page with console logging
+                    console_page = ConsolePage(browser)
+                    browser.setPage(console_page)
+                
+                # Load the URL after server is confirmed ready (use 127.0.0.1 explicitly)
+                app_url = f'http://127.0.0.1:{SERVER_PORT}'
+                url = QUrl(app_url)
+                
+                # Add a small delay to ensure server is fully ready
+                time.sleep(0.5)
+                
+                if DEBUG:
+                    logger.info(f"Loading URL: {app_url}")
+                browser.load(url)
+                browser.show()
+                
+                logger.info(f"Opening application window at {app_url}...")
+                logger.info("If you see 'Loading...' messages, check the console for server errors.")
+                
+                # Run the Qt event loop (this blocks until window is closed)
+                qt_app.exec_()
+                
+                # When window closes, the daemon thread will be cleaned up automatically
+                logger.info("Window closed.")
+            
+            # Create Qt application
+            qt_app = QApplication(sys.argv)
+            qt_app.setApplicationName("PC Gaming Monitor")
+            
+            # Create web view window
+            browser = QWebEngineView()
+            browser.setWindowTitle("PC Gaming Monitor")
+            browser.resize(1400, 900)
+            browser.setMinimumSize(800, 600)
+            
+            # Load the URL after server is confirmed ready (use 127.0.0.1 explicitly)
+            url = QUrl(f'http://127.0.0.1:{SERVER_PORT}')
+            browser.load(url)
+            browser.show()
+            
+            logger.info(f"Opening application window at {url.toString()}...")
+            
+            # Run the Qt event loop (this blocks until window is closed)
+            qt_app.exec_()
+            
+            # When window closes, the daemon thread will be cleaned up automatically
+            logger.info("Window closed.")
+            
+        except ImportError as e:
+            logger.warning(f"PyQt5 not available: {e}")
+            logger.info("Install with: pip install PyQt5 PyQtWebEngine")
+            logger.info("Falling back to browser mode...")
+            # Fallback to browser
+            if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+                try:
+                    webbrowser.open(url)
+                except Exception as e:
+                    logger.warning(f"Could not open browser: {e}")
+            WSGIRequestHandler.protocol_version = "HTTP/1.1"
+            logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
+            app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
+        except Exception as e:
+            logger.error(f"Error starting standalone window: {e}")
+            logger.info("Falling back to browser mode...")
+            # Fallback to browser
+            if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+                try:
+                    webbrowser.open(url)
+                except Exception as e:
+                    logger.warning(f"Could not open browser: {e}")
+            WSGIRequestHandler.protocol_version = "HTTP/1.1"
+            logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
+            app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
+    else:
+        # Use browser mode
+        if not DEBUG or not os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            try:
+                webbrowser.open(url)
+            except Exception as e:
+                logger.warning(f"Could not open browser: {e}")
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        logger.info(f"Starting server on {SERVER_HOST}:{SERVER_PORT}")
+        app.run(host=SERVER_HOST, port=SERVER_PORT, debug=DEBUG)
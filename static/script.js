@@ -661,15 +661,21 @@ const networkMonitor = {
 // File Explorer
 const fileExplorer = {
     currentPath: '~',
+    sort: 'name',
+    order: 'asc',
+    nextCursor: null,
     
-    async load(path = null) {
+    async load(path = null, cursor = null) {
         if (!path) path = this.currentPath;
         try {
-            const data = await api.fetchMetrics(`/files/list?path=${encodeURIComponent(path)}`);
+            let url = `/files/list?path=${encodeURIComponent(path)}&sort=${this.sort}&order=${this.order}`;
+            if (cursor) url += `&cursor=${encodeURIComponent(cursor)}`;
+            const data = await api.fetchMetrics(url);
             if (data && data.items) {
                 this.currentPath = data.path;
+                this.nextCursor = data.next_cursor;
                 document.getElementById('file-explorer-path').value = data.path;
-                this.render(data.items);
+                this.render(data.items, Boolean(cursor));
             }
         } catch (error) {
             console.error('Error loading files:', error);
@@ -678,11 +684,35 @@ const fileExplorer = {
         }
     },
     
-    render(items) {
+    loadMore() {
+        if (this.nextCursor) this.load(this.currentPath, this.nextCursor);
+    },
+    
+    async search() {
+        const query = document.getElementById('file-explorer-search').value.trim();
+        if (!query) {
+            this.load();
+            return;
+        }
+        const data = await api.fetchMetrics(`/files/search?q=${encodeURIComponent(query)}&limit=200`);
+        if (data && data.results) {
+            this.nextCursor = null;
+            const breadcrumb = document.getElementById('breadcrumb-path');
+            this.render(data.results);
+            if (breadcrumb) breadcrumb.textContent = `${data.total} matches for "${query}"`;
+        }
+    },
+    
+    setSort(value) {
+        [this.sort, this.order] = value.split('-');
+        this.load();
+    },
+    
+    render(items, append = false) {
         const container = document.getElementById('file-explorer-list');
         const breadcrumb = document.getElementById('breadcrumb-path');
         
-        if (!items || items.length === 0) {
+        if (!append && (!items || items.length === 0)) {
             container.innerHTML = '<p style="text-align: center; color: var(--text-muted); padding: 20px;">Empty directory</p>';
             return;
         }
@@ -720,21 +750,37 @@ const fileExplorer = {
     `;
         }).join('');
         
-        container.innerHTML = html;
+        const more = container.querySelector('.file-explorer-more');
+        if (more) more.remove();
+        if (append) {
+            container.insertAdjacentHTML('beforeend', html);
+        } else {
+            container.innerHTML = html;
+            container.scrollTop = 0;
+        }
         
-        // Add click event listeners to all items
-        container.querySelectorAll('.file-explorer-item').forEach(item => {
+        // Add click event listeners to the new items
+        container.querySelectorAll('.file-explorer-item:not([data-bound])').forEach(item => {
+            item.setAttribute('data-bound', '');
             item.addEventListener('click', (e) => {
                 const path = item.getAttribute('data-path');
                 const isDir = item.getAttribute('data-is-dir') === 'true';
                 
                 if (isDir) {
                     this.load(path);
+                } else if (this.isText(path)) {
+                    this.preview(path);
                 } else {
                     this.download(path);
                 }
             });
         });
+        
+        if (this.nextCursor) {
+            container.insertAdjacentHTML('beforeend',
+                '<button class="remote-button file-explorer-more">Load more</button>');
+            container.querySelector('.file-explorer-more').addEventListener('click', () => this.loadMore());
+        }
     },
     
     formatSize(bytes) {
@@ -748,6 +794,178 @@ const fileExplorer = {
         window.open(`/files/download?path=${encodeURIComponent(filePath)}`, '_blank');
     },
     
+    async upload(files) {
+        const breadcrumb = document.getElementById('breadcrumb-path');
+        const folder = this.currentPath;
+        const progress = {};
+        const show = () => {
+            if (breadcrumb) {
+                breadcrumb.textContent = Object.entries(progress)
+                    .map(([name, percent]) => `${name}: ${percent}`).join(', ');
+            }
+        };
+        await Promise.all(Array.from(files).map(async file => {
+            try {
+                await this.uploadFile(folder, file, percent => {
+                    progress[file.name] = `${percent}%`;
+                    show();
+                });
+            } catch (error) {
+                console.error(`Error uploading ${file.name}:`, error);
+                progress[file.name] = 'failed';
+                show();
+            }
+        }));
+        setTimeout(() => this.load(folder), 1500);
+    },
+    
+    async uploadFile(folder, file, onProgress) {
+        const createResponse = await fetch('/files/upload', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ path: folder, name: file.name, size: file.size })
+        });
+        const upload = await createResponse.json();
+        if (!createResponse.ok) throw new Error(upload.error);
+        
+        const chunkSize = Math.min(8 * 1024 * 1024, upload.max_chunk_bytes);
+        let offset = upload.offset;
+        let retries = 0;
+        while (offset < file.size) {
+            const chunk = file.slice(offset, offset + chunkSize);
+            const headers = { 'Content-Type': 'application/octet-stream' };
+            // crypto.subtle only exists in secure contexts (HTTPS or localhost)
+            if (window.crypto && crypto.subtle) {
+                const digest = await crypto.subtle.digest('SHA-256', await chunk.arrayBuffer());
+                headers['X-Chunk-SHA256'] = Array.from(new Uint8Array(digest))
+                    .map(byte => byte.toString(16).padStart(2, '0')).join('');
+            }
+            try {
+                const response = await fetch(`/files/upload/${upload.id}?offset=${offset}`, {
+                    method: 'PUT', headers, body: chunk
+                });
+                const result = await response.json();
+                if (!response.ok) {
+                    if (result.offset === undefined || result.offset === null) {
+                        // Every byte arrived but saving the file failed
+                        if (result.status !== 'received') throw new Error(result.error);
+                        await this.finishUpload(upload.id);
+                        break;
+                    }
+                    // Resume from where the server says the upload stands
+                    offset = result.offset;
+                    if (++retries > 5) throw new Error(result.error);
+                    continue;
+                }
+                offset = result.offset;
+                retries = 0;
+            } catch (error) {
+                // Network drop: ask the server for the offset, then resume
+                if (++retries > 5) throw error;
+                await new Promise(resolve => setTimeout(resolve, 1000 * retries));
+                const status = await api.fetchMetrics(`/files/upload/${upload.id}`);
+                if (!status || !['uploading', 'received', 'complete'].includes(status.status)) throw error;
+                if (status.status === 'received') {
+                    await this.finishUpload(upload.id);
+                    break;
+                }
+                offset = status.offset;
+            }
+            onProgress(file.size ? Math.floor(offset * 100 / file.size) : 100);
+        }
+        onProgress(100);
+    },
+    
+    async finishUpload(id) {
+        // Retries only the final save, which may fail for a moment (e.g. the file is locked)
+        for (let attempt = 1; ; attempt++) {
+            const response = await fetch(`/files/upload/${id}/finish`, { method: 'POST' });
+            const result = await response.json();
+            if (response.ok) return;
+            if (response.status !== 500 || attempt >= 3) throw new Error(result.error);
+            await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+        }
+    },
+    
+    textExtensions: ['log', 'txt', 'ini', 'cfg', 'conf', 'json', 'xml', 'yml', 'yaml', 'csv', 'md'],
+    previewPath: null,
+    previewSource: null,
+    previewOffset: 0,
+    previewLines: 500,
+    
+    isText(path) {
+        const extension = path.split('.').pop().toLowerCase();
+        return this.textExtensions.includes(extension);
+    },
+    
+    async preview(path) {
+        this.stopFollow();
+        const data = await api.fetchMetrics(`/files/preview?path=${encodeURIComponent(path)}&mode=tail&lines=${this.previewLines}`);
+        if (!data) {
+            this.download(path);
+            return;
+        }
+        this.previewPath = path;
+        this.previewOffset = data.end_offset;
+        document.getElementById('file-preview').style.display = '';
+        document.getElementById('file-preview-name').textContent = `${path} (last ${data.lines.length} lines)`;
+        const text = document.getElementById('file-preview-text');
+        text.textContent = data.lines.join('\n');
+        text.scrollTop = text.scrollHeight;
+    },
+    
+    toggleFollow() {
+        if (this.previewSource) {
+            this.stopFollow();
+            return;
+        }
+        if (!this.previewPath) return;
+        const text = document.getElementById('file-preview-text');
+        const source = new EventSource(
+            `/files/preview/follow?path=${encodeURIComponent(this.previewPath)}&offset=${this.previewOffset}`);
+        source.addEventListener('lines', event => {
+            const data = JSON.parse(event.data);
+            this.previewOffset = data.offset;
+            const atBottom = text.scrollTop + text.clientHeight >= text.scrollHeight - 20;
+            text.textContent += (text.textContent ? '\n' : '') + data.lines.join('\n');
+            // Keep the view bounded; follow can run for hours
+            const lines = text.textContent.split('\n');
+            if (lines.length > this.previewLines * 4) {
+                text.textContent = lines.slice(-this.previewLines * 2).join('\n');
+            }
+            if (atBottom) text.scrollTop = text.scrollHeight;
+        });
+        source.addEventListener('reset', () => {
+            this.previewOffset = 0;
+            text.textContent = '';
+        });
+        source.addEventListener('error', () => {
+            // EventSource reconnects by itself unless the server closed the stream for good
+            if (source.readyState === EventSource.CLOSED) this.stopFollow();
+        });
+        this.previewSource = source;
+        document.querySelector('#file-preview-follow i').className = 'fas fa-pause';
+    },
+    
+    stopFollow() {
+        if (this.previewSource) {
+            this.previewSource.close();
+            this.previewSource = null;
+        }
+        const icon = document.querySelector('#file-preview-follow i');
+        if (icon) icon.className = 'fas fa-play';
+    },
+    
+    closePreview() {
+        this.stopFollow();
+        this.previewPath = null;
+        document.getElementById('file-preview').style.display = 'none';
+    },
+    
+    downloadFolder() {
+        window.open(`/files/download_zip?path=${encodeURIComponent(this.currentPath)}`, '_blank');
+    },
+    
     goToPath() {
         const path = document.getElementById('file-explorer-path').value;
         this.load(path);
@@ -776,10 +994,111 @@ const fileExplorer = {
     }
 };
 
+// Screenshot gallery
+const screenshots = {
+    pageSize: 24,
+    offset: 0,
+    observer: null,
+    
+    async load(append = false) {
+        if (!append) this.offset = 0;
+        const data = await api.fetchMetrics(`/screenshots?offset=${this.offset}&limit=${this.pageSize}`);
+        if (!data) return;
+        this.offset += data.items.length;
+        this.render(data.items, append);
+        document.getElementById('screenshot-more').style.display = this.offset < data.total ? '' : 'none';
+    },
+    
+    render(items, append) {
+        const container = document.getElementById('screenshot-gallery');
+        if (!append) {
+            container.innerHTML = '';
+            if (items.length === 0) {
+                container.innerHTML = '<p style="text-align: center; color: var(--text-muted);">No screenshots yet</p>';
+                return;
+            }
+        }
+        
+        // Thumbnails are only requested once they scroll into view
+        if (!this.observer && 'IntersectionObserver' in window) {
+            this.observer = new IntersectionObserver(entries => {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        entry.target.src = entry.target.dataset.src;
+                        this.observer.unobserve(entry.target);
+                    }
+                });
+            }, { root: container, rootMargin: '200px' });
+        }
+        
+        items.forEach(item => {
+            const link = document.createElement('a');
+            link.className = 'screenshot-item';
+            link.href = item.url;
+            link.target = '_blank';
+            link.title = `${item.name} (${fileExplorer.formatSize(item.size)})`;
+            const img = document.createElement('img');
+            img.alt = item.name;
+            img.dataset.src = `${item.thumbnail}?size=256`;
+            if (this.observer) {
+                this.observer.observe(img);
+            } else {
+                img.loading = 'lazy';
+                img.src = img.dataset.src;
+            }
+            link.appendChild(img);
+            container.appendChild(link);
+        });
+    },
+    
+    async take() {
+        const button = document.getElementById('screenshot-take');
+        button.disabled = true;
+        try {
+            const response = await fetch('/screenshots', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ format: 'png' })
+            });
+            if (response.ok) {
+                await this.load();
+            } else {
+                console.error('Error taking screenshot:', await response.text());
+            }
+        } catch (error) {
+            console.error('Error taking screenshot:', error);
+        } finally {
+            button.disabled = false;
+        }
+    }
+};
+
 // Remote Desktop
 const remoteDesktop = {
     isActive: false,
     streamInterval: null,
+    frameInFlight: false,
+    frameFormat: 'jpeg',
+    frameQuality: 70,
+    streamFps: 15,
+    streamMode: 'tiles', // 'video' (H.264/VP8), 'tiles' (changed regions only) or 'mjpeg'
+    streamAbort: null,
+    streamVideo: null,
+    videoCodec: null,
+    videoMimetype: null,
+    frameCanvas: null,
+    streamId: null,
+    // Stable for the page; scopes input ids so only this viewer's stream reports them
+    viewerId: Math.random().toString(36).slice(2),
+    streamStatus: null,
+    lastAck: 0,
+    streamImage: null,
+    streamAnimation: null,
+    inputSocket: null,
+    nextInputId: Math.floor(Math.random() * 0x7fffffff),
+    pendingInputs: new Map(),
+    latencySamples: [],
+    latencyReportInterval: null,
     screenSize: { width: 1920, height: 1080 },
     canvas: null,
     ctx: null,
@@ -795,6 +1114,7 @@ const remoteDesktop = {
             const sizeData = await api.fetchMetrics('/remote/screen_size');
             if (sizeData) {
                 this.screenSize = { width: sizeData.width, height: sizeData.height };
+                this.populateCaptureTargets(sizeData);
             }
             
             // Setup canvas
@@ -821,8 +1141,15 @@ const remoteDesktop = {
             this.isActive = true;
             this.updateStatus('Connected', '#4CAF50');
             
-            // Start streaming
-            this.streamInterval = setInterval(() => this.updateFrame(), 100); // 10 FPS
+            // Prefer inter-frame video when the server has an encoder the browser can play
+            this.configureVideo(await api.fetchMetrics('/remote/video/status'));
+            
+            // Start streaming (video or tiles, falling back to MJPEG, then polling)
+            this.startStream();
+            
+            // Open the WebSocket input channel (HTTP requests are the fallback)
+            this.openInputSocket();
+            this.latencyReportInterval = setInterval(() => this.reportLatency(), 2000);
             
             // Start cursor position update
             this.cursorUpdateInterval = setInterval(() => this.updateCursorPosition(), 100);
@@ -849,6 +1176,16 @@ const remoteDesktop = {
         if (!this.isActive) return;
         
         this.isActive = false;
+        this.stopStream();
+        if (this.inputSocket) {
+            this.inputSocket.close();
+            this.inputSocket = null;
+        }
+        if (this.latencyReportInterval) {
+            clearInterval(this.latencyReportInterval);
+            this.latencyReportInterval = null;
+        }
+        this.pendingInputs.clear();
         if (this.streamInterval) {
             clearInterval(this.streamInterval);
             this.streamInterval = null;
@@ -872,26 +1209,335 @@ const remoteDesktop = {
         this.updateStatus('Disconnected', '#ff4444');
     },
     
+    populateCaptureTargets(sizeData) {
+        const select = document.getElementById('remote-capture-target');
+        if (!select || !sizeData.monitors) return;
+        select.innerHTML = '';
+        for (const monitor of sizeData.monitors) {
+            const option = document.createElement('option');
+            option.value = monitor.index;
+            const label = monitor.index === 0 ? 'All monitors' : `Monitor ${monitor.index}`;
+            option.textContent = `${label} (${monitor.width}x${monitor.height})`;
+            select.appendChild(option);
+        }
+        const target = sizeData.target || {};
+        if (target.type === 'monitor') {
+            select.value = String(target.monitor);
+        } else if (target.type && target.type !== 'desktop') {
+            // Regions and windows are selected through the API
+            const option = document.createElement('option');
+            option.value = 'custom';
+            option.textContent = `Custom ${target.type} (${target.width}x${target.height})`;
+            select.appendChild(option);
+            select.value = 'custom';
+        } else {
+            select.value = '0';
+        }
+    },
+    
+    async setCaptureTarget(value) {
+        if (value === 'custom') return;
+        const monitor = Number(value);
+        const spec = monitor === 0 ? { type: 'desktop' } : { type: 'monitor', monitor };
+        try {
+            const response = await fetch('/remote/capture_target', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify(spec)
+            });
+            const data = await response.json();
+            if (!response.ok) throw new Error(data.error || 'Failed to change capture target');
+            // Input coordinates are relative to the target, so rescale to it
+            this.screenSize = { width: data.target.width, height: data.target.height };
+            this.currentMousePos = { x: this.screenSize.width / 2, y: this.screenSize.height / 2 };
+            this.updateCanvasSize();
+            if (this.isActive) {
+                this.stopStream();
+                this.startStream();
+            }
+        } catch (error) {
+            console.error('Error changing capture target:', error);
+            alert(error.message);
+        }
+    },
+    
+    configureVideo(status) {
+        if (!status || !status.available || !window.MediaSource || !window.ReadableStream) return;
+        for (const codec of status.codecs) {
+            if (MediaSource.isTypeSupported(status.mimetypes[codec])) {
+                this.videoCodec = codec;
+                this.videoMimetype = status.mimetypes[codec];
+                this.streamMode = 'video';
+                return;
+            }
+        }
+    },
+    
+    startStream() {
+        if (this.streamMode === 'video' && this.videoCodec) {
+            this.startVideoStream().catch((error) => {
+                if (!this.isActive || error.name === 'AbortError') return;
+                console.warn('Video stream failed, falling back to tiles:', error);
+                this.stopStream();
+                this.streamMode = 'tiles';
+                this.startStream();
+            });
+        } else if (this.streamMode !== 'mjpeg' && window.ReadableStream) {
+            this.startTileStream().catch((error) => {
+                if (!this.isActive || error.name === 'AbortError') return;
+                console.warn('Tile stream failed, falling back to MJPEG:', error);
+                this.stopStream();
+                this.startMjpegStream();
+            });
+        } else {
+            this.startMjpegStream();
+        }
+    },
+    
+    async startVideoStream() {
+        // Fragments are appended to a MediaSource as they arrive; each animation
+        // frame paints the playing <video> onto the canvas
+        const controller = new AbortController();
+        this.streamAbort = controller;
+        const video = document.createElement('video');
+        video.muted = true;
+        video.playsInline = true;
+        const mediaSource = new MediaSource();
+        video.src = URL.createObjectURL(mediaSource);
+        this.streamVideo = video;
+        await new Promise(resolve => mediaSource.addEventListener('sourceopen', resolve, { once: true }));
+        const sourceBuffer = mediaSource.addSourceBuffer(this.videoMimetype);
+        const updated = () => new Promise(resolve => sourceBuffer.addEventListener('updateend', resolve, { once: true }));
+        
+        const response = await fetch(`/remote/video/stream?${this.streamParams()}&codec=${this.videoCodec}`, {
+            cache: 'no-store',
+            signal: controller.signal
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        
+        const paint = () => {
+            if (!this.isActive || this.streamVideo !== video) return;
+            if (video.readyState >= 2 && this.ctx && this.canvas) {
+                this.ctx.drawImage(video, 0, 0, this.canvas.width, this.canvas.height);
+                this.drawCursorIndicator();
+            }
+            this.streamAnimation = requestAnimationFrame(paint);
+        };
+        this.streamAnimation = requestAnimationFrame(paint);
+        video.play().catch(() => {});
+        
+        const reader = response.body.getReader();
+        while (this.isActive && this.streamAbort === controller) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            if (sourceBuffer.updating) await updated();
+            sourceBuffer.appendBuffer(value);
+            await updated();
+            
+            const buffered = sourceBuffer.buffered;
+            if (buffered.length === 0) continue;
+            const end = buffered.end(buffered.length - 1);
+            // Stay at the live edge instead of playing out a backlog
+            if (end - video.currentTime > 0.3) video.currentTime = end - 0.05;
+            // Drop frames already shown so the buffer does not grow forever
+            if (video.currentTime - buffered.start(0) > 10) {
+                sourceBuffer.remove(buffered.start(0), video.currentTime - 2);
+                await updated();
+            }
+        }
+        // The server ends the stream when the capture size changes; reconnect
+        if (this.isActive && this.streamAbort === controller) {
+            this.stopStream();
+            this.startStream();
+        }
+    },
+    
+    async startTileStream() {
+        // Only changed screen tiles are sent; they are composited onto a
+        // full-resolution offscreen canvas which is then scaled onto the viewer
+        const controller = new AbortController();
+        this.streamAbort = controller;
+        const response = await fetch(`/remote/tiles/stream?${this.streamParams()}`, {
+            cache: 'no-store',
+            signal: controller.signal
+        });
+        if (!response.ok || !response.body) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+        
+        const reader = response.body.getReader();
+        let pending = new Uint8Array(0);
+        while (this.isActive && this.streamAbort === controller) {
+            const { value, done } = await reader.read();
+            if (done) throw new Error('Tile stream ended');
+            
+            const merged = new Uint8Array(pending.length + value.length);
+            merged.set(pending);
+            merged.set(value, pending.length);
+            pending = merged;
+            
+            // Packets are prefixed with their u32 little-endian length
+            while (pending.length >= 4) {
+                const length = new DataView(pending.buffer, pending.byteOffset, 4).getUint32(0, true);
+                if (pending.length < 4 + length) break;
+                await this.applyTilePacket(pending.subarray(4, 4 + length));
+                pending = pending.slice(4 + length);
+            }
+        }
+    },
+    
+    streamParams() {
+        // The server downscales to the viewer's size in device pixels and adapts
+        // fps/quality/scale to the measured latency of this stream id
+        this.streamId = Math.random().toString(36).slice(2);
+        const ratio = window.devicePixelRatio || 1;
+        const width = Math.round((this.canvas ? this.canvas.width : 800) * ratio);
+        const height = Math.round((this.canvas ? this.canvas.height : 600) * ratio);
+        return `fps=${this.streamFps}&quality=${this.frameQuality}&width=${width}&height=${height}&id=${this.streamId}&viewer=${this.viewerId}`;
+    },
+    
+    ackFrame(seq) {
+        const now = performance.now();
+        if (now - this.lastAck < 200) return;
+        this.lastAck = now;
+        fetch('/remote/stream/ack', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ id: this.streamId, seq })
+        })
+            .then(response => response.ok ? response.json() : null)
+            .then(status => { if (status) this.streamStatus = status; })
+            .catch(() => {});
+    },
+    
+    async applyTilePacket(packet) {
+        const view = new DataView(packet.buffer, packet.byteOffset, packet.byteLength);
+        const magic = String.fromCharCode(...packet.subarray(0, 4));
+        if (magic !== 'TDF1') throw new Error('Bad tile packet');
+        const flags = view.getUint8(4);
+        const width = view.getUint16(5, true);
+        const height = view.getUint16(7, true);
+        const regionCount = view.getUint16(13, true);
+        let offset = 15;
+        const inputIds = [];
+        if (flags & 2) {
+            const count = view.getUint8(offset);
+            for (let i = 0; i < count; i++) {
+                inputIds.push(view.getUint32(offset + 1 + i * 4, true));
+            }
+            offset += 1 + count * 4;
+        }
+        if (regionCount === 0) {
+            // Heartbeat, or inputs that changed nothing on screen
+            this.inputsShown(inputIds);
+            return;
+        }
+        
+        if (!this.frameCanvas || this.frameCanvas.width !== width || this.frameCanvas.height !== height) {
+            this.frameCanvas = document.createElement('canvas');
+            this.frameCanvas.width = width;
+            this.frameCanvas.height = height;
+        }
+        
+        const regions = [];
+        for (let i = 0; i < regionCount; i++) {
+            const x = view.getUint16(offset, true);
+            const y = view.getUint16(offset + 2, true);
+            const length = view.getUint32(offset + 8, true);
+            offset += 12;
+            const blob = new Blob([packet.subarray(offset, offset + length)], { type: 'image/jpeg' });
+            offset += length;
+            regions.push(createImageBitmap(blob).then(bitmap => ({ x, y, bitmap })));
+        }
+        
+        const frameCtx = this.frameCanvas.getContext('2d');
+        for (const { x, y, bitmap } of await Promise.all(regions)) {
+            frameCtx.drawImage(bitmap, x, y);
+            bitmap.close();
+        }
+        if (this.ctx && this.canvas) {
+            this.ctx.drawImage(this.frameCanvas, 0, 0, this.canvas.width, this.canvas.height);
+            this.drawCursorIndicator();
+        }
+        this.inputsShown(inputIds);
+        this.ackFrame(view.getUint32(9, true));
+    },
+    
+    startMjpegStream() {
+        // The server pushes frames as fast as it can capture them (up to streamFps);
+        // each animation frame paints whatever the <img> currently shows
+        const img = new Image();
+        img.onerror = () => {
+            if (!this.isActive || this.streamImage !== img) return;
+            console.warn('MJPEG stream failed, falling back to polling');
+            this.stopStream();
+            this.streamInterval = setInterval(() => this.updateFrame(), 100);
+        };
+        img.src = `/remote/stream?${this.streamParams()}`;
+        this.streamImage = img;
+        
+        const paint = () => {
+            if (!this.isActive || this.streamImage !== img) return;
+            if (img.complete && img.naturalWidth > 0 && this.ctx && this.canvas) {
+                this.ctx.drawImage(img, 0, 0, this.canvas.width, this.canvas.height);
+                this.drawCursorIndicator();
+            }
+            this.streamAnimation = requestAnimationFrame(paint);
+        };
+        this.streamAnimation = requestAnimationFrame(paint);
+    },
+    
+    stopStream() {
+        if (this.streamAbort) {
+            this.streamAbort.abort();
+            this.streamAbort = null;
+        }
+        if (this.streamVideo) {
+            this.streamVideo.pause();
+            URL.revokeObjectURL(this.streamVideo.src);
+            this.streamVideo.removeAttribute('src');
+            this.streamVideo.load();
+            this.streamVideo = null;
+        }
+        if (this.streamAnimation) {
+            cancelAnimationFrame(this.streamAnimation);
+            this.streamAnimation = null;
+        }
+        if (this.streamImage) {
+            // Clearing src closes the HTTP connection so the server stops producing
+            this.streamImage.onerror = null;
+            this.streamImage.src = '';
+            this.streamImage = null;
+        }
+    },
+    
     async updateFrame() {
-        if (!this.isActive) return;
+        if (!this.isActive || this.frameInFlight) return;
         
+        // Skip ticks while the previous frame is still downloading so requests don't pile up
+        this.frameInFlight = true;
         try {
-            const data = await api.fetchMetrics('/remote/frame');
-            if (data && data.image) {
-                const img = new Image();
-                img.onload = () => {
-                    if (this.ctx && this.canvas) {
-                        this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
-                        this.ctx.drawImage(img, 0, 0, this.canvas.width, this.canvas.height);
-                        // Redraw cursor indicator after frame
-                        this.drawCursorIndicator();
-                    }
-                };
-                img.src = 'data:image/png;base64,' + data.image;
+            const response = await fetch(`/remote/frame/image?format=${this.frameFormat}&quality=${this.frameQuality}`, {
+                cache: 'no-store'
+            });
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            const bitmap = await createImageBitmap(await response.blob());
+            if (this.ctx && this.canvas) {
+                this.ctx.clearRect(0, 0, this.canvas.width, this.canvas.height);
+                this.ctx.drawImage(bitmap, 0, 0, this.canvas.width, this.canvas.height);
+                // Redraw cursor indicator after frame
+                this.drawCursorIndicator();
             }
+            bitmap.close();
         } catch (error) {
             console.error('Error updating frame:', error);
             this.updateStatus('Error', '#ff4444');
+        } finally {
+            this.frameInFlight = false;
         }
     },
     
@@ -1279,13 +1925,76 @@ const remoteDesktop = {
         return { x: clampedX, y: clampedY };
     },
     
+    openInputSocket() {
+        if (!window.WebSocket) return;
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const socket = new WebSocket(`${protocol}//${window.location.host}/remote/input/ws?viewer=${this.viewerId}`);
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'cursor') {
+                // Server-side cursor position replaces the local estimate
+                this.currentMousePos = {
+                    x: Math.max(0, Math.min(this.screenSize.width, message.x)),
+                    y: Math.max(0, Math.min(this.screenSize.height, message.y))
+                };
+                this.drawCursorIndicator();
+                this.updateCursorPosition();
+            } else if (message.type === 'error') {
+                console.warn('Input event rejected:', message.message);
+            }
+        };
+        socket.onclose = () => {
+            if (this.inputSocket === socket) this.inputSocket = null;
+        };
+        this.inputSocket = socket;
+    },
+    
+    sendInput(event) {
+        // Returns false when the WebSocket is not open so callers fall back to HTTP
+        const socket = this.inputSocket;
+        if (!socket || socket.readyState !== WebSocket.OPEN) return false;
+        // Tagged so the first frame showing this input can be timed
+        const id = this.nextInputId = (this.nextInputId + 1) >>> 0;
+        this.pendingInputs.set(id, performance.now());
+        if (this.pendingInputs.size > 256) {
+            this.pendingInputs.delete(this.pendingInputs.keys().next().value);
+        }
+        socket.send(JSON.stringify({ ...event, id }));
+        return true;
+    },
+    
+    inputsShown(ids) {
+        // Moves are coalesced on the server, so an id also covers earlier pending inputs
+        const now = performance.now();
+        for (const id of ids) {
+            const sentAt = this.pendingInputs.get(id);
+            if (sentAt === undefined) continue;
+            this.latencySamples.push(now - sentAt);
+            for (const [pendingId, time] of this.pendingInputs) {
+                if (time <= sentAt) this.pendingInputs.delete(pendingId);
+            }
+        }
+    },
+    
+    reportLatency() {
+        if (this.latencySamples.length === 0) return;
+        const samples = this.latencySamples.splice(0);
+        fetch('/remote/latency', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ round_trip_ms: samples })
+        }).catch(() => {});
+    },
+    
     async moveMouse(x, y, relative) {
         try {
-            await fetch('/remote/mouse/move', {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ x, y, relative })
-            });
+            if (!this.sendInput({ type: 'move', x, y, relative })) {
+                await fetch('/remote/mouse/move', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ x, y, relative })
+                });
+            }
             
             // Update current mouse position
             if (relative) {
@@ -1310,6 +2019,7 @@ const remoteDesktop = {
     
     async clickMouse(button, x, y) {
         try {
+            if (this.sendInput({ type: 'click', button })) return;
             await fetch('/remote/mouse/click', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
@@ -1324,6 +2034,7 @@ const remoteDesktop = {
         try {
             // Use current mouse position or center of screen
             const coords = this.currentMousePos || { x: this.screenSize.width / 2, y: this.screenSize.height / 2 };
+            if (this.sendInput({ type: 'scroll', ...coords, clicks })) return;
             await fetch('/remote/mouse/scroll', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
@@ -1355,6 +2066,7 @@ const remoteDesktop = {
     
     async sendKey(key) {
         try {
+            if (this.sendInput({ type: 'key', key })) return;
             await fetch('/remote/keyboard/press', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
@@ -1367,6 +2079,7 @@ const remoteDesktop = {
     
     async typeText(text) {
         try {
+            if (this.sendInput({ type: 'text', text })) return;
             await fetch('/remote/keyboard/type', {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
@@ -1471,6 +2184,42 @@ document.addEventListener('DOMContentLoaded', () => {
     if (fileExplorerHome) {
         fileExplorerHome.addEventListener('click', () => fileExplorer.goHome());
     }
+    const fileExplorerZip = document.getElementById('file-explorer-zip');
+    if (fileExplorerZip) {
+        fileExplorerZip.addEventListener('click', () => fileExplorer.downloadFolder());
+    }
+    const filePreviewFollow = document.getElementById('file-preview-follow');
+    if (filePreviewFollow) {
+        filePreviewFollow.addEventListener('click', () => fileExplorer.toggleFollow());
+        document.getElementById('file-preview-download').addEventListener('click', () => {
+            if (fileExplorer.previewPath) fileExplorer.download(fileExplorer.previewPath);
+        });
+        document.getElementById('file-preview-close').addEventListener('click', () => fileExplorer.closePreview());
+    }
+    const fileExplorerUpload = document.getElementById('file-explorer-upload');
+    const fileExplorerUploadInput = document.getElementById('file-explorer-upload-input');
+    if (fileExplorerUpload && fileExplorerUploadInput) {
+        fileExplorerUpload.addEventListener('click', () => fileExplorerUploadInput.click());
+        fileExplorerUploadInput.addEventListener('change', () => {
+            if (fileExplorerUploadInput.files.length) fileExplorer.upload(fileExplorerUploadInput.files);
+            fileExplorerUploadInput.value = '';
+        });
+    }
+    const fileExplorerSearch = document.getElementById('file-explorer-search');
+    if (fileExplorerSearch) {
+        fileExplorerSearch.addEventListener('keypress', (e) => {
+            if (e.key === 'Enter') fileExplorer.search();
+        });
+        document.getElementById('file-explorer-search-go').addEventListener('click', () => fileExplorer.search());
+    }
+    const fileExplorerSort = document.getElementById('file-explorer-sort');
+    if (fileExplorerSort) {
+        fileExplorerSort.addEventListener('change', () => fileExplorer.setSort(fileExplorerSort.value));
+    }
+    
+    screenshots.load();
+    document.getElementById('screenshot-take').addEventListener('click', () => screenshots.take());
+    document.getElementById('screenshot-more').addEventListener('click', () => screenshots.load(true));
     
     // Allow Enter key in inputs
     document.getElementById('file-explorer-path').addEventListener('keypress', (e) => {
@@ -1571,6 +2320,10 @@ document.addEventListener('DOMContentLoaded', () => {
     if (stopRemoteDesktop) {
         stopRemoteDesktop.addEventListener('click', () => remoteDesktop.stop());
     }
+    const remoteCaptureTarget = document.getElementById('remote-capture-target');
+    if (remoteCaptureTarget) {
+        remoteCaptureTarget.addEventListener('change', () => remoteDesktop.setCaptureTarget(remoteCaptureTarget.value));
+    }
     
     // Touchpad controller buttons
     const touchpadLeftClick = document.getElementById('touchpad-left-click');
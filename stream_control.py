@@ -0,0 +1,163 @@
+"""
+Stream Control - Adaptive frame rate, resolution and quality for remote streams
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger('PCGamingApp')
+
+
+class AdaptiveController:
+    """
+    Target-latency controller for one remote viewer
+
+    Two delays are tracked separately: how long each frame took to write to
+    the socket (backpressure) and, for viewers that acknowledge frames, the
+    end-to-end delay until the frame was displayed. When the larger of them
+    exceeds the target the controller backs off quality first, then frame
+    rate, then resolution, at most one step per `backoff_interval` so each
+    step can take effect before the next. It recovers in the opposite order
+    once both have stayed well under the target for `recover_interval`
+    seconds; the gap between the two thresholds keeps it from oscillating.
+    """
+
+    def __init__(self, fps, quality, viewport=None, target_latency=0.15, adaptive=True,
+                 min_fps=2.0, min_quality=30, min_scale=0.25, smoothing=0.3,
+                 backoff_interval=0.5, recover_interval=3.0):
+        self.max_fps = fps
+        self.max_quality = quality
+        self.fps = fps
+        self.quality = quality
+        self.scale = 1.0
+        self.viewport = viewport
+        self.target_latency = target_latency
+        self.adaptive = adaptive
+        self.min_fps = min(min_fps, fps)
+        self.min_quality = min(min_quality, quality)
+        self.min_scale = min_scale
+        self.smoothing = smoothing
+        self.backoff_interval = backoff_interval
+        self.recover_interval = recover_interval
+        self.latency = 0.0  # smoothed end-to-end delay from acknowledgements
+        self.send_time = 0.0  # smoothed socket write time
+        self.throughput = 0.0
+        self.lock = threading.Lock()
+        self._sent_at = {}
+        self._acked = False
+        self._last_backoff = 0.0
+        self._headroom_since = None
+
+    def frame_size(self, width, height):
+        """
+        Get the size a captured frame should be downscaled to
+
+        Returns:
+            Tuple (width, height), never larger than the capture
+        """
+        factor = self.scale
+        if self.viewport:
+            view_width, view_height = self.viewport
+            factor *= min(view_width / width, view_height / height, 1.0)
+        factor = min(factor, 1.0)
+        return max(1, int(width * factor)), max(1, int(height * factor))
+
+    def on_sent(self, seq, size, seconds):
+        """Record how long writing a frame of `size` bytes took"""
+        with self.lock:
+            now = time.monotonic()
+            self._sent_at[seq] = now - seconds
+            # Keep only recent frames waiting for an acknowledgement
+            if len(self._sent_at) > 64:
+                for old in sorted(self._sent_at)[:-64]:
+                    del self._sent_at[old]
+            if seconds > 0:
+                self.throughput = self._smooth(self.throughput, size / seconds)
+            self.send_time = self._smooth(self.send_time, seconds)
+            self._update(now)
+
+    def on_ack(self, seq):
+        """Record that the viewer has displayed frame `seq`"""
+        with self.lock:
+            sent_at = self._sent_at.pop(seq, None)
+            if sent_at is None:
+                return
+            for old in [key for key in self._sent_at if key < seq]:
+                del self._sent_at[old]
+            now = time.monotonic()
+            self.latency = self._smooth(self.latency, now - sent_at)
+            self._acked = True
+            self._update(now)
+
+    def _smooth(self, current, value):
+        if not current:
+            return value
+        return self.smoothing * value + (1 - self.smoothing) * current
+
+    def _update(self, now):
+        if not self.adaptive:
+            return
+        delay = max(self.send_time, self.latency) if self._acked else self.send_time
+        if delay > self.target_latency * 1.5:
+            self._headroom_since = None
+            if now - self._last_backoff >= self.backoff_interval:
+                self._last_backoff = now
+                self._back_off()
+        elif delay < self.target_latency * 0.5:
+            # Require sustained headroom before stepping back up
+            if self._headroom_since is None:
+                self._headroom_since = now
+            elif now - self._headroom_since >= self.recover_interval:
+                self._headroom_since = now
+                self._recover()
+        else:
+            self._headroom_since = None
+
+    def _back_off(self):
+        if self.quality > self.min_quality:
+            self.quality = max(self.min_quality, self.quality - 10)
+        elif self.fps > self.min_fps:
+            self.fps = max(self.min_fps, self.fps * 0.75)
+        elif self.scale > self.min_scale:
+            self.scale = max(self.min_scale, round(self.scale * 0.85, 2))
+
+    def _recover(self):
+        if self.scale < 1.0:
+            self.scale = min(1.0, round(self.scale + 0.05, 2))
+        elif self.fps < self.max_fps:
+            self.fps = min(self.max_fps, self.fps + 1)
+        elif self.quality < self.max_quality:
+            self.quality = min(self.max_quality, self.quality + 5)
+
+    def status(self):
+        with self.lock:
+            return {
+                'fps': round(self.fps, 1),
+                'quality': self.quality,
+                'scale': self.scale,
+                'latency_ms': round(self.latency * 1000, 1),
+                'send_ms': round(self.send_time * 1000, 1),
+                'throughput_kbps': round(self.throughput * 8 / 1000, 1),
+                'adaptive': self.adaptive,
+            }
+
+
+# Controllers of active streams, keyed by the viewer supplied stream id
+_controllers = {}
+_controllers_lock = threading.Lock()
+
+
+def register_controller(stream_id, controller):
+    with _controllers_lock:
+        _controllers[stream_id] = controller
+
+
+def unregister_controller(stream_id, controller):
+    with _controllers_lock:
+        if _controllers.get(stream_id) is controller:
+            del _controllers[stream_id]
+
+
+def get_controller(stream_id):
+    with _controllers_lock:
+        return _controllers.get(stream_id)
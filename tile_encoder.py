@@ -0,0 +1,218 @@
+"""
+Tile Encoder - Dirty-region encoding of remote desktop frames
+
+Each frame is split into fixed-size tiles and compared with the previous
+frame using vectorized NumPy operations. Only changed tiles are encoded,
+merged into horizontal runs so each run is a single JPEG. A full keyframe is
+sent periodically, when the resolution changes, or when most of the screen
+changed anyway.
+
+Packet layout (little-endian), each prefixed with its u32 byte length:
+
+    header  4s magic 'TDF1', u8 flags (1 = keyframe, 2 = input ids), u16 width,
+            u16 height, u32 sequence, u16 region count
+    inputs  (flag 2 only) u8 count, count x u32 viewer input ids this packet
+            is the first to reflect
+    region  u16 x, u16 y, u16 width, u16 height, u32 length, JPEG bytes
+
+A packet without regions is a heartbeat, or, with input ids, a frame that
+reflects those inputs without any visible change.
+"""
+import logging
+import struct
+import time
+
+import numpy as np
+from PIL import Image
+
+from frame_encoder import FrameEncoder
+from latency import latency_tracker
+
+logger = logging.getLogger('PCGamingApp')
+
+MAGIC = b'TDF1'
+FLAG_KEYFRAME = 1
+FLAG_INPUTS = 2
+MAX_INPUT_IDS = 255
+_HEADER = struct.Struct('<4sBHHIH')
+_REGION = struct.Struct('<HHHHI')
+_LENGTH = struct.Struct('<I')
+
+
+class TileDiffEncoder:
+    """Stateful per-viewer encoder that only sends changed tiles"""
+
+    def __init__(self, tile_size=64, quality=70, keyframe_interval=10.0, keyframe_ratio=0.5):
+        self.tile_size = tile_size
+        self.quality = quality
+        self.keyframe_interval = keyframe_interval
+        self.keyframe_ratio = keyframe_ratio
+        self.encoder = FrameEncoder()
+        self.seq = 0
+        self._previous = None
+        self._last_keyframe = 0.0
+        self.stats = {'frames': 0, 'keyframes': 0, 'tiles_sent': 0, 'tiles_total': 0, 'bytes': 0}
+
+    def force_keyframe(self):
+        self._previous = None
+
+    def changed_tiles(self, pixels):
+        """
+        Compare a frame with the previous one
+
+        Returns:
+            Boolean array of shape (tile rows, tile columns)
+        """
+        tile = self.tile_size
+        height, width = pixels.shape[:2]
+        rows, cols = -(-height // tile), -(-width // tile)
+        # Compare raw bytes row by row; a tile row is tile * 3 bytes wide, so the
+        # mask reshapes into (rows, tile, cols, tile * 3) blocks without an
+        # extra per-pixel reduction over the colour channels
+        diff = pixels.reshape(height, -1) != self._previous.reshape(height, -1)
+        pad_h, pad_w = rows * tile - height, (cols * tile - width) * 3
+        if pad_h or pad_w:
+            diff = np.pad(diff, ((0, pad_h), (0, pad_w)))
+        return diff.reshape(rows, tile, cols, tile * 3).any(axis=(1, 3))
+
+    def encode(self, image, now=None, input_ids=()):
+        """
+        Encode a frame
+
+        Args:
+            image: PIL image (RGB)
+            now: Current time, for keyframe scheduling
+            input_ids: Viewer input ids this frame is the first to reflect
+
+        Returns:
+            Packet bytes (with length prefix), or None if nothing changed
+        """
+        now = time.monotonic() if now is None else now
+        pixels = np.asarray(image.convert('RGB') if image.mode != 'RGB' else image)
+        height, width = pixels.shape[:2]
+
+        keyframe = (
+            self._previous is None
+            or self._previous.shape != pixels.shape
+            or now - self._last_keyframe >= self.keyframe_interval
+        )
+        regions = []
+        if not keyframe:
+            changed = self.changed_tiles(pixels)
+            count = int(changed.sum())
+            self.stats['tiles_total'] += changed.size
+            if count == 0:
+                self._previous = pixels
+                return None
+            if count >= changed.size * self.keyframe_ratio:
+                keyframe = True
+            else:
+                self.stats['tiles_sent'] += count
+                regions = self._encode_runs(pixels, changed)
+
+        if keyframe:
+            self._last_keyframe = now
+            self.stats['keyframes'] += 1
+            regions = [(0, 0, width, height, self.encoder.encode(image, 'jpeg', self.quality))]
+
+        self._previous = pixels
+        self.seq += 1
+        self.stats['frames'] += 1
+        packet = self._pack(keyframe, width, height, regions, input_ids)
+        self.stats['bytes'] += len(packet)
+        return packet
+
+    def heartbeat_packet(self, input_ids=()):
+        """Empty packet keeping an idle stream alive or acknowledging inputs"""
+        return self._pack(False, 0, 0, [], input_ids)
+
+    def _encode_runs(self, pixels, changed):
+        """Encode horizontal runs of changed tiles as individual JPEGs"""
+        tile = self.tile_size
+        height, width = pixels.shape[:2]
+        regions = []
+        for row, col_start, col_end in _runs(changed):
+            x, y = col_start * tile, row * tile
+            w = min(col_end * tile, width) - x
+            h = min(tile, height - y)
+            crop = Image.fromarray(pixels[y:y + h, x:x + w])
+            regions.append((x, y, w, h, self.encoder.encode(crop, 'jpeg', self.quality)))
+        return regions
+
+    def _pack(self, keyframe, width, height, regions, input_ids=()):
+        flags = FLAG_KEYFRAME if keyframe else 0
+        # Newest ids win if a slow viewer skipped a lot of input
+        input_ids = list(input_ids)[-MAX_INPUT_IDS:]
+        if input_ids:
+            flags |= FLAG_INPUTS
+        parts = [_HEADER.pack(MAGIC, flags, width, height, self.seq, len(regions))]
+        if input_ids:
+            parts.append(struct.pack(f'<B{len(input_ids)}I', len(input_ids), *input_ids))
+        for x, y, w, h, data in regions:
+            parts.append(_REGION.pack(x, y, w, h, len(data)))
+            parts.append(data)
+        body = b''.join(parts)
+        return _LENGTH.pack(len(body)) + body
+
+
+def _runs(changed):
+    """Yield (row, start column, end column) for each run of changed tiles"""
+    # Find run boundaries in all rows at once with a padded first difference
+    padded = np.zeros((changed.shape[0], changed.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = changed
+    edges = np.diff(padded, axis=1)
+    starts = np.argwhere(edges == 1)
+    ends = np.argwhere(edges == -1)
+    for (row, start), (_, end) in zip(starts, ends):
+        yield int(row), int(start), int(end)
+
+
+def tile_stream(hub, controller, encoder, heartbeat=2.0, viewer=None):
+    """
+    Generate a stream of tile packets from the shared capture loop
+
+    Args:
+        hub: CaptureHub publishing captured frames
+        controller: AdaptiveController providing fps, scale and quality
+        encoder: TileDiffEncoder holding this viewer's reference frame
+        heartbeat: Send an empty packet after this many idle seconds
+        viewer: Viewer id whose input ids frames are tagged with
+
+    Yields:
+        Length-prefixed packets
+    """
+    token = hub.subscribe(controller)
+    seq = 0
+    input_seq = latency_tracker.applied_seq
+    last_sent = time.monotonic()
+    try:
+        while True:
+            frame = hub.wait(seq, timeout=heartbeat)
+            started = time.monotonic()
+            packet = None
+            inputs = []
+            if frame is not None:
+                seq = frame.seq
+                # Inputs applied since the last frame this viewer got, including
+                # those behind frames it skipped
+                inputs, input_ids = latency_tracker.inputs_between(input_seq, frame.input_seq, viewer)
+                input_seq = max(input_seq, frame.input_seq)
+                # Downscaled images are shared with other viewers of the same size
+                image = frame.resized(controller.frame_size(*frame.image.size))
+                encoder.quality = controller.quality
+                packet = encoder.encode(image, started, input_ids)
+                latency_tracker.record('encode', time.monotonic() - started)
+                if packet is None and input_ids:
+                    packet = encoder.heartbeat_packet(input_ids)
+            if packet is None and started - last_sent >= heartbeat:
+                packet = encoder.heartbeat_packet()
+            if packet is not None:
+                sent = time.monotonic()
+                yield packet
+                last_sent = time.monotonic()
+                controller.on_sent(encoder.seq, len(packet), last_sent - sent)
+                latency_tracker.record('send', last_sent - sent)
+                latency_tracker.inputs_sent(inputs, last_sent)
+            time.sleep(max(0.0, 1.0 / controller.fps - (time.monotonic() - started)))
+    finally:
+        hub.unsubscribe(token)
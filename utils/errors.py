@@ -12,6 +12,13 @@ class MetricUnavailableError(Exception):
     """Raised when a metric cannot be retrieved"""
     pass
 
+class UploadError(Exception):
+    """Raised when an upload request cannot be applied; carries an HTTP status"""
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
 def handle_api_errors(f):
     """Decorator to handle API errors gracefully"""
     @wraps(f)
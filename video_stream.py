@@ -0,0 +1,186 @@
+"""
+Video Stream - Low-latency H.264/VP8 streaming of the screen
+
+Frames from the shared capture loop are piped into a software encoder
+(PyAV/ffmpeg) and muxed as fragmented MP4 (H.264) or WebM (VP8), which the
+browser appends to a MediaSource as the bytes arrive. Inter-frame coding
+sends a fraction of the bytes of independent JPEG frames for a mostly static
+desktop.
+
+The encoders are tuned for latency rather than compression: no B-frames, no
+lookahead, and a keyframe at least every `gop_seconds` so a viewer that
+joins or drops data recovers quickly.
+
+PyAV is optional; without it video_codecs() is empty and viewers use the
+image streams.
+"""
+import logging
+import time
+from fractions import Fraction
+
+import numpy as np
+
+from latency import latency_tracker
+
+logger = logging.getLogger('PCGamingApp')
+
+try:
+    import av
+    AV_AVAILABLE = True
+except ImportError:
+    AV_AVAILABLE = False
+
+# name -> (container format, ffmpeg encoder, MIME type for MediaSource)
+VIDEO_CODECS = {
+    'h264': ('mp4', 'libx264', 'video/mp4; codecs="avc1.42E01F"'),
+    'vp8': ('webm', 'libvpx', 'video/webm; codecs="vp8"'),
+}
+# Muxer options producing a stream that can be played while it is written
+# (one fragment/cluster per frame, flushed as soon as it is muxed)
+_CONTAINER_OPTIONS = {
+    'mp4': {'movflags': 'empty_moov+default_base_moof+frag_every_frame', 'flush_packets': '1'},
+    'webm': {'live': '1', 'cluster_time_limit': '0', 'flush_packets': '1'},
+}
+_TIME_BASE = Fraction(1, 1000)
+
+
+def video_codecs():
+    """Get the names of the video codecs the installed ffmpeg can encode"""
+    if not AV_AVAILABLE:
+        return []
+    return [name for name, (_, encoder, _) in VIDEO_CODECS.items() if encoder in av.codecs_available]
+
+
+def video_mimetype(codec):
+    return VIDEO_CODECS[codec][2]
+
+
+class _ChunkSink:
+    """Write-only file object collecting muxer output until it is drained"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class VideoEncoder:
+    """Encoder and muxer for one viewer's video stream"""
+
+    def __init__(self, codec, width, height, fps, bitrate, gop_seconds=2.0):
+        if codec not in video_codecs():
+            raise ValueError(f"Video codec {codec} is not available")
+        container_format, encoder, _ = VIDEO_CODECS[codec]
+        # 4:2:0 chroma needs even dimensions
+        self.width, self.height = width - width % 2, height - height % 2
+        self.sink = _ChunkSink()
+        self.container = av.open(self.sink, mode='w', format=container_format,
+                                 options=_CONTAINER_OPTIONS[container_format])
+        self.stream = self.container.add_stream(encoder, rate=max(1, int(round(fps))))
+        self.stream.width = self.width
+        self.stream.height = self.height
+        self.stream.pix_fmt = 'yuv420p'
+        self.stream.bit_rate = bitrate
+        self.stream.codec_context.time_base = _TIME_BASE
+        gop = max(1, int(fps * gop_seconds))
+        if encoder == 'libx264':
+            self.stream.codec_context.options = {
+                'preset': 'ultrafast', 'tune': 'zerolatency', 'profile': 'baseline',
+                'bf': '0', 'g': str(gop), 'keyint_min': str(gop),
+            }
+        else:
+            self.stream.codec_context.options = {
+                'deadline': 'realtime', 'cpu-used': '8', 'lag-in-frames': '0',
+                'error-resilient': '1', 'g': str(gop),
+            }
+        self._started = None
+        self._last_pts = -1
+
+    def encode(self, image, timestamp):
+        """
+        Encode one frame
+
+        Args:
+            image: PIL RGB image of the stream's size
+            timestamp: Capture time in seconds (monotonic or wall clock)
+
+        Returns:
+            Container bytes produced so far (may be empty)
+        """
+        if self._started is None:
+            self._started = timestamp
+        frame = av.VideoFrame.from_ndarray(np.asarray(image), format='rgb24')
+        # Millisecond timestamps from capture time give correct pacing at any fps
+        pts = max(self._last_pts + 1, int((timestamp - self._started) * 1000))
+        frame.pts, frame.time_base = pts, _TIME_BASE
+        self._last_pts = pts
+        for packet in self.stream.encode(frame):
+            self.container.mux(packet)
+        return self.sink.drain()
+
+    def close(self):
+        try:
+            for packet in self.stream.encode(None):
+                self.container.mux(packet)
+            self.container.close()
+        except Exception as e:
+            logger.debug(f"Error closing video encoder: {e}")
+
+
+def video_stream(hub, controller, codec, bitrate):
+    """
+    Generate a fragmented MP4/WebM body from the shared capture loop
+
+    The stream size is fixed by the first frame; if the capture size changes
+    (e.g. a new capture target) the stream ends and the viewer reconnects.
+
+    Args:
+        hub: CaptureHub publishing captured frames
+        controller: AdaptiveController providing fps and size
+        codec: 'h264' or 'vp8'
+        bitrate: Target bits per second
+
+    Yields:
+        Container chunks
+    """
+    token = hub.subscribe(controller)
+    encoder = None
+    source_size = None
+    seq = 0
+    try:
+        while True:
+            frame = hub.wait(seq, timeout=5.0)
+            if frame is None:
+                logger.warning("Video stream stalled, closing")
+                return
+            seq = frame.seq
+            started = time.monotonic()
+            if encoder is None:
+                source_size = frame.image.size
+                width, height = controller.frame_size(*source_size)
+                encoder = VideoEncoder(codec, width, height, controller.max_fps, bitrate)
+            elif frame.image.size != source_size:
+                logger.info("Capture size changed, ending video stream")
+                return
+            data = encoder.encode(frame.resized((encoder.width, encoder.height)), frame.timestamp)
+            latency_tracker.record('encode', time.monotonic() - started)
+            if data:
+                sent = time.monotonic()
+                yield data
+                controller.on_sent(seq, len(data), time.monotonic() - sent)
+                latency_tracker.record('send', time.monotonic() - sent)
+            time.sleep(max(0.0, 1.0 / controller.fps - (time.monotonic() - started)))
+    finally:
+        hub.unsubscribe(token)
+        if encoder is not None:
+            encoder.close()
@@ -0,0 +1,121 @@
+"""
+ZIP Stream - Download whole folders as a ZIP built on the fly
+
+The archive is written by zipfile into a sink that is drained after every
+write, while the folder is walked, so the first bytes go out immediately
+and memory stays constant whatever the folder's size: no temporary file and
+no buffering of whole entries. zipfile switches to data descriptors on an
+unseekable output and to ZIP64 records for large offsets, and every file
+entry is written with ZIP64 sizes, so folders and files over 4 GB work.
+
+Files that are already compressed (media, archives) are stored as-is; only
+other files are deflated.
+"""
+import logging
+import os
+import zipfile
+
+logger = logging.getLogger('PCGamingApp')
+
+CHUNK_SIZE = 1024 * 1024
+FLUSH_SIZE = 256 * 1024  # yield once this much archive data is pending
+COMPRESSED_EXTENSIONS = {
+    '.zip', '.7z', '.rar', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.cab', '.iso',
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.heic', '.avif',
+    '.mp3', '.aac', '.m4a', '.ogg', '.opus', '.flac',
+    '.mp4', '.mkv', '.webm', '.mov', '.avi', '.m4v',
+    '.docx', '.xlsx', '.pptx', '.jar', '.apk', '.pak', '.vpk',
+}
+
+
+class _Sink:
+    """Unseekable file object collecting archive output until drained"""
+
+    def __init__(self):
+        self._chunks = []
+        self.pending = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self.pending += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        self.pending = 0
+        return data
+
+
+def walk_folder(root):
+    """
+    Yield (path, archive name, is_dir) for a folder tree, parents first
+
+    Symbolic links to directories are not followed, so link cycles cannot
+    make the archive endless. Unreadable directories are skipped.
+    """
+    base = os.path.basename(os.path.normpath(root)) or 'archive'
+    stack = [(root, base)]
+    while stack:
+        path, name = stack.pop()
+        yield path, name + '/', True
+        try:
+            with os.scandir(path) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable folder {path}: {e}")
+            continue
+        subdirs = []
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append((entry.path, f"{name}/{entry.name}"))
+                elif entry.is_file():
+                    yield entry.path, f"{name}/{entry.name}", False
+            except OSError:
+                continue
+        stack.extend(reversed(subdirs))
+
+
+def zip_stream(root):
+    """
+    Generate a ZIP archive of a folder
+
+    Args:
+        root: Folder to archive; entries are stored under its name
+
+    Yields:
+        Archive bytes
+    """
+    sink = _Sink()
+    with zipfile.ZipFile(sink, mode='w', allowZip64=True) as archive:
+        for path, name, is_dir in walk_folder(root):
+            try:
+                info = zipfile.ZipInfo.from_file(path, name, strict_timestamps=False)
+                if is_dir:
+                    archive.writestr(info, b'')
+                else:
+                    extension = os.path.splitext(name)[1].lower()
+                    if extension not in COMPRESSED_EXTENSIONS:
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                    with open(path, 'rb') as source:
+                        # Always ZIP64: a file that grows past 4 GB after the stat
+                        # would otherwise fail in close() after its data went out
+                        with archive.open(info, mode='w', force_zip64=True) as entry:
+                            while True:
+                                chunk = source.read(CHUNK_SIZE)
+                                if not chunk:
+                                    break
+                                entry.write(chunk)
+                                if sink.pending >= FLUSH_SIZE:
+                                    yield sink.drain()
+            except OSError as e:
+                # An unreadable file is left out (or cut short) rather than ending the download
+                logger.warning(f"Skipping {path} in ZIP download: {e}")
+                continue
+            if sink.pending >= FLUSH_SIZE:
+                yield sink.drain()
+    yield sink.drain()